@@ -0,0 +1,163 @@
+"""
+Rule performance benchmark.
+
+Times every flag_* rule and the full evaluation (load + all rules, as
+run_all_rules does) on seeded synthetic data of increasing size, and records
+throughput and peak RSS per case. Results can be saved as a baseline and later
+runs compared against it to catch performance regressions.
+
+Usage (from the repository root):
+    python -m benchmarks.benchmark_rules --sizes 10k,100k,1M
+    python -m benchmarks.benchmark_rules --sizes 10k,100k,1M --save-baseline
+    python -m benchmarks.benchmark_rules --sizes 10k,100k,1M,10M --json results.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from src.windows import WINDOW_BACKENDS
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES = "10k,100k,1M"
+
+# One case per rule in src.run_all_rules.RULES, all rules over shared
+# preprocessing (fused_rule_masks), and the full evaluation from the CSV
+CASES = ["rule1", "rule2", "rule3", "rule4", "rule5", "fused", "run_all_rules"]
+
+
+def parse_size(text: str) -> int:
+    """'10k' -> 10_000, '1M' -> 1_000_000, '2500' -> 2500."""
+    text = text.strip()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:].lower(), 1)
+    return int(float(text[:-1] if multiplier > 1 else text) * multiplier)
+
+
+def _run_case(csv_path: str, case: str, backend: str = "auto") -> dict:
+    """
+    Child process: time one case on the CSV. The child is a fresh interpreter,
+    so its own peak RSS (VmHWM, see peak_rss_mb) covers this case only.
+    """
+    from src.fraud_detection import fused_rule_masks
+    from src.instrumentation import peak_rss_mb
+    from src.run_all_rules import RULES, evaluate_rules
+    from src.transaction_frame import TransactionFrame
+    from src.utils import load_transactions
+
+    if case == "run_all_rules":
+        start = time.perf_counter()
+        flagged = sum(len(result) for result in evaluate_rules(csv_path).values())
+    elif case == "fused":
+        frame = TransactionFrame(load_transactions(csv_path), backend=backend)
+        start = time.perf_counter()
+        flagged = int(fused_rule_masks(frame).sum())
+    else:
+        df = load_transactions(csv_path)
+        start = time.perf_counter()
+        flagged = len(RULES[case][1](df))
+    return {"seconds": time.perf_counter() - start, "flagged": flagged, "peak_rss_mb": peak_rss_mb()}
+
+
+def run_benchmarks(sizes: list, cases: list, seed: int = 0, backend: str = "auto") -> dict:
+    """
+    Runs every case at every size; the fused case uses the given window backend.
+
+    Returns:
+        dict: {str(size): {case: {"seconds", "rows_per_sec", "flagged", "peak_rss_mb"}}}
+    """
+    from generate_data import PATTERNS, generate_transactions
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="rule-benchmark-") as directory:
+        for rows in sizes:
+            csv_path = os.path.join(directory, f"transactions-{rows}.csv")
+            df = generate_transactions(rows, n_users=max(rows // 100, 10), seed=seed,
+                                       rates={label: 0.001 for label in PATTERNS})
+            df.to_csv(csv_path, index=False)
+            del df
+
+            results[str(rows)] = {}
+            for case in cases:
+                with context.Pool(1) as pool:
+                    measurement = pool.apply(_run_case, (csv_path, case, backend))
+                measurement["rows_per_sec"] = rows / measurement["seconds"]
+                results[str(rows)][case] = measurement
+                print(f"{rows:>10,} {case:<14} {measurement['seconds']:9.3f} s "
+                      f"{measurement['rows_per_sec']:>13,.0f} rows/s "
+                      f"{measurement['peak_rss_mb']:8.1f} MB  {measurement['flagged']:,} flagged",
+                      flush=True)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Cases slower than the baseline by more than tolerance (0.2 = 20% less
+    throughput), or whose flagged count changed, as readable messages.
+    """
+    regressions = []
+    for size, cases in results.items():
+        for case, current in cases.items():
+            previous = baseline.get(size, {}).get(case)
+            if previous is None:
+                continue
+            ratio = current["rows_per_sec"] / previous["rows_per_sec"]
+            if ratio < 1 - tolerance:
+                regressions.append(f"{case} @ {size} rows: {ratio:.0%} of baseline throughput")
+            if current["flagged"] != previous["flagged"]:
+                regressions.append(f"{case} @ {size} rows: {current['flagged']} flagged, "
+                                   f"baseline {previous['flagged']}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the fraud rules on synthetic data.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Comma-separated row counts, e.g. 10k,100k,1M,10M (default: {DEFAULT_SIZES})")
+    parser.add_argument("--cases", default=",".join(CASES),
+                        help="Comma-separated cases to run (default: all)")
+    parser.add_argument("--seed", type=int, default=0, help="Data generator seed")
+    parser.add_argument("--backend", choices=WINDOW_BACKENDS, default="auto",
+                        help="Window backend of the fused case (default: auto)")
+    parser.add_argument("--json", default=None, help="Also write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE_PATH,
+                        help="Baseline JSON to compare against (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store these results as the new baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed throughput drop before a case counts as a regression (default: 0.2)")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    cases = args.cases.split(",")
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(sizes, cases, args.seed, args.backend)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    print("No regressions against baseline" if not regressions else f"{len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Load generator for the scoring service (src/service.py).
+
+Replays seeded synthetic transactions over several pipelined connections
+and reports throughput and client-side p50/p99 latency, plus the service's
+own counters. Without --port it starts an in-process service on a free port,
+so it runs with no outside services at all.
+
+Usage (from the repository root):
+    python -m benchmarks.service_load --rows 100000 --connections 8
+    python -m src.service --port 8765 &
+    python -m benchmarks.service_load --port 8765 --rows 100000 --rate 20000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+def request_lines(rows: int, connections: int, seed: int = 0) -> list:
+    """
+    Synthetic transactions as JSON request lines, split over the connections
+    by user so that each user's transactions stay in time order on one connection.
+    """
+    from generate_data import PATTERNS, generate_transactions
+
+    df = generate_transactions(rows, n_users=max(rows // 100, 10), seed=seed,
+                               rates={label: 0.001 for label in PATTERNS})
+    timestamps = df["timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%S")
+    connection = pd.util.hash_array(df["user_id"].to_numpy()) % np.uint64(connections)
+    lines = [[] for _ in range(connections)]
+    for i, (user_id, timestamp, merchant_name, amount, target) in enumerate(zip(
+            df["user_id"], timestamps, df["merchant_name"], df["amount"], connection)):
+        lines[target].append(json.dumps({
+            "transaction_id": f"t{i}", "user_id": user_id, "timestamp": timestamp,
+            "merchant_name": merchant_name, "amount": amount,
+        }).encode() + b"\n")
+    return lines
+
+
+async def run_connection(host: str, port: int, lines: list, window: int, interval: float) -> list:
+    """
+    Send lines with at most window responses outstanding, paced every interval
+    seconds (0: as fast as the window allows). Returns per-request latencies in seconds.
+    """
+    reader, writer = await asyncio.open_connection(host, port, limit=2**20)
+    sent_at = deque()
+    latencies = []
+    in_flight = asyncio.Semaphore(window)
+
+    async def receive():
+        for _ in lines:
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - sent_at.popleft())
+            in_flight.release()
+            if "error" in response:
+                raise RuntimeError(f"service error: {response['error']}")
+
+    receiver = asyncio.create_task(receive())
+    started = time.perf_counter()
+    for i, line in enumerate(lines):
+        if interval:
+            # Open-loop pacing: each request goes out at its scheduled time
+            delay = started + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await in_flight.acquire()
+        sent_at.append(time.perf_counter())
+        writer.write(line)
+        await writer.drain()
+    await receiver
+
+    writer.write(b'{"op": "stats"}\n')
+    stats = json.loads(await reader.readline())
+    writer.close()
+    return latencies, stats
+
+
+async def run_load(host: str, port: int, rows: int, connections: int, window: int,
+                   rate: float, seed: int) -> dict:
+    """Drive the service; returns client-side throughput/latency and the service counters."""
+    lines = request_lines(rows, connections, seed)
+    interval = connections / rate if rate else 0.0
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(
+        run_connection(host, port, connection_lines, window, interval) for connection_lines in lines
+    ))
+    seconds = time.perf_counter() - started
+    latencies = np.sort(np.concatenate([np.asarray(latency) for latency, _ in outcomes]))
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds,
+        "client_p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "client_p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "service": max((stats for _, stats in outcomes), key=lambda stats: stats["processed"]),
+    }
+
+
+async def main_async(args) -> dict:
+    if args.port:
+        return await run_load(args.host, args.port, args.rows, args.connections, args.window,
+                              args.rate, args.seed)
+    from src.service import ScoringService
+
+    service = ScoringService(batch_size=args.batch_size, max_delay_ms=args.max_delay_ms)
+    server = await service.start(args.host, 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return await run_load(args.host, port, args.rows, args.connections, args.window,
+                              args.rate, args.seed)
+    finally:
+        server.close()
+        await server.wait_closed()
+        await service.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load-test the scoring service.")
+    parser.add_argument("--host", default="127.0.0.1", help="Service address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=None,
+                        help="Port of a running service (default: start one in-process)")
+    parser.add_argument("--rows", type=int, default=50_000, help="Transactions to send")
+    parser.add_argument("--connections", type=int, default=4, help="Concurrent connections")
+    parser.add_argument("--window", type=int, default=256, help="Outstanding requests per connection")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Target transactions/sec over all connections (default: unthrottled)")
+    parser.add_argument("--seed", type=int, default=0, help="Data generator seed")
+    parser.add_argument("--batch-size", type=int, default=256, help="In-process service micro-batch size")
+    parser.add_argument("--max-delay-ms", type=float, default=2.0, help="In-process service batch deadline")
+    args = parser.parse_args()
+
+    result = asyncio.run(main_async(args))
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
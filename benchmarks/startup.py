@@ -0,0 +1,102 @@
+"""
+Cold-start benchmark of the scoring paths.
+
+Scores a small CSV in a fresh interpreter, the way a short-lived worker or CLI
+call does, once through the standard-library scorer (src.lite) and once
+through the pandas batch path (src.run_all_rules.evaluate_rule_masks). Each
+run is a new process, so the time includes interpreter start, imports and
+scoring; the peak RSS is the child's own.
+
+Usage (from the repository root):
+    python -m benchmarks.startup
+    python -m benchmarks.startup --rows 500 --repeat 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Path -> child program scoring the CSV into flagged (rows flagged by any rule)
+PATHS = {
+    "lite": "from src.lite import score_file; flagged = sum(1 for bits in score_file(CSV) if bits)",
+    "pandas": ("from src.run_all_rules import evaluate_rule_masks; "
+               "flagged = int(evaluate_rule_masks(CSV).any(axis=1).sum())"),
+}
+
+# ru_maxrss survives fork and exec on Linux (it would report this process's peak),
+# so the child reads its own high-water mark from /proc where there is one
+_REPORT = """
+import json, os, resource
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if os.path.exists("/proc/self/status"):
+    with open("/proc/self/status") as status:
+        peak = next(int(line.split()[1]) for line in status if line.startswith("VmHWM:"))
+print(json.dumps([flagged, peak]))
+"""
+
+
+def _run_child(program: str, csv_path: str) -> dict:
+    """Time one fresh interpreter running program on the CSV."""
+    code = f"CSV = {csv_path!r}\n{program}\n{_REPORT}"
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    seconds = time.perf_counter() - start
+    flagged, peak = json.loads(output.splitlines()[-1])
+    peak_mb = peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+    return {"seconds": seconds, "flagged": flagged, "peak_rss_mb": peak_mb}
+
+
+def run_startup(rows: int, repeat: int, seed: int = 0) -> dict:
+    """
+    Median wall time and peak RSS of each path over repeat fresh processes.
+
+    Returns:
+        dict: {path: {"seconds", "peak_rss_mb", "flagged"}}
+    """
+    from generate_data import PATTERNS, generate_transactions
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="startup-benchmark-") as directory:
+        csv_path = os.path.join(directory, f"transactions-{rows}.csv")
+        generate_transactions(rows, n_users=max(rows // 20, 2), seed=seed,
+                              rates={label: 0.01 for label in PATTERNS}).to_csv(csv_path, index=False)
+        for path, program in PATHS.items():
+            runs = [_run_child(program, csv_path) for _ in range(repeat)]
+            results[path] = {
+                "seconds": statistics.median(run["seconds"] for run in runs),
+                "peak_rss_mb": statistics.median(run["peak_rss_mb"] for run in runs),
+                "flagged": runs[0]["flagged"],
+            }
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cold-start time of the lite and pandas scoring paths.")
+    parser.add_argument("--rows", type=int, default=200, help="Transactions to score (default: 200)")
+    parser.add_argument("--repeat", type=int, default=10, help="Fresh processes per path (default: 10)")
+    parser.add_argument("--seed", type=int, default=0, help="Data generator seed")
+    parser.add_argument("--json", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_startup(args.rows, args.repeat, args.seed)
+    for path, result in results.items():
+        print(f"{path:<8} {result['seconds'] * 1000:8.1f} ms {result['peak_rss_mb']:8.1f} MB  "
+              f"{result['flagged']:,} flagged")
+    if results["lite"]["flagged"] != results["pandas"]["flagged"]:
+        print("The paths flagged different rows")
+        return 1
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
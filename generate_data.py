@@ -1,56 +1,192 @@
+import argparse
 import csv
 from datetime import datetime, timedelta
 
+import numpy as np
+import pandas as pd
+
 # Users and merchants
 users = [f"u{i}" for i in range(1, 9)]
 merchants_regular = ["Starbucks", "Target", "Amazon", "Sephora", "Walmart", "McDonalds", "PizzaHut", "Subway", "Best Buy"]
 merchants_luxury = ["Rolex Boutique", "Jewellery World"]
 merchants_travel = ["Delta Airlines", "Booking.com", "Expedia", "Airbnb", "TripAdvisor", "Hilton Hotels"]
 
-transactions = []
-
-def add_transaction(user, ts, merchant, amount):
-    transactions.append([user, ts.strftime("%Y-%m-%d %H:%M:%S"), merchant, amount])
-
-# ---- Rule 2: Rapid small transactions (5 tx in 2 min) ----
-base_time = datetime(2025, 1, 1, 10, 0, 0)
-for i in range(5):
-    add_transaction("u1", base_time + timedelta(seconds=i*20), "Starbucks", 10 + i)
-
-# ---- Rule 3: Same merchant multiple times in 90s ----
-base_time = datetime(2025, 1, 2, 11, 0, 0)
-for i in range(3):
-    add_transaction("u2", base_time + timedelta(seconds=i*30), "Walmart", 25)
-
-# ---- Rule 4: Unusual time-of-day ----
-# Normal hours for u3
-for h in [9, 10, 11, 12]:
-    add_transaction("u3", datetime(2025, 1, 3, h, 0, 0), "Target", 20)
-# Unusual late night transaction
-add_transaction("u3", datetime(2025, 1, 3, 3, 0, 0), "Amazon", 50)
-
-# ---- Rule 5: Time-compressed spend spike ----
-base_time = datetime(2025, 1, 4, 14, 0, 0)
-add_transaction("u4", base_time, "Subway", 100)
-add_transaction("u4", base_time + timedelta(minutes=10), "Subway", 150)
-add_transaction("u4", base_time + timedelta(minutes=20), "Starbucks", 200)  # Spike total 450 in 20min
-
-# ---- Rule 1: High-value transaction ----
-add_transaction("u5", datetime(2025, 1, 5, 15, 0, 0), "Rolex Boutique", 8000)
-
-# Fill some normal transactions for other users
-base_time = datetime(2025, 1, 6, 9, 0, 0)
-for u in ["u6", "u7", "u8"]:
-    for h in range(8, 12):
-        add_transaction(u, datetime(2025, 1, 6, h, 0, 0), "Walmart", 50)
-
-# Sort by timestamp
-transactions.sort(key=lambda x: x[1])
-
-# Write CSV
-with open("data/input.csv", "w", newline="") as f:
-    writer = csv.writer(f)
-    writer.writerow(["user_id","timestamp","merchant_name","amount"])
-    writer.writerows(transactions)
-
-print("data/input.csv generated successfully!")
+# Injected fraud patterns: (label, transactions per episode, episode length in seconds)
+PATTERNS = {
+    "high_value": (1, 0),          # Rule 1: one purchase above the threshold
+    "rapid": (6, 100),             # Rule 2: 6 transactions within 100 seconds
+    "same_merchant": (4, 75),      # Rule 3: 4 transactions at one merchant within 75 seconds
+    "unusual_time": (1, 0),        # Rule 4: one transaction 12 hours off the user's habit
+    "spike": (8, 2 * 3600),        # Rule 5: 8 transactions within 2 hours
+}
+
+
+def fixture_transactions() -> list:
+    """The small hand-placed dataset in data/input.csv (one case per rule)."""
+    transactions = []
+
+    def add_transaction(user, ts, merchant, amount):
+        transactions.append([user, ts.strftime("%Y-%m-%d %H:%M:%S"), merchant, amount])
+
+    # ---- Rule 2: Rapid small transactions (5 tx in 2 min) ----
+    base_time = datetime(2025, 1, 1, 10, 0, 0)
+    for i in range(5):
+        add_transaction("u1", base_time + timedelta(seconds=i*20), "Starbucks", 10 + i)
+
+    # ---- Rule 3: Same merchant multiple times in 90s ----
+    base_time = datetime(2025, 1, 2, 11, 0, 0)
+    for i in range(3):
+        add_transaction("u2", base_time + timedelta(seconds=i*30), "Walmart", 25)
+
+    # ---- Rule 4: Unusual time-of-day ----
+    # Normal hours for u3
+    for h in [9, 10, 11, 12]:
+        add_transaction("u3", datetime(2025, 1, 3, h, 0, 0), "Target", 20)
+    # Unusual late night transaction
+    add_transaction("u3", datetime(2025, 1, 3, 3, 0, 0), "Amazon", 50)
+
+    # ---- Rule 5: Time-compressed spend spike ----
+    base_time = datetime(2025, 1, 4, 14, 0, 0)
+    add_transaction("u4", base_time, "Subway", 100)
+    add_transaction("u4", base_time + timedelta(minutes=10), "Subway", 150)
+    add_transaction("u4", base_time + timedelta(minutes=20), "Starbucks", 200)  # Spike total 450 in 20min
+
+    # ---- Rule 1: High-value transaction ----
+    add_transaction("u5", datetime(2025, 1, 5, 15, 0, 0), "Rolex Boutique", 8000)
+
+    # Fill some normal transactions for other users
+    base_time = datetime(2025, 1, 6, 9, 0, 0)
+    for u in ["u6", "u7", "u8"]:
+        for h in range(8, 12):
+            add_transaction(u, datetime(2025, 1, 6, h, 0, 0), "Walmart", 50)
+
+    # Sort by timestamp
+    transactions.sort(key=lambda x: x[1])
+    return transactions
+
+
+def _zipf_weights(n: int, skew: float) -> np.ndarray:
+    """Selection probabilities proportional to 1 / rank**skew (skew 0 = uniform)."""
+    weights = 1.0 / np.arange(1, n + 1) ** skew
+    return weights / weights.sum()
+
+
+def generate_transactions(rows: int, n_users: int = 10_000, n_merchants: int = 1_000,
+                          days: float = 30, skew: float = 1.0, rates: dict = None,
+                          seed: int = 0, start: str = "2025-01-01") -> pd.DataFrame:
+    """
+    Synthetic transactions with injected fraud patterns, generated vectorized.
+
+    Parameters:
+        rows (int): Total number of transactions.
+        n_users (int): Number of distinct users.
+        n_merchants (int): Number of distinct merchants.
+        days (float): Time span covered by the transactions.
+        skew (float): Zipf exponent of user activity (0 = uniform; higher
+                      values concentrate transactions on a few heavy users).
+        rates (dict): Fraction of rows belonging to each pattern in PATTERNS,
+                      e.g. {"rapid": 0.001}. Missing patterns are not injected.
+        seed (int): Random seed; the same arguments always give the same data.
+        start (str): First day of the time span.
+
+    Returns:
+        pd.DataFrame: user_id, timestamp, merchant_name, amount and
+                      fraud_pattern (the injected pattern, "" for normal
+                      rows), sorted by timestamp.
+    """
+    rng = np.random.default_rng(seed)
+    rates = rates or {}
+    start_ns = pd.Timestamp(start).value
+    span_s = int(days * 86400)
+
+    user_weights = _zipf_weights(n_users, skew)
+    merchant_weights = _zipf_weights(n_merchants, 1.0)
+    habit_hour = rng.integers(7, 21, n_users)  # each user's usual hour of day
+
+    # Episodes of each pattern, sized from its share of the rows
+    episodes = {label: int(rows * rates.get(label, 0) // size) for label, (size, _) in PATTERNS.items()}
+    injected = sum(episodes[label] * PATTERNS[label][0] for label in PATTERNS)
+    if injected > rows:
+        raise ValueError("Injection rates add up to more rows than requested")
+
+    # Normal activity: habitual hour ± 2h on a random day
+    n_normal = rows - injected
+    user = rng.choice(n_users, size=n_normal, p=user_weights)
+    day = rng.integers(0, max(int(days), 1), n_normal)
+    hour = np.clip(np.rint(rng.normal(habit_hour[user], 2.0)), 0, 23).astype(np.int64)
+    seconds = day * 86400 + hour * 3600 + rng.integers(0, 3600, n_normal)
+    parts = [{
+        "user": user,
+        "seconds": np.minimum(seconds, span_s - 1),
+        "merchant": rng.choice(n_merchants, size=n_normal, p=merchant_weights),
+        "amount": np.round(np.minimum(rng.lognormal(3.5, 1.0, n_normal), 5000), 2),
+        "pattern": np.full(n_normal, ""),
+    }]
+
+    for label, (size, length) in PATTERNS.items():
+        count = episodes[label]
+        if not count:
+            continue
+        episode_user = rng.choice(n_users, size=count, p=user_weights)
+        episode_start = rng.integers(0, max(span_s - length, 1), count)
+        offsets = np.sort(rng.integers(0, length + 1, (count, size)), axis=1).ravel()
+        episode_merchant = rng.choice(n_merchants, size=count, p=merchant_weights)
+        part = {
+            "user": np.repeat(episode_user, size),
+            "seconds": np.repeat(episode_start, size) + offsets,
+            "merchant": rng.choice(n_merchants, size=count * size, p=merchant_weights),
+            "amount": np.round(rng.lognormal(3.0, 0.8, count * size), 2),
+            "pattern": np.full(count * size, label),
+        }
+        if label == "high_value":
+            part["amount"] = np.round(rng.uniform(7000, 20000, count), 2)
+        elif label == "same_merchant":
+            part["merchant"] = np.repeat(episode_merchant, size)
+        elif label == "unusual_time":
+            odd_hour = (habit_hour[episode_user] + 12) % 24
+            part["seconds"] = (episode_start // 86400) * 86400 + odd_hour * 3600 + episode_start % 3600
+        parts.append(part)
+
+    columns = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+    order = np.argsort(columns["seconds"], kind="stable")
+    return pd.DataFrame({
+        "user_id": np.char.add("u", columns["user"][order].astype(str)),
+        "timestamp": pd.to_datetime(start_ns + columns["seconds"][order] * 1_000_000_000),
+        "merchant_name": np.char.add("merchant", columns["merchant"][order].astype(str)),
+        "amount": columns["amount"][order],
+        "fraud_pattern": columns["pattern"][order],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a transactions CSV.")
+    parser.add_argument("--output", default="data/input.csv", help="CSV to write (default: data/input.csv)")
+    parser.add_argument("--rows", type=int, default=None,
+                        help="Generate this many synthetic rows (default: the small hand-placed fixture)")
+    parser.add_argument("--users", type=int, default=10_000, help="Distinct users")
+    parser.add_argument("--merchants", type=int, default=1_000, help="Distinct merchants")
+    parser.add_argument("--days", type=float, default=30, help="Time span in days")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf skew of user activity (0 = uniform)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    for label in PATTERNS:
+        parser.add_argument(f"--{label.replace('_', '-')}-rate", type=float, default=0.001,
+                            help=f"Fraction of rows in injected {label} episodes (default: 0.001)")
+    args = parser.parse_args()
+
+    if args.rows is None:
+        # Write CSV
+        with open(args.output, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["user_id","timestamp","merchant_name","amount"])
+            writer.writerows(fixture_transactions())
+    else:
+        rates = {label: getattr(args, f"{label}_rate") for label in PATTERNS}
+        df = generate_transactions(args.rows, args.users, args.merchants, args.days,
+                                   args.skew, rates, args.seed)
+        df.to_csv(args.output, index=False)
+
+    print(f"{args.output} generated successfully!")
+
+
+if __name__ == "__main__":
+    main()
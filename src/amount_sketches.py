@@ -0,0 +1,271 @@
+import argparse
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from src.fraud_detection import (
+    HIGH_VALUE_THRESHOLD,
+    RULE_IDS,
+    TransactionSource,
+    as_transaction_frame,
+    flagged_frames,
+    high_value_mask,
+)
+from src.transaction_frame import TransactionFrame
+
+# Relative accuracy of a sketched quantile: the estimate is within 1% of an amount at that rank
+SKETCH_RELATIVE_ACCURACY = 0.01
+_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+
+# Amounts are clamped to this range, which bounds a key's sketch (see MAX_SKETCH_BUCKETS)
+MIN_SKETCH_AMOUNT = 0.01
+MAX_SKETCH_AMOUNT = 1e9
+
+# Adaptive Rule 1: flag amounts above this percentile of the merchant's (or user's) amounts
+HIGH_VALUE_PERCENTILE = 99.5
+MIN_SKETCH_COUNT = 100  # keys with fewer amounts fall back to HIGH_VALUE_THRESHOLD
+
+SKETCH_KEYS = ("merchant_name", "user_id")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS amount_sketches (
+    scope TEXT NOT NULL,
+    key NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (scope, key, bucket)
+)
+"""
+
+_UPSERT = """
+INSERT INTO amount_sketches (scope, key, bucket, count) VALUES (?, ?, ?, ?)
+ON CONFLICT (scope, key, bucket) DO UPDATE SET count = count + excluded.count
+"""
+
+
+def _buckets(amounts: np.ndarray) -> np.ndarray:
+    """Sketch bucket of every amount: bucket i holds (gamma^(i-1), gamma^i]."""
+    amounts = np.clip(np.asarray(amounts, dtype=np.float64), MIN_SKETCH_AMOUNT, MAX_SKETCH_AMOUNT)
+    return np.ceil(np.log(amounts) / np.log(_GAMMA)).astype(np.int64)
+
+
+# Most buckets one key's sketch can hold: the clamped range spans 1,268 at 1% accuracy
+MAX_SKETCH_BUCKETS = int(np.ptp(_buckets([MIN_SKETCH_AMOUNT, MAX_SKETCH_AMOUNT]))) + 1
+
+
+class AmountSketches:
+    """
+    Mergeable quantile sketches of transaction amounts, one per key (merchant
+    or user), held together as one sparse table of bucket counts.
+
+    Each key's sketch is a DDSketch-style histogram over logarithmic buckets:
+    any quantile it returns is within SKETCH_RELATIVE_ACCURACY of an amount of
+    that rank, two sketches merge by adding bucket counts (so a sketch built
+    batch by batch equals one over all the data), and a key never holds more
+    than MAX_SKETCH_BUCKETS buckets, however many amounts it saw.
+
+    Parameters:
+        counts (pd.Series): Bucket counts indexed by (key, bucket), sorted.
+
+    Example:
+        sketches = AmountSketches.from_frame(frame, "merchant_name")
+        sketches.quantiles(0.995)   # count and 99.5th percentile amount per merchant
+    """
+
+    def __init__(self, counts: pd.Series):
+        self.counts = counts
+
+    @classmethod
+    def from_amounts(cls, keys, amounts) -> "AmountSketches":
+        """Sketches of the amounts grouped by key (rows with a missing key are left out)."""
+        codes, uniques = pd.factorize(np.asarray(keys), sort=True)
+        buckets = _buckets(amounts)[codes >= 0]
+        codes = codes[codes >= 0]
+        # One sort of a combined (key, bucket) integer counts every bucket of every key
+        lowest = buckets.min(initial=0)
+        span = buckets.max(initial=0) - lowest + 1
+        pairs, counts = np.unique(codes.astype(np.int64) * span + (buckets - lowest), return_counts=True)
+        index = pd.MultiIndex.from_arrays([uniques.take(pairs // span), pairs % span + lowest],
+                                          names=["key", "bucket"])
+        return cls(pd.Series(counts.astype(np.int64), index=index))
+
+    @classmethod
+    def from_frame(cls, frame: TransactionFrame, by: str = "merchant_name") -> "AmountSketches":
+        """Sketches of a frame's amounts per merchant_name or user_id."""
+        return cls.from_amounts(frame.df[by].to_numpy(), frame.df["amount"].to_numpy())
+
+    def __len__(self) -> int:
+        """Number of keys."""
+        return self.counts.index.get_level_values(0).nunique()
+
+    def merge(self, *others: "AmountSketches") -> "AmountSketches":
+        """The sketches of all the amounts seen by self and others."""
+        counts = pd.concat([self.counts] + [other.counts for other in others])
+        return AmountSketches(counts.groupby(level=[0, 1]).sum())
+
+    def quantiles(self, q: float, keys=None) -> pd.DataFrame:
+        """
+        The q-quantile (0 <= q <= 1) of every key's amounts, in one vectorized pass.
+
+        Parameters:
+            q (float): Quantile, e.g. 0.995.
+            keys (iterable | None): Only these keys (default: all).
+
+        Returns:
+            pd.DataFrame: Indexed by key: "count" (amounts sketched) and
+                        "value" (estimated quantile), in key order.
+        """
+        counts = self.counts
+        if keys is not None:
+            counts = counts[counts.index.get_level_values(0).isin(pd.Index(keys).dropna())]
+        key_codes, key_index = pd.factorize(counts.index.get_level_values(0))
+        values = counts.to_numpy()
+        starts = np.flatnonzero(np.diff(key_codes, prepend=-1))
+        if not len(starts):
+            return pd.DataFrame({"count": np.zeros(0, dtype=np.int64), "value": np.zeros(0)},
+                                index=pd.Index(key_index, name="key"))
+
+        # Within each key, the first bucket whose running count passes rank q * (n - 1)
+        cumulative = np.cumsum(values)
+        totals = np.add.reduceat(values, starts)
+        before = cumulative[starts] - values[starts]
+        positions = np.searchsorted(cumulative, before + q * (totals - 1), side="right")
+        buckets = counts.index.get_level_values(1).to_numpy()[positions]
+        return pd.DataFrame({
+            "count": totals,
+            "value": 2 * _GAMMA ** buckets.astype(np.float64) / (_GAMMA + 1),
+        }, index=pd.Index(key_index, name="key"))
+
+
+def row_thresholds(frame: TransactionFrame, sketches: AmountSketches, by: str = "merchant_name",
+                   percentile: float = HIGH_VALUE_PERCENTILE,
+                   min_count: int = MIN_SKETCH_COUNT) -> np.ndarray:
+    """
+    Rule 1 threshold for every row: its key's percentile amount.
+
+    Parameters:
+        frame (TransactionFrame): Transactions to score.
+        sketches (AmountSketches): Amount sketches per key (see SketchStore.sketches).
+        by (str): "merchant_name" or "user_id", the column the sketches are keyed by.
+        percentile (float): Percentile of the key's amounts (0-100).
+        min_count (int): Keys with fewer sketched amounts, and rows without a
+                        key, use HIGH_VALUE_THRESHOLD instead.
+
+    Returns:
+        np.ndarray: float thresholds in original row order (see high_value_mask).
+    """
+    codes, keys = pd.factorize(frame.df[by])
+    per_key = sketches.quantiles(percentile / 100, keys)
+    value = per_key["value"].where(per_key["count"] >= min_count).reindex(keys).to_numpy()
+    value = np.append(value, np.nan)  # code -1 (missing key) reads the trailing NaN
+    thresholds = value[codes]
+    return np.where(np.isnan(thresholds), HIGH_VALUE_THRESHOLD, thresholds)
+
+
+class SketchStore:
+    """
+    Per-key amount sketches kept in SQLite and updated batch by batch.
+
+    A row per (scope, key, bucket) holds a count, so merging a batch is one
+    upsert per touched bucket, and scoring a batch reads only its own keys.
+    The scope is the key column, so merchant and user sketches share a file.
+
+    Parameters:
+        path (str): SQLite database file (":memory:" for a throwaway store).
+
+    Example:
+        with SketchStore("sketches.db") as store:
+            flagged = store.score("data/2025-01-07.csv", by="merchant_name")
+    """
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(_SCHEMA)
+
+    def __enter__(self) -> "SketchStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def update(self, sketches: AmountSketches, by: str = "merchant_name"):
+        """Merge a batch's sketches into the stored ones (one transaction)."""
+        counts = sketches.counts
+        with self.connection:
+            self.connection.executemany(_UPSERT, zip(
+                [by] * len(counts), counts.index.get_level_values(0).tolist(),
+                counts.index.get_level_values(1).tolist(), counts.tolist()))
+
+    def sketches(self, by: str = "merchant_name", keys=None) -> AmountSketches:
+        """Stored sketches of one scope, for the given keys only (default: all)."""
+        query = "SELECT key, bucket, count FROM amount_sketches WHERE scope = ?"
+        if keys is None:
+            rows = self.connection.execute(query, (by,)).fetchall()
+        else:
+            with self.connection:
+                self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (key PRIMARY KEY)")
+                self.connection.execute("DELETE FROM lookup")
+                self.connection.executemany("INSERT OR IGNORE INTO lookup VALUES (?)",
+                                            ((key,) for key in pd.Index(keys).dropna().tolist()))
+            rows = self.connection.execute(
+                f"{query} AND key IN (SELECT key FROM lookup)", (by,)).fetchall()
+        table = pd.DataFrame(rows, columns=["key", "bucket", "count"])
+        counts = table.set_index(["key", "bucket"])["count"].astype(np.int64)
+        return AmountSketches(counts.sort_index())
+
+    def score(self, source: TransactionSource, by: str = "merchant_name",
+              percentile: float = HIGH_VALUE_PERCENTILE, min_count: int = MIN_SKETCH_COUNT,
+              update: bool = True) -> pd.DataFrame:
+        """
+        Runs Rule 1 on a new batch with per-key percentile thresholds.
+
+        Parameters:
+            source (str | pd.DataFrame | TransactionFrame): The new transactions.
+            by (str): Key the thresholds are per: "merchant_name" or "user_id".
+            percentile (float): Flag amounts above this percentile of the key's amounts.
+            min_count (int): Keys with fewer amounts use HIGH_VALUE_THRESHOLD.
+            update (bool): Merge the batch into the stored sketches afterwards.
+                            Every batch must be recorded exactly once.
+
+        Returns:
+            pd.DataFrame: The flagged transactions, like flag_high_value_transactions.
+
+        Logic:
+            - Thresholds come from the stored sketches merged with the batch's
+              own, so a batch scores as it would in one run over the whole
+              history, without sorting any key's amounts.
+            - Only the batch's keys are read from the store.
+        """
+        if by not in SKETCH_KEYS:
+            raise ValueError(f"Sketches are keyed by one of {', '.join(SKETCH_KEYS)}, not {by!r}")
+        frame = as_transaction_frame(source)
+        batch = AmountSketches.from_frame(frame, by)
+        baseline = self.sketches(by, frame.df[by].unique()).merge(batch)
+        masks = np.zeros((len(frame), len(RULE_IDS)), dtype=bool)
+        masks[:, RULE_IDS.index("rule1")] = high_value_mask(
+            frame, row_thresholds(frame, baseline, by, percentile, min_count))
+        if update:
+            self.update(batch, by)
+        return flagged_frames(frame, masks)["rule1"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rule 1 with per-merchant or per-user percentile thresholds.")
+    parser.add_argument("--store", type=str, default="sketches.db", help="Sketch database (default: sketches.db)")
+    parser.add_argument("--file", type=str, default="data/input.csv", help="CSV of new transactions")
+    parser.add_argument("--by", choices=SKETCH_KEYS, default="merchant_name", help="Threshold per merchant or per user")
+    parser.add_argument("--percentile", type=float, default=HIGH_VALUE_PERCENTILE,
+                        help=f"Flag amounts above this percentile of the key's amounts (default: {HIGH_VALUE_PERCENTILE})")
+    parser.add_argument("--min-count", type=int, default=MIN_SKETCH_COUNT,
+                        help=f"Fewer amounts than this fall back to {HIGH_VALUE_THRESHOLD} (default: {MIN_SKETCH_COUNT})")
+    parser.add_argument("--no-update", action="store_true", help="Score without recording the batch")
+    args = parser.parse_args()
+    with SketchStore(args.store) as store:
+        flagged = store.score(args.file, by=args.by, percentile=args.percentile,
+                              min_count=args.min_count, update=not args.no_update)
+        print(f"rule1: {len(flagged)} flagged")
+        print(flagged)
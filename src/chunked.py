@@ -0,0 +1,139 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.fraud_detection import (
+    RAPID_WINDOW_MINUTES,
+    SAME_MERCHANT_WINDOW_SEC,
+    SPIKE_WINDOW_HOURS,
+    RULE_IDS,
+    rule_masks,
+    flagged_frames,
+    combined_flags,
+    user_stats,
+    merge_user_stats,
+    USER_STAT_COLUMNS,
+)
+from src.transaction_frame import TransactionFrame
+from src.utils import REQUIRED_COLUMNS, iter_transaction_chunks
+from src.windows import NS_PER_SECOND
+
+# A row can only be pulled into a later window while it is this close to the newest row
+MAX_WINDOW_SEC = max(RAPID_WINDOW_MINUTES * 60, SAME_MERCHANT_WINDOW_SEC, SPIKE_WINDOW_HOURS * 3600)
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def _check_time_order(epoch_ns: np.ndarray, previous_last: Optional[int]):
+    """Chunked evaluation needs the file in timestamp order (across chunks too)."""
+    if not len(epoch_ns):
+        return
+    if np.any(epoch_ns[1:] < epoch_ns[:-1]) or (previous_last is not None and epoch_ns[0] < previous_last):
+        raise ValueError("Chunked evaluation requires a CSV sorted by timestamp")
+
+
+def collect_user_stats(csv_path: str, chunksize: int = DEFAULT_CHUNKSIZE) -> pd.DataFrame:
+    """
+    First pass: per-user aggregates for rules 4 and 5, merged chunk by chunk.
+
+    Parameters:
+        csv_path (str): Path to a time-ordered transactions CSV.
+        chunksize (int): Rows per chunk.
+
+    Returns:
+        pd.DataFrame: user_stats of the whole file (indexed by user_id).
+    """
+    stats = pd.DataFrame(columns=USER_STAT_COLUMNS, dtype=np.int64)
+    previous_last = None
+    for chunk in iter_transaction_chunks(csv_path, chunksize):
+        frame = TransactionFrame(chunk)
+        _check_time_order(frame.epoch_ns, previous_last)
+        if len(frame):
+            previous_last = frame.epoch_ns[-1]
+        stats = merge_user_stats(stats, user_stats(frame))
+    return stats
+
+
+def evaluate_rules_chunked(csv_path: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                           stats: Optional[pd.DataFrame] = None, combined: bool = False,
+                           backend: str = "auto"):
+    """
+    Runs every rule over a time-ordered CSV in bounded-size chunks.
+
+    Parameters:
+        csv_path (str): Path to a CSV sorted by timestamp.
+        chunksize (int): Rows per chunk.
+        stats (pd.DataFrame | None): Precomputed user_stats for the whole file;
+                        collected in a first pass when omitted.
+        combined (bool): Return one combined_flags frame (one row per flagged
+                        transaction with a rule bitmask) instead of one frame per rule.
+        backend (str): Window-scan backend (see WindowIndex).
+
+    Returns:
+        dict: Rule id ("rule1".."rule5") -> DataFrame of flagged transactions,
+              identical to evaluate_rules on the fully loaded file
+              (or a single DataFrame with combined=True).
+
+    Logic:
+        - Pass 1 merges exact per-user aggregates (count, hour sums, first/last
+          timestamp), which is all rules 4 and 5 need from the whole file.
+        - Pass 2 prepends the carried tail (rows within the longest rule window
+          of the newest row, i.e. every user's and user/merchant's trailing
+          window) to each chunk and evaluates only the windows ending at new rows.
+        - Rows older than the longest window can no longer be flagged by a
+          later window; they are emitted and dropped, so memory holds one chunk
+          plus the tail (plus the flagged output) however large the file is.
+    """
+    if stats is None:
+        stats = collect_user_stats(csv_path, chunksize)
+    finalize_after = int(MAX_WINDOW_SEC * NS_PER_SECOND)
+
+    flagged = {rule_id: [] for rule_id in RULE_IDS}
+    combined_parts = []
+    tail = None
+    tail_flags = np.zeros((0, len(RULE_IDS)), dtype=bool)
+    previous_last = None
+
+    def emit(frame: TransactionFrame, rows: np.ndarray, flags: np.ndarray):
+        if combined:
+            combined_parts.append(combined_flags(frame, flags & rows[:, None]))
+            return
+        for rule_id, part in flagged_frames(frame, flags & rows[:, None]).items():
+            flagged[rule_id].append(part)
+
+    for chunk in iter_transaction_chunks(csv_path, chunksize):
+        current = chunk if tail is None else pd.concat([tail, chunk])
+        frame = TransactionFrame(current, backend=backend)
+        _check_time_order(frame.epoch_ns[len(tail_flags):], previous_last)
+        if not len(frame):
+            continue
+
+        # Only windows ending at the new rows still need evaluating
+        is_new = np.zeros(len(frame), dtype=bool)
+        is_new[len(tail_flags):] = True
+        flags = rule_masks(frame, stats, ending_at=is_new)
+        flags[:len(tail_flags)] |= tail_flags
+
+        previous_last = frame.epoch_ns[-1]
+        final = frame.epoch_ns < previous_last - finalize_after
+        emit(frame, final, flags)
+        tail, tail_flags = current[~final], flags[~final]
+
+    if tail is not None:
+        frame = TransactionFrame(tail, backend=backend)
+        emit(frame, np.ones(len(frame), dtype=bool), tail_flags)
+
+    if combined:
+        if combined_parts:
+            return pd.concat(combined_parts)
+        return pd.DataFrame(columns=REQUIRED_COLUMNS + ["rules"])
+
+    results = {}
+    for rule_id, parts in flagged.items():
+        if parts:
+            results[rule_id] = pd.concat(parts)
+        else:
+            columns = REQUIRED_COLUMNS + (["hour"] if rule_id == "rule4" else [])
+            results[rule_id] = pd.DataFrame(columns=columns)
+    return results
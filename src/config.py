@@ -0,0 +1,38 @@
+"""
+Rule thresholds and identifiers, shared by every scoring path.
+
+Standard library only: the lightweight scorer (src.lite) and the streaming
+monitor import these without loading pandas or NumPy.
+"""
+
+NS_PER_SECOND = 1_000_000_000
+
+# Rule 1: High-Value Transactions Threshold
+HIGH_VALUE_THRESHOLD = 7000  # Transactions above this amount are flagged as suspicious
+
+# Rule 2: Rapid Small Transactions
+RAPID_WINDOW_MINUTES = 2          # 2 minutes window
+RAPID_TX_THRESHOLD = 5            # Transactions
+
+# Rule 3: Same-Merchant Transactions Threshold
+SAME_MERCHANT_THRESHOLD = 3       # Transactions
+SAME_MERCHANT_WINDOW_SEC = 90     # 90 seconds window
+
+# Rule 4: Unusual Time-of-Day
+STD_MULTIPLIER = 2  # Transactions outside mean ± 2*std hours are flagged
+
+# Rule 5: User-Specific High-Value Transactions
+SPIKE_WINDOW_HOURS = 3          # window to check for spikes
+SPIKE_MULTIPLIER = 2            # threshold multiplier over average transactions/hour
+MIN_TX_IN_WINDOW = 3            # minimum transactions in a window to consider it a spike
+
+RULE_IDS = ["rule1", "rule2", "rule3", "rule4", "rule5"]
+
+# Rule id -> report label, in reporting order
+RULE_LABELS = {
+    "rule1": "High-value transactions",
+    "rule2": "Rapid small transactions",
+    "rule3": "Same-merchant transactions",
+    "rule4": "Unusual time transactions",
+    "rule5": "High-frequency transactions",
+}
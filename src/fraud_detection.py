@@ -1,29 +1,422 @@
+from typing import Optional, Union
+
+# Rule thresholds live in src.config, importable without pandas; re-exported here
+from src.config import (
+    HIGH_VALUE_THRESHOLD,
+    RAPID_WINDOW_MINUTES,
+    RAPID_TX_THRESHOLD,
+    SAME_MERCHANT_THRESHOLD,
+    SAME_MERCHANT_WINDOW_SEC,
+    STD_MULTIPLIER,
+    SPIKE_WINDOW_HOURS,
+    SPIKE_MULTIPLIER,
+    MIN_TX_IN_WINDOW,
+    RULE_IDS,
+)
 from src.utils import load_transactions
+from src.transaction_frame import TransactionFrame
+from src.windows import NS_PER_SECOND, WindowIndex, mark_windows
 import pandas as pd
 import numpy as np
 
-# Rule 1: High-Value Transactions Threshold
-HIGH_VALUE_THRESHOLD = 7000  # Transactions above this amount are flagged as suspicious
+# A rule input: a CSV path, an already-loaded DataFrame or a shared TransactionFrame
+TransactionSource = Union[str, pd.DataFrame, TransactionFrame]
 
-# Rule 3: Same-Merchant Transactions Threshold
-SAME_MERCHANT_THRESHOLD = 3       # Transactions
-SAME_MERCHANT_WINDOW_SEC = 90     # 90 seconds window
 
-# Rule 4: Unusual Time-of-Day
-STD_MULTIPLIER = 2  # Transactions outside mean ± 2*std hours are flagged
+def as_transaction_frame(source: TransactionSource) -> TransactionFrame:
+    """
+    Wrap a rule input in a TransactionFrame.
+
+    Passing the same TransactionFrame to several rules lets them share the
+    parsed timestamps and sorted views instead of reloading the CSV each time.
+    """
+    if isinstance(source, TransactionFrame):
+        return source
+    if isinstance(source, pd.DataFrame):
+        return TransactionFrame(source)
+    return TransactionFrame(load_transactions(source))
+
+
+def _to_ns(seconds: float) -> int:
+    """Window length in seconds -> integer nanoseconds."""
+    return int(round(seconds * NS_PER_SECOND))
+
+
+def _window_mask(frame: TransactionFrame, order: np.ndarray, starts: np.ndarray,
+                 hits: np.ndarray, ending_at: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Marks every transaction inside a qualifying window.
+
+    Parameters:
+        frame (TransactionFrame): The transactions the windows were computed on.
+        order (np.ndarray): Row positions of the sorted order the windows refer to.
+        starts (np.ndarray): Window start (sorted position) for every sorted row.
+        hits (np.ndarray): Boolean, True where the window ending at that row qualifies.
+        ending_at (np.ndarray | None): Optional boolean mask (original row order);
+                        only windows ending at these rows are considered.
+
+    Returns:
+        np.ndarray: Boolean mask of flagged transactions in original row order.
+    """
+    if ending_at is not None:
+        hits = hits & ending_at[order]
+    mask = np.zeros(len(frame), dtype=bool)
+    mask[order] = _covered_rows(starts, hits)
+    return mask
+
+
+def _covered_rows(starts: np.ndarray, hits: np.ndarray) -> np.ndarray:
+    """Rows (in the sorted order) inside any qualifying window; see _window_mask."""
+    # Each hit is recorded as a (start, end) interval and merged in one linear pass
+    ends = np.flatnonzero(hits)
+    return mark_windows(starts[ends], ends, len(hits))
+
+
+USER_STAT_COLUMNS = ["count", "hour_sum", "hour_sq_sum", "hour_cos_sum", "hour_sin_sum",
+                     "first_ns", "last_ns"]
+
+# Hour of day as an angle on the 24-hour clock (23:00 and 01:00 are 30 degrees apart)
+HOUR_ANGLES = 2 * np.pi * np.arange(24) / 24
+
+
+def user_stats(frame: TransactionFrame) -> pd.DataFrame:
+    """
+    Per-user aggregates behind rules 4 and 5, indexed by user_id.
+
+    Columns:
+        count, hour_sum, hour_sq_sum: transaction count and the integer sums of
+                        the hour of day and its square (mean/std for rule 4).
+        hour_cos_sum, hour_sin_sum: sums of the hour's position on the 24-hour
+                        clock (circular mean/std for rule 4 with circular=True).
+        first_ns, last_ns: first and last timestamp (average rate for rule 5).
+
+    All columns are mergeable (see merge_user_stats), so statistics gathered
+    chunk by chunk equal those of the whole file; all but the circular sums
+    are exact integers. Transactions with a missing user_id are left out,
+    as the baseline's groupby skipped them.
+    """
+    index = frame.user_time_index
+    offsets = index.group_offsets
+    hours = frame.hours.to_numpy().astype(np.int64)[frame.user_time_order]
+    # The group of missing user_ids (code -1, sorted first) has no row
+    known = _group_codes(frame) >= 0
+
+    def per_user_sum(values: np.ndarray) -> np.ndarray:
+        return (np.add.reduceat(values, offsets[:-1]) if len(values) else values)[known]
+
+    return pd.DataFrame({
+        "count": np.diff(offsets)[known],
+        "hour_sum": per_user_sum(hours),
+        "hour_sq_sum": per_user_sum(hours * hours),
+        "hour_cos_sum": per_user_sum(np.cos(HOUR_ANGLES)[hours]),
+        "hour_sin_sum": per_user_sum(np.sin(HOUR_ANGLES)[hours]),
+        "first_ns": index.times[offsets[:-1]][known],
+        "last_ns": index.times[offsets[1:] - 1][known],
+    }, index=pd.Index(frame.user_ids, name="user_id"))
+
+
+def merge_user_stats(*stats: pd.DataFrame) -> pd.DataFrame:
+    """Combine user_stats computed on disjoint parts of the same transactions."""
+    return pd.concat(stats).groupby(level=0).agg({
+        "count": "sum",
+        "hour_sum": "sum",
+        "hour_sq_sum": "sum",
+        "hour_cos_sum": "sum",
+        "hour_sin_sum": "sum",
+        "first_ns": "min",
+        "last_ns": "max",
+    })
+
+
+def _known_users(frame: TransactionFrame) -> np.ndarray:
+    """
+    Rows of the user_time_order with a user_id. The baseline's groupby dropped
+    missing keys, so rows without one never fall in a rule 2, 3 or 5 window.
+    """
+    return frame.user_codes[frame.user_time_order] >= 0
 
-# Rule 5: User-Specific High-Value Transactions
-SPIKE_WINDOW_HOURS = 3          # window to check for spikes
-SPIKE_MULTIPLIER = 2            # threshold multiplier over average transactions/hour
-MIN_TX_IN_WINDOW = 3            # minimum transactions in a window to consider it a spike
 
+def _group_codes(frame: TransactionFrame) -> np.ndarray:
+    """User code of each group of frame.user_time_index (-1 for the group of missing user_ids)."""
+    return frame.user_codes[frame.user_time_order[frame.user_time_index.group_offsets[:-1]]]
 
-def flag_high_value_transactions(csv_path: str) -> pd.DataFrame:
+
+def _per_group_stats(frame: TransactionFrame, stats: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """
+    user_stats aligned to the frame's user codes (row g = user code g), plus a
+    last all-zero row that code -1 (a missing user_id) selects, so rules 4 and
+    5 never flag those rows. Index the columns by frame.user_codes per row, or
+    by _group_codes per group of the user_time_index.
+    """
+    per_user = user_stats(frame) if stats is None else stats.reindex(frame.user_ids)
+    missing = pd.DataFrame(0, index=[0], columns=per_user.columns)
+    return pd.concat([per_user, missing], ignore_index=True)
+
+
+def high_value_mask(frame: TransactionFrame, thresholds: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Rule 1 as a boolean mask in original row order.
+
+    Parameters:
+        frame (TransactionFrame): Transactions to score.
+        thresholds (np.ndarray | None): One threshold per row (e.g. per-merchant
+                        percentiles, see amount_sketches.row_thresholds) instead
+                        of HIGH_VALUE_THRESHOLD.
+    """
+    threshold = HIGH_VALUE_THRESHOLD if thresholds is None else thresholds
+    return frame.df["amount"].to_numpy() > threshold
+
+
+def rapid_small_mask(frame: TransactionFrame,
+                     ending_at: Optional[np.ndarray] = None) -> np.ndarray:
+    """Rule 2 as a boolean mask in original row order (see flag_rapid_small_transactions)."""
+    index = frame.user_time_index
+    window = _to_ns(RAPID_WINDOW_MINUTES * 60)
+
+    # Windows holding 5 transactions in 2 minutes, over all users at once;
+    # window starts are only looked up for those (see WindowIndex.at_least)
+    hits = index.at_least(window, RAPID_TX_THRESHOLD) & _known_users(frame)
+    mask = np.zeros(len(frame), dtype=bool)
+    mask[frame.user_time_order] = _covered_ends(frame, "rule2", index, window, hits, ending_at)
+    return mask
+
+
+def _covered_ends(frame: TransactionFrame, rule_id: str, index: WindowIndex, window: int,
+                  hits: np.ndarray, ending_at: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Rows (in the frame's user_time_order) inside any qualifying window, looking
+    up only the qualifying windows' starts; records the pruning in frame.pruning.
+    """
+    if ending_at is not None:
+        hits = hits & ending_at[frame.user_time_order]
+    ends = np.flatnonzero(hits)
+    _record_pruning(frame, rule_id, index, ends, len(ends))
+    return mark_windows(index.starts_at(window, ends), ends, len(hits))
+
+
+def _record_pruning(frame: TransactionFrame, rule_id: str, index: WindowIndex,
+                    candidates: np.ndarray, scanned_rows: int) -> None:
+    """frame.pruning[rule_id]: users and rows in total vs. left after the pre-filter."""
+    frame.pruning[rule_id] = {
+        "users": len(index.group_offsets) - 1,
+        "candidate_users": int(np.count_nonzero(np.diff(index.group_ids[candidates], prepend=-1))),
+        "rows": len(index),
+        "scanned_rows": int(scanned_rows),
+    }
+
+
+def same_merchant_mask(frame: TransactionFrame,
+                       ending_at: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Rule 3 as a boolean mask in original row order (see flag_same_merchant_transactions).
+
+    Logic:
+        - Pre-filter: 3 transactions at one merchant within 90 seconds are 3
+          transactions of the user within 90 seconds, an O(n) shifted
+          comparison on the (user_id, timestamp) order (WindowIndex.at_least).
+          Users and rows that cannot qualify are pruned; the pruning is
+          recorded in frame.pruning["rule3"].
+        - The exact (user, merchant) window scan runs only over the user
+          windows ending at candidate rows, which hold every transaction a
+          qualifying merchant window can contain.
+    """
+    user_index = frame.user_time_index
+    window = _to_ns(SAME_MERCHANT_WINDOW_SEC)
+    candidates = user_index.at_least(window, SAME_MERCHANT_THRESHOLD) & _known_users(frame)
+    if ending_at is not None:
+        candidates &= ending_at[frame.user_time_order]
+    ends = np.flatnonzero(candidates)
+    involved = mark_windows(user_index.starts_at(window, ends), ends, len(frame))
+    rows = frame.user_time_order[involved]
+
+    # Windows are computed per (user, merchant) pair over one sorted array of the candidate rows
+    merchants = frame.merchant_codes.astype(np.int64)[rows] + 1  # missing names are code -1
+    users = frame.user_codes[rows]
+    order = rows[np.argsort(users.astype(np.int64) * (merchants.max(initial=0) + 1) + merchants, kind="stable")]
+    index = WindowIndex(frame.epoch_ns[order], frame.user_codes[order], frame.merchant_codes[order],
+                        backend=frame.backend)
+    # A missing merchant_name is not a merchant (the baseline's groupby dropped it)
+    hits = (index.counts(window) >= SAME_MERCHANT_THRESHOLD) & (frame.merchant_codes[order] >= 0)
+    _record_pruning(frame, "rule3", user_index, ends, len(rows))
+    return _window_mask(frame, order, index.starts(window), hits, ending_at)
+
+
+def unusual_time_mask(frame: TransactionFrame, stats: Optional[pd.DataFrame] = None,
+                      circular: bool = False) -> np.ndarray:
+    """
+    Rule 4 as a boolean mask in original row order (see flag_unusual_time_transactions).
+
+    Parameters:
+        frame (TransactionFrame): Transactions to score.
+        stats (pd.DataFrame | None): user_stats to score against; defaults to the
+                        statistics of the frame itself.
+        circular (bool): Measure hours on the 24-hour clock: circular mean and
+                        std, and the shorter way round the clock as the
+                        distance (a night owl's 01:00 is close to their 23:00).
+    """
+    per_user = _per_group_stats(frame, stats)
+    codes = frame.user_codes
+    n = per_user["count"].to_numpy()[codes]
+    hours = frame.hours.to_numpy().astype(np.int64)
+    if circular:
+        return (n >= 2) & _circular_outliers(hours, n, per_user["hour_cos_sum"].to_numpy()[codes],
+                                             per_user["hour_sin_sum"].to_numpy()[codes])
+    total = per_user["hour_sum"].to_numpy()[codes]
+    squares = per_user["hour_sq_sum"].to_numpy()[codes]
+
+    # |hour - mean| > STD_MULTIPLIER * std, multiplied through by n so it stays exact:
+    # (n * hour - sum)^2 > STD_MULTIPLIER^2 * (n * sum_sq - sum^2)
+    deviation = n * hours - total
+    spread = n * squares - total * total
+    return (n >= 2) & (deviation * deviation > STD_MULTIPLIER ** 2 * spread)
+
+
+def _circular_outliers(hours: np.ndarray, n: np.ndarray, cos_sum: np.ndarray,
+                       sin_sum: np.ndarray) -> np.ndarray:
+    """Hours further round the clock from the circular mean than STD_MULTIPLIER circular stds."""
+    mean_angle = np.arctan2(sin_sum, cos_sum)
+    resultant = np.clip(np.hypot(cos_sum, sin_sum) / np.maximum(n, 1), 1e-300, 1)
+    spread = np.sqrt(-2 * np.log(resultant))  # circular std, radians
+    distance = np.abs(np.angle(np.exp(1j * (HOUR_ANGLES[hours] - mean_angle))))
+    # The tolerance keeps rounding noise from flagging users who always transact at one hour
+    return distance > STD_MULTIPLIER * spread + 1e-9
+
+
+def transaction_spike_mask(frame: TransactionFrame, stats: Optional[pd.DataFrame] = None,
+                           ending_at: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Rule 5 as a boolean mask in original row order (see flag_transaction_spikes).
+
+    Parameters:
+        frame (TransactionFrame): Transactions to score.
+        stats (pd.DataFrame | None): user_stats giving each user's size and time
+                        span; defaults to the statistics of the frame itself.
+        ending_at (np.ndarray | None): Only consider windows ending at these rows.
+    """
+    index = frame.user_time_index
+    per_user = _per_group_stats(frame, stats).iloc[_group_codes(frame)]
+    sizes = per_user["count"].to_numpy()
+    span_ns = per_user["last_ns"].to_numpy() - per_user["first_ns"].to_numpy()
+
+    # compute average transactions per hour
+    total_hours = np.maximum(span_ns / NS_PER_SECOND / 3600, 1)
+    avg_tx_per_hour = sizes / total_hours
+    threshold = (SPIKE_MULTIPLIER * avg_tx_per_hour)[index.group_ids]
+    enough_data = (sizes >= MIN_TX_IN_WINDOW)[index.group_ids]  # not enough data to form a spike
+
+    window = _to_ns(SPIKE_WINDOW_HOURS * 3600)
+    window_count = index.counts(window)
+    hits = enough_data & (window_count >= threshold) & (window_count >= MIN_TX_IN_WINDOW)
+    return _window_mask(frame, frame.user_time_order, index.starts(window), hits, ending_at)
+
+
+# Rule id -> mask function; each takes just the frame (see rule_masks for the options)
+RULE_MASKS = dict(zip(RULE_IDS, [
+    high_value_mask,
+    rapid_small_mask,
+    same_merchant_mask,
+    unusual_time_mask,
+    transaction_spike_mask,
+]))
+
+
+def rule_masks(frame: TransactionFrame, stats: Optional[pd.DataFrame] = None,
+               ending_at: Optional[np.ndarray] = None, circular: bool = False) -> np.ndarray:
+    """
+    All five rules as one boolean matrix.
+
+    Parameters:
+        frame (TransactionFrame): Transactions to score.
+        stats (pd.DataFrame | None): user_stats for rules 4 and 5 (default: the frame's own).
+        ending_at (np.ndarray | None): Only consider windows ending at these rows (rules 2, 3, 5).
+        circular (bool): Rule 4 on the 24-hour clock (see unusual_time_mask).
+
+    Returns:
+        np.ndarray: Shape (rows, 5); column k is the mask of RULE_IDS[k].
+    """
+    return fused_rule_masks(frame, stats, ending_at, circular)
+
+
+def fused_rule_masks(frame: TransactionFrame, stats: Optional[pd.DataFrame] = None,
+                     ending_at: Optional[np.ndarray] = None, circular: bool = False) -> np.ndarray:
+    """
+    All five rules over shared preprocessing (the result of rule_masks).
+
+    Parameters:
+        frame (TransactionFrame): Transactions to score.
+        stats (pd.DataFrame | None): user_stats for rules 4 and 5 (default: the frame's own).
+        ending_at (np.ndarray | None): Only consider windows ending at these rows (rules 2, 3, 5).
+        circular (bool): Rule 4 on the 24-hour clock (see unusual_time_mask).
+
+    Returns:
+        np.ndarray: Shape (rows, 5); column k is the mask of RULE_IDS[k].
+
+    Logic:
+        - Every column comes from the rule's own mask function, so each rule
+          has one implementation. They share the frame's (user_id, timestamp)
+          order and its WindowIndex (one timestamp ranking for every window
+          length), and rules 4 and 5 share one user_stats, computed once.
+        - Rule 3 scores only the rows its pre-filter leaves (see same_merchant_mask).
+    """
+    if stats is None:
+        stats = user_stats(frame)
+    masks = np.empty((len(frame), len(RULE_IDS)), dtype=bool)
+    masks[:, 0] = high_value_mask(frame)
+    masks[:, 1] = rapid_small_mask(frame, ending_at)
+    masks[:, 2] = same_merchant_mask(frame, ending_at)
+    masks[:, 3] = unusual_time_mask(frame, stats, circular)
+    masks[:, 4] = transaction_spike_mask(frame, stats, ending_at)
+    return masks
+
+
+def flagged_frames(frame: TransactionFrame, masks: np.ndarray) -> dict:
+    """
+    Rule id -> DataFrame of flagged transactions, shaped like the flag_* results.
+
+    Parameters:
+        frame (TransactionFrame): The scored transactions.
+        masks (np.ndarray): Boolean matrix as returned by rule_masks.
+    """
+    results = {}
+    for k, rule_id in enumerate(RULE_IDS):
+        if rule_id == "rule1":
+            results[rule_id] = frame.df[masks[:, k]]
+        elif rule_id == "rule4":
+            flagged = frame.select(masks[:, k])
+            results[rule_id] = flagged.assign(hour=frame.hours.loc[flagged.index])
+        else:
+            results[rule_id] = frame.select(masks[:, k])
+    return results
+
+
+def combined_flags(frame: TransactionFrame, masks: np.ndarray) -> pd.DataFrame:
+    """
+    One row per transaction flagged by any rule, in index order, with a
+    "rules" bitmask column: bit k is set when RULE_IDS[k] flagged the row
+    (rule1 = 1, rule2 = 2, rule3 = 4, rule4 = 8, rule5 = 16).
+
+    Parameters:
+        frame (TransactionFrame): The scored transactions.
+        masks (np.ndarray): Boolean matrix as returned by rule_masks.
+    """
+    bits = pd.Series((masks @ (1 << np.arange(len(RULE_IDS)))).astype(np.uint8), index=frame.df.index)
+    flagged = frame.select(bits.to_numpy() != 0)
+    return flagged.assign(rules=bits.loc[flagged.index])
+
+
+def rule_counts(combined: pd.DataFrame) -> dict:
+    """Rule id -> number of rows of a combined_flags frame that the rule flagged."""
+    rules = combined["rules"].to_numpy()
+    return {rule_id: int(np.count_nonzero(rules & (1 << k))) for k, rule_id in enumerate(RULE_IDS)}
+
+
+def flag_high_value_transactions(csv_path: TransactionSource) -> pd.DataFrame:
     """
     Flags transactions that exceed a high-value threshold.
 
     Parameters:
-        csv_path (str): Path to the input CSV file containing transactions.
+        csv_path (str | pd.DataFrame | TransactionFrame): Path to the input CSV file
+                        containing transactions, or the already-loaded transactions.
                         CSV must have columns: user_id, timestamp, merchant_name, amount.
 
     Returns:
@@ -38,23 +431,23 @@ def flag_high_value_transactions(csv_path: str) -> pd.DataFrame:
         flagged = flag_high_value_transactions("data/input.csv")
         print(flagged)
     """
-    # Load transactions using the utility function
-    df = load_transactions(csv_path)
+    frame = as_transaction_frame(csv_path)
 
     # Filter transactions above the threshold
-    flagged = df[df["amount"] > HIGH_VALUE_THRESHOLD]
+    flagged = frame.df[high_value_mask(frame)]
 
     # Return the flagged transactions
     return flagged
 
 
-def flag_rapid_small_transactions(csv_path: str) -> pd.DataFrame:
+def flag_rapid_small_transactions(csv_path: TransactionSource) -> pd.DataFrame:
     """
     Flags users who make 5 or more transactions within a 2-minute window.
     Designed for live/continuous fraud monitoring.
 
     Parameters:
-        csv_path (str): Path to the input CSV file.
+        csv_path (str | pd.DataFrame | TransactionFrame): Path to the input CSV file,
+                        or the already-loaded transactions.
 
     Returns:
         pd.DataFrame: All transactions that are part of rapid small transaction bursts.
@@ -63,103 +456,49 @@ def flag_rapid_small_transactions(csv_path: str) -> pd.DataFrame:
         - Fixed 2-minute window for rapid detection.
         - Threshold of 5 transactions within window triggers a flag.
     """
-    df = load_transactions(csv_path)
-    df = df.sort_values(by=["user_id", "timestamp"])
-    
-    window_minutes = 2
-    transaction_count_threshold = 5
-    flagged_indices = []
-
-    for user, user_df in df.groupby("user_id"):
-        timestamps = user_df["timestamp"].tolist()
-        n = len(timestamps)
-        start = 0
-        
-        for end in range(n):
-            # Move start pointer forward if outside the window
-            while (timestamps[end] - timestamps[start]).total_seconds() / 60 > window_minutes:
-                start += 1
-            # Flag if window has threshold or more transactions
-            if (end - start + 1) >= transaction_count_threshold:
-                flagged_indices.extend(user_df.iloc[start:end+1].index.tolist())
-
-    flagged = df.loc[sorted(set(flagged_indices))]
-    return flagged
+    frame = as_transaction_frame(csv_path)
+
+    # Flag every transaction inside a 2-minute window that reached the threshold
+    return frame.select(rapid_small_mask(frame))
 
 
-def flag_same_merchant_transactions(csv_path: str) -> pd.DataFrame:
+def flag_same_merchant_transactions(csv_path: TransactionSource) -> pd.DataFrame:
     """
     Flags transactions where a user makes 3 or more transactions
     at the same merchant within a 90-second window.
 
     Parameters:
-        csv_path (str): Path to the CSV containing transactions.
+        csv_path (str | pd.DataFrame | TransactionFrame): Path to the CSV containing
+                        transactions, or the already-loaded transactions.
                         CSV must have columns: user_id, timestamp, merchant_name, amount.
 
     Returns:
         pd.DataFrame: All flagged transactions.
     """
-    df = load_transactions(csv_path)
-    df = df.sort_values(by=["user_id", "merchant_name", "timestamp"])
-    
-    flagged_indices = []
-
-    # Group by user and merchant
-    for (user, merchant), group in df.groupby(["user_id", "merchant_name"]):
-        timestamps = group["timestamp"].tolist()
-        n = len(timestamps)
-        start = 0
-        
-        for end in range(n):
-            # Move start pointer if outside the 90-second window
-            while (timestamps[end] - timestamps[start]).total_seconds() > SAME_MERCHANT_WINDOW_SEC:
-                start += 1
-            if (end - start + 1) >= SAME_MERCHANT_THRESHOLD:
-                flagged_indices.extend(group.iloc[start:end+1].index.tolist())
-
-    flagged = df.loc[sorted(set(flagged_indices))]
-    return flagged
+    frame = as_transaction_frame(csv_path)
+    return frame.select(same_merchant_mask(frame))
 
 
-def flag_unusual_time_transactions(csv_path: str) -> pd.DataFrame:
+def flag_unusual_time_transactions(csv_path: TransactionSource) -> pd.DataFrame:
     """
     Flags transactions occurring at unusual times for each user.
 
     Parameters:
-        csv_path (str): Path to CSV with columns: user_id, timestamp, merchant_name, amount.
+        csv_path (str | pd.DataFrame | TransactionFrame): Path to CSV with columns:
+                        user_id, timestamp, merchant_name, amount, or the
+                        already-loaded transactions.
 
     Returns:
         pd.DataFrame: Transactions flagged for unusual time-of-day.
     """
-    df = load_transactions(csv_path)
-
-    # Ensure timestamp column is datetime type
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-    
-    # Extract transaction hour (0-23) as float
-    df["hour"] = df["timestamp"].dt.hour.astype(float)
-
-    flagged_indices = []
+    frame = as_transaction_frame(csv_path)
 
-    # Group by user
-    for user, group in df.groupby("user_id"):
-        hours = group["hour"]
-        if len(hours) < 2:
-            continue  # Not enough data to compute deviation
-        mean_hour = hours.mean()
-        std_hour = hours.std(ddof=0)  # use population std for consistency
-        lower = mean_hour - STD_MULTIPLIER * std_hour
-        upper = mean_hour + STD_MULTIPLIER * std_hour
-
-        # Flag transactions outside typical range
-        outlier_mask = (hours < lower) | (hours > upper)
-        flagged_indices.extend(group.index[outlier_mask].tolist())
-
-    flagged = df.loc[sorted(set(flagged_indices))]
-    return flagged
+    # Flag transactions outside the user's mean ± STD_MULTIPLIER * std hour
+    flagged = frame.select(unusual_time_mask(frame))
+    return flagged.assign(hour=frame.hours.loc[flagged.index])
 
 
-def flag_transaction_spikes(csv_path: str) -> pd.DataFrame:
+def flag_transaction_spikes(csv_path: TransactionSource) -> pd.DataFrame:
     """
     Flags transactions that exceed a user’s typical frequency.
     A sliding time window (e.g., 3 hours) is used, and
@@ -167,37 +506,15 @@ def flag_transaction_spikes(csv_path: str) -> pd.DataFrame:
     is at least twice the user’s average transactions per hour.
 
     Parameters:
-        csv_path (str): Path to CSV with columns: user_id, timestamp, merchant_name, amount.
+        csv_path (str | pd.DataFrame | TransactionFrame): Path to CSV with columns:
+                        user_id, timestamp, merchant_name, amount, or the
+                        already-loaded transactions.
 
     Returns:
         pd.DataFrame: Transactions flagged for unusually high frequency.
     """
-    df = pd.read_csv(csv_path)
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-    df = df.sort_values(by=["user_id", "timestamp"])
-
-    flagged_indices = []
-
-    for user, group in df.groupby("user_id"):
-        times = group["timestamp"].tolist()
-        n = len(times)
-        if n < MIN_TX_IN_WINDOW:
-            continue  # not enough data to form a spike
-
-        # compute average transactions per hour
-        total_hours = max((max(times) - min(times)).total_seconds() / 3600, 1)
-        avg_tx_per_hour = n / total_hours
-        threshold = SPIKE_MULTIPLIER * avg_tx_per_hour
-
-        start = 0
-        for end in range(n):
-            while (times[end] - times[start]).total_seconds() / 3600 > SPIKE_WINDOW_HOURS:
-                start += 1
-            window_count = end - start + 1
-            if window_count >= threshold and window_count >= MIN_TX_IN_WINDOW:
-                flagged_indices.extend(group.iloc[start:end+1].index.tolist())
-
-    return df.loc[sorted(set(flagged_indices))]
+    frame = as_transaction_frame(csv_path)
+    return frame.select(transaction_spike_mask(frame))
 
 
 # if __name__ == "__main__":
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    NS_PER_SECOND,
+    RAPID_WINDOW_MINUTES,
+    RULE_IDS,
+    SAME_MERCHANT_WINDOW_SEC,
+    SPIKE_WINDOW_HOURS,
+)
+from src.transaction_frame import TransactionFrame
+
+# Rule id -> (keys its windows are grouped by, window in seconds); rules 1 and 4
+# score single transactions, so each of their flags is an incident of its own
+EPISODE_RULES = {
+    "rule2": (("user_codes",), RAPID_WINDOW_MINUTES * 60),
+    "rule3": (("user_codes", "merchant_codes"), SAME_MERCHANT_WINDOW_SEC),
+    "rule5": (("user_codes",), SPIKE_WINDOW_HOURS * 3600),
+}
+
+INCIDENT_COLUMNS = ["rule", "user_id", "merchant_name", "start", "end", "transactions",
+                    "total_amount", "rows"]
+
+
+def _episodes(frame: TransactionFrame, mask: np.ndarray, keys: tuple = (), window: float = 0):
+    """
+    Flagged row positions of one rule in (keys, timestamp) order, and the
+    position in them where each episode starts: a flagged row continues the
+    episode of the row before it in its group when that row is flagged too
+    and at most window seconds earlier.
+
+    Only the transactions of users with a flag are sorted; every other user
+    contributes nothing to the episodes.
+    """
+    flagged = np.flatnonzero(mask)
+    if not keys or not len(flagged):
+        return flagged, np.arange(len(flagged))
+    users = frame.user_codes.astype(np.int64) + 1  # missing ids are code -1
+    involved = np.zeros(users.max() + 1, dtype=bool)
+    involved[users[flagged]] = True
+    rows = np.flatnonzero(involved[users])
+    # lexsort is stable, so ties keep row order like the frame's sorted views
+    codes = [getattr(frame, key)[rows] for key in keys]
+    order = np.lexsort([frame.epoch_ns[rows]] + codes[::-1])
+    rows = rows[order]
+    codes = [key_codes[order] for key_codes in codes]
+    times = frame.epoch_ns[rows]
+
+    # One linear pass: an episode starts at a flagged row whose predecessor is
+    # unflagged, belongs to another group or lies outside the window
+    hit = mask[rows]
+    same_group = np.logical_and.reduce([key_codes[1:] == key_codes[:-1] for key_codes in codes])
+    overlaps = np.diff(times) <= int(round(window * NS_PER_SECOND))
+    continues = np.concatenate(([False], hit[:-1] & same_group & overlaps))
+    return rows[hit], np.flatnonzero(~continues[hit])
+
+
+def incident_records(frame: TransactionFrame, masks: np.ndarray) -> pd.DataFrame:
+    """
+    Collapse the flagged transactions of each rule into incidents.
+
+    Rules 2, 3 and 5 flag every transaction of every qualifying window, so a
+    burst that keeps qualifying flags a long run of transactions. Here each
+    run of consecutive flagged transactions of one user (one user and
+    merchant for rule 3), in time order, each within the rule's window of
+    the one before, is one incident. Rules 1 and 4 give one incident per
+    flagged transaction.
+
+    Parameters:
+        frame (TransactionFrame): The scored transactions.
+        masks (np.ndarray): Boolean matrix as returned by rule_masks.
+
+    Returns:
+        pd.DataFrame: One row per incident, indexed 0..n-1 and ordered by rule,
+                        then user (and merchant), then time. Columns: rule,
+                        user_id, merchant_name (rule 3 only, else missing),
+                        start and end (first and last timestamp), transactions,
+                        total_amount, and rows (the members' index labels).
+                        Every flagged row is a member of exactly one incident
+                        of each rule that flagged it.
+
+    Example:
+        incidents = incident_records(frame, rule_masks(frame))
+        print(incidents[incidents["rule"] == "rule3"])
+    """
+    labels = frame.df.index.to_numpy()
+    amounts = frame.df["amount"].to_numpy(dtype=np.float64)
+    parts = []
+    for k, rule_id in enumerate(RULE_IDS):
+        members, starts = _episodes(frame, masks[:, k], *EPISODE_RULES.get(rule_id, ()))
+        if not len(members):
+            continue
+        ends = np.append(starts[1:], len(members)) - 1
+        first = members[starts]
+        merchants = (frame.df["merchant_name"].take(first).to_numpy() if rule_id == "rule3"
+                     else np.full(len(starts), None))
+        parts.append(pd.DataFrame({
+            "rule": rule_id,
+            "user_id": frame.df["user_id"].take(first).to_numpy(),
+            "merchant_name": merchants,
+            "start": frame.epoch_ns[first].view("datetime64[ns]"),
+            "end": frame.epoch_ns[members[ends]].view("datetime64[ns]"),
+            "transactions": ends - starts + 1,
+            "total_amount": np.add.reduceat(amounts[members], starts),
+            "rows": [part.tolist() for part in np.split(labels[members], starts[1:])],
+        }))
+    if not parts:
+        return pd.DataFrame({column: [] for column in INCIDENT_COLUMNS}).rename_axis("incident")
+    return pd.concat(parts, ignore_index=True).rename_axis("incident")
+
+
+def incident_counts(incidents: pd.DataFrame) -> dict:
+    """Rule id -> (flagged transactions, incidents) of an incident_records frame."""
+    by_rule = incidents.groupby("rule")["transactions"].agg(["sum", "size"])
+    return {
+        rule_id: (int(by_rule.at[rule_id, "sum"]), int(by_rule.at[rule_id, "size"]))
+        if rule_id in by_rule.index else (0, 0)
+        for rule_id in RULE_IDS
+    }
@@ -0,0 +1,196 @@
+"""
+Fast-starting scorer for small inputs, using only the standard library.
+
+All five rules, with the same results as rule_masks, for a handful to a few
+thousand transactions: short-lived workers and CLI calls pay neither the
+import time nor the memory of pandas and NumPy. Inputs above LITE_MAX_ROWS
+are handed to the vectorized batch path, which is only imported then.
+
+Usage (from the repository root):
+    python -m src.lite --file data/small.csv
+"""
+import argparse
+import csv
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+
+from src.config import (
+    HIGH_VALUE_THRESHOLD,
+    MIN_TX_IN_WINDOW,
+    NS_PER_SECOND,
+    RAPID_TX_THRESHOLD,
+    RAPID_WINDOW_MINUTES,
+    RULE_IDS,
+    RULE_LABELS,
+    SAME_MERCHANT_THRESHOLD,
+    SAME_MERCHANT_WINDOW_SEC,
+    SPIKE_MULTIPLIER,
+    SPIKE_WINDOW_HOURS,
+    STD_MULTIPLIER,
+)
+from src.streaming import to_epoch_ns
+
+# Larger inputs are scored by the vectorized batch path (score_batch)
+LITE_MAX_ROWS = 20_000
+
+_BITS = {rule_id: 1 << k for k, rule_id in enumerate(RULE_IDS)}
+
+
+class Transaction:
+    """
+    One transaction with its parsed time; row is its position in the input.
+    An empty user_id or merchant_name (a blank CSV field) is missing, None.
+    """
+
+    __slots__ = ("row", "user_id", "timestamp", "merchant_name", "amount", "epoch_ns", "hour")
+
+    def __init__(self, row: int, user_id, timestamp, merchant_name, amount):
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        self.row = row
+        self.user_id = None if user_id == "" else user_id
+        self.timestamp = timestamp
+        self.merchant_name = None if merchant_name == "" else merchant_name
+        self.amount = float(amount)
+        self.epoch_ns = to_epoch_ns(timestamp)
+        self.hour = timestamp.hour
+
+
+def read_transactions(csv_path: str, limit: int = None) -> list:
+    """
+    Transactions of a CSV with columns user_id, timestamp, merchant_name, amount.
+
+    Parameters:
+        csv_path (str): Path to the CSV; timestamps in ISO-8601 form.
+        limit (int | None): Stop after this many rows plus one, so a caller can
+                        tell the file is larger without reading all of it.
+    """
+    transactions = []
+    with open(csv_path, newline="") as f:
+        for row, record in enumerate(csv.DictReader(f)):
+            if limit is not None and row > limit:
+                break
+            transactions.append(Transaction(row, record["user_id"], record["timestamp"],
+                                            record["merchant_name"], record["amount"]))
+    return transactions
+
+
+def _to_ns(seconds: float) -> int:
+    return int(round(seconds * NS_PER_SECOND))
+
+
+def _groups(transactions: list, key) -> dict:
+    """
+    Key -> its transactions in (timestamp, row) order, like the batch sort.
+    Transactions with a missing key part are left out, as the batch rules do.
+    """
+    groups = {}
+    for transaction in sorted(transactions, key=lambda t: (t.epoch_ns, t.row)):
+        group = key(transaction)
+        if None not in (group if isinstance(group, tuple) else (group,)):
+            groups.setdefault(group, []).append(transaction)
+    return groups
+
+
+def _mark_windows(group: list, window: int, minimum: float, bits: list, bit: int):
+    """
+    Sets bit on every transaction of a time-ordered group that lies inside a
+    trailing window holding at least minimum transactions.
+    """
+    times = array("q", (transaction.epoch_ns for transaction in group))
+    covered = -1  # transactions up to this position already carry the bit
+    for end, time in enumerate(times):
+        start = bisect_left(times, time - window, 0, end + 1)
+        if end - start + 1 >= minimum:
+            for position in range(max(start, covered + 1), end + 1):
+                bits[group[position].row] |= bit
+            covered = end
+
+
+def score(transactions: list) -> list:
+    """
+    All five rules over a list of transactions.
+
+    Parameters:
+        transactions (list[Transaction]): Rows 0..n-1, in any time order.
+
+    Returns:
+        list[int]: Per row, a rule bitmask like combined_flags (bit k set when
+                        RULE_IDS[k] flagged the row); the same flags rule_masks gives.
+
+    Logic:
+        - Each user's (and user/merchant pair's) times are kept in an
+          array("q"); a window start is a bisect into it.
+        - Rule 4 uses exact integer sums of the hour and its square, and
+          rule 5 the same float threshold as the batch path, so the two paths
+          agree on every boundary.
+    """
+    bits = [0] * len(transactions)
+    for transaction in transactions:
+        if transaction.amount > HIGH_VALUE_THRESHOLD:
+            bits[transaction.row] |= _BITS["rule1"]
+
+    pairs = _groups(transactions, lambda t: (t.user_id, t.merchant_name))
+    for group in pairs.values():
+        _mark_windows(group, _to_ns(SAME_MERCHANT_WINDOW_SEC), SAME_MERCHANT_THRESHOLD, bits, _BITS["rule3"])
+
+    for group in _groups(transactions, lambda t: t.user_id).values():
+        _mark_windows(group, _to_ns(RAPID_WINDOW_MINUTES * 60), RAPID_TX_THRESHOLD, bits, _BITS["rule2"])
+
+        # |hour - mean| > STD_MULTIPLIER * std, multiplied through by n (see unusual_time_mask)
+        n = len(group)
+        total = sum(transaction.hour for transaction in group)
+        spread = n * sum(transaction.hour ** 2 for transaction in group) - total * total
+        if n >= 2:
+            for transaction in group:
+                deviation = n * transaction.hour - total
+                if deviation * deviation > STD_MULTIPLIER ** 2 * spread:
+                    bits[transaction.row] |= _BITS["rule4"]
+
+        if n >= MIN_TX_IN_WINDOW:
+            span_hours = float(group[-1].epoch_ns - group[0].epoch_ns) / NS_PER_SECOND / 3600
+            threshold = SPIKE_MULTIPLIER * n / max(span_hours, 1)
+            _mark_windows(group, _to_ns(SPIKE_WINDOW_HOURS * 3600), max(threshold, MIN_TX_IN_WINDOW),
+                          bits, _BITS["rule5"])
+    return bits
+
+
+def score_batch(source) -> list:
+    """
+    score() through the vectorized batch path, for large inputs. Imports
+    pandas and NumPy on first use.
+
+    Parameters:
+        source (str | pd.DataFrame | TransactionFrame): CSV path or loaded transactions.
+    """
+    from src.fraud_detection import as_transaction_frame, rule_masks
+
+    masks = rule_masks(as_transaction_frame(source))
+    return (masks.astype(int) @ [1 << k for k in range(len(RULE_IDS))]).tolist()
+
+
+def score_file(csv_path: str, max_rows: int = LITE_MAX_ROWS) -> list:
+    """Rule bitmasks of a CSV's rows: score() up to max_rows rows, else score_batch()."""
+    transactions = read_transactions(csv_path, limit=max_rows)
+    if len(transactions) > max_rows:
+        return score_batch(csv_path)
+    return score(transactions)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a small transactions CSV without pandas.")
+    parser.add_argument("--file", type=str, default="data/input.csv", help="Path to CSV file")
+    parser.add_argument("--max-rows", type=int, default=LITE_MAX_ROWS,
+                        help=f"Larger files use the pandas batch path (default: {LITE_MAX_ROWS})")
+    args = parser.parse_args()
+
+    bits = score_file(args.file, args.max_rows)
+    for number, rule_id in enumerate(RULE_IDS, start=1):
+        flagged = sum(1 for rule_bits in bits if rule_bits & _BITS[rule_id])
+        print(f"Rule {number} - {RULE_LABELS[rule_id]}: {flagged} flagged")
+    print()
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["row", "rules"])
+    writer.writerows((row, rule_bits) for row, rule_bits in enumerate(bits) if rule_bits)
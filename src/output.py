@@ -0,0 +1,59 @@
+import importlib.util
+import os
+from typing import Optional
+
+import pandas as pd
+
+OUTPUT_FORMATS = ("csv", "jsonl", "parquet")
+
+# Rows serialized per write; bounds the formatted text held in memory at once
+WRITE_CHUNK_ROWS = 100_000
+
+# Buffer of the output file, so chunks reach the disk in large sequential writes
+WRITE_BUFFER_BYTES = 1 << 20
+
+
+def resolve_output_format(path: str, output_format: Optional[str] = None) -> str:
+    """The explicit format, else the one implied by the file extension (.csv, .jsonl, .parquet)."""
+    if output_format is None:
+        output_format = os.path.splitext(path)[1].lstrip(".").lower()
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {output_format!r}; expected one of {', '.join(OUTPUT_FORMATS)}")
+    return output_format
+
+
+def write_flagged(df: pd.DataFrame, path: str, output_format: Optional[str] = None,
+                  index_label: str = "row"):
+    """
+    Write flagged transactions (e.g. a combined_flags frame) to a file in one pass.
+
+    Parameters:
+        df (pd.DataFrame): Rows to write; the index is written as a "row" column
+                        (the transaction's row number in the input).
+        path (str): Output file.
+        output_format (str | None): "csv", "jsonl" or "parquet" (default: from
+                        the extension). Parquet needs pyarrow or fastparquet.
+        index_label (str): Name of the index column, e.g. "incident" for
+                        incident_records.
+
+    Logic:
+        - CSV and JSONL are formatted WRITE_CHUNK_ROWS rows at a time with
+          pandas' vectorized writers and appended to one buffered file handle.
+    """
+    output_format = resolve_output_format(path, output_format)
+    df = df.rename_axis(index_label)
+    if output_format == "parquet":
+        if not any(importlib.util.find_spec(engine) for engine in ("pyarrow", "fastparquet")):
+            raise ImportError("Parquet output needs pyarrow or fastparquet installed")
+        df.to_parquet(path)
+        return
+
+    with open(path, "w", newline="", buffering=WRITE_BUFFER_BYTES) as f:
+        if output_format == "csv" and not len(df):
+            df.to_csv(f)
+        for start in range(0, len(df), WRITE_CHUNK_ROWS):
+            part = df.iloc[start:start + WRITE_CHUNK_ROWS]
+            if output_format == "csv":
+                part.to_csv(f, header=start == 0)
+            else:
+                part.reset_index().to_json(f, orient="records", lines=True, date_format="iso")
@@ -0,0 +1,115 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.fraud_detection import (
+    RULE_IDS,
+    TransactionSource,
+    as_transaction_frame,
+    flagged_frames,
+    rule_masks,
+)
+from src.transaction_frame import TransactionFrame
+
+# Column buffers handed to the workers, one memory-mapped .npy file each
+COLUMNS = ["rows", "user_codes", "epoch_ns", "merchant_codes", "amount", "hours"]
+
+
+def partition_users(frame: TransactionFrame, partitions: int) -> np.ndarray:
+    """
+    Partition number of every row, from a stable hash of its user_id.
+
+    All transactions of a user (and so of each user/merchant pair) land in the
+    same partition, which is all the rules need to run independently.
+    """
+    user_partition = pd.util.hash_array(frame.user_ids.to_numpy()) % np.uint64(partitions)
+    return user_partition.astype(np.int64)[frame.user_codes]
+
+
+def _write_columns(frame: TransactionFrame, directory: str, partitions: int) -> np.ndarray:
+    """Write the encoded columns grouped by partition; returns the partition boundaries."""
+    partition = partition_users(frame, partitions)
+    rows = np.argsort(partition, kind="stable")
+    columns = {
+        "rows": rows,
+        "user_codes": frame.user_codes[rows],
+        "epoch_ns": frame.epoch_ns[rows],
+        "merchant_codes": frame.merchant_codes[rows],
+        "amount": frame.df["amount"].to_numpy(dtype=np.float64)[rows],
+        "hours": frame.hours.to_numpy().astype(np.int8)[rows],
+    }
+    for name, values in columns.items():
+        np.save(os.path.join(directory, f"{name}.npy"), values)
+    return np.searchsorted(partition[rows], np.arange(partitions + 1))
+
+
+def _evaluate_partition(directory: str, start: int, stop: int, backend: str = "auto") -> list:
+    """Worker: run all rules on rows [start, stop) of the mapped columns."""
+    columns = {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")[start:stop]
+        for name in COLUMNS
+    }
+    frame = TransactionFrame.from_columns(
+        columns["user_codes"], columns["epoch_ns"], columns["merchant_codes"],
+        columns["amount"], columns["hours"], backend=backend,
+    )
+    masks = rule_masks(frame)
+    # Flagged rows as positions in the caller's frame, one array per rule
+    return [np.asarray(columns["rows"][masks[:, k]]) for k in range(len(RULE_IDS))]
+
+
+def parallel_rule_masks(frame: TransactionFrame, processes: Optional[int] = None,
+                        partitions: Optional[int] = None) -> np.ndarray:
+    """
+    rule_masks of the frame, computed on a process pool (see evaluate_rules_parallel).
+    Workers use the frame's window backend.
+
+    Returns:
+        np.ndarray: Shape (rows, 5); column k is the mask of RULE_IDS[k].
+    """
+    processes = processes or os.cpu_count() or 1
+    partitions = partitions or processes
+    masks = np.zeros((len(frame), len(RULE_IDS)), dtype=bool)
+
+    with tempfile.TemporaryDirectory(prefix="transaction-columns-") as directory:
+        bounds = _write_columns(frame, directory, partitions)
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [
+                pool.submit(_evaluate_partition, directory, start, stop, frame.backend)
+                for start, stop in zip(bounds[:-1], bounds[1:])
+                if stop > start
+            ]
+            for future in futures:
+                for k, rows in enumerate(future.result()):
+                    masks[rows, k] = True
+    return masks
+
+
+def evaluate_rules_parallel(source: TransactionSource, processes: Optional[int] = None,
+                            partitions: Optional[int] = None) -> dict:
+    """
+    Runs every rule on a process pool, partitioned by user_id hash.
+
+    Parameters:
+        source (str | pd.DataFrame | TransactionFrame): CSV path or loaded transactions.
+        processes (int | None): Worker processes (default: os.cpu_count()).
+        partitions (int | None): Number of user partitions (default: processes).
+
+    Returns:
+        dict: Rule id ("rule1".."rule5") -> DataFrame of flagged transactions,
+              identical to evaluate_rules and in the same (index) order.
+
+    Logic:
+        - Users are hash-partitioned; rows are grouped by partition and the
+          encoded columns (codes, int64 epochs, amounts, hours) are written once
+          as .npy files that every worker memory-maps, so no DataFrame is pickled.
+        - Each worker returns only the positions of its flagged rows; the
+          parent merges them into one mask per rule, which fixes the output
+          order regardless of which worker finishes first.
+    """
+    frame = as_transaction_frame(source)
+    return flagged_frames(frame, parallel_rule_masks(frame, processes, partitions))
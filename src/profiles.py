@@ -0,0 +1,189 @@
+import argparse
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from src.fraud_detection import (
+    RULE_IDS,
+    USER_STAT_COLUMNS,
+    TransactionSource,
+    as_transaction_frame,
+    flagged_frames,
+    merge_user_stats,
+    transaction_spike_mask,
+    unusual_time_mask,
+    user_stats,
+)
+from src.windows import NS_PER_SECOND
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    user_id PRIMARY KEY,
+    count INTEGER NOT NULL,
+    hour_sum INTEGER NOT NULL,
+    hour_sq_sum INTEGER NOT NULL,
+    hour_cos_sum REAL NOT NULL,
+    hour_sin_sum REAL NOT NULL,
+    first_ns INTEGER NOT NULL,
+    last_ns INTEGER NOT NULL
+)
+"""
+
+_FLOAT_COLUMNS = ("hour_cos_sum", "hour_sin_sum")
+
+# Merge a batch's aggregates into the stored ones (see merge_user_stats)
+_UPSERT = f"""
+INSERT INTO profiles (user_id, {", ".join(USER_STAT_COLUMNS)})
+VALUES ({", ".join("?" * (len(USER_STAT_COLUMNS) + 1))})
+ON CONFLICT (user_id) DO UPDATE SET
+    count = count + excluded.count,
+    hour_sum = hour_sum + excluded.hour_sum,
+    hour_sq_sum = hour_sq_sum + excluded.hour_sq_sum,
+    hour_cos_sum = hour_cos_sum + excluded.hour_cos_sum,
+    hour_sin_sum = hour_sin_sum + excluded.hour_sin_sum,
+    first_ns = min(first_ns, excluded.first_ns),
+    last_ns = max(last_ns, excluded.last_ns)
+"""
+
+
+class ProfileStore:
+    """
+    Per-user behaviour profiles kept in SQLite and updated batch by batch.
+
+    Each user's row holds the mergeable aggregates of user_stats: transaction
+    count, the exact integer sums of the hour and its square (mean and M2 of
+    the hour of day, merged without rounding), the circular hour sums, and the
+    first/last timestamp (transaction rate). Rules 4 and 5 score a new batch
+    against these baselines, so a day's file is scored in O(new rows) without
+    reloading the user's history.
+
+    Parameters:
+        path (str): SQLite database file (":memory:" for a throwaway store).
+
+    Example:
+        with ProfileStore("profiles.db") as store:
+            results = store.score("data/2025-01-07.csv")   # scores, then records the day
+            results["rule4"]
+    """
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(_SCHEMA)
+
+    def __enter__(self) -> "ProfileStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def update(self, stats: pd.DataFrame):
+        """Merge user_stats of a new batch into the stored profiles (one transaction)."""
+        with self.connection:
+            self._merge(stats)
+
+    def _merge(self, stats: pd.DataFrame):
+        """The upserts of update, inside the caller's transaction."""
+        rows = zip(stats.index.tolist(), *(stats[column].tolist() for column in USER_STAT_COLUMNS))
+        self.connection.executemany(_UPSERT, rows)
+
+    def stats(self, user_ids=None) -> pd.DataFrame:
+        """
+        Stored aggregates in user_stats layout (indexed by user_id).
+
+        Parameters:
+            user_ids (iterable | None): Only these users (default: all); users
+                            without a profile are left out.
+        """
+        query = f"SELECT user_id, {', '.join(USER_STAT_COLUMNS)} FROM profiles"
+        if user_ids is None:
+            rows = self.connection.execute(query).fetchall()
+        else:
+            # A temporary key table keeps the lookup one indexed join however many users
+            with self.connection:
+                self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (user_id PRIMARY KEY)")
+                self.connection.execute("DELETE FROM lookup")
+                self.connection.executemany("INSERT OR IGNORE INTO lookup VALUES (?)",
+                                            ((user_id,) for user_id in pd.Index(user_ids).tolist()))
+            rows = self.connection.execute(
+                f"{query} WHERE user_id IN (SELECT user_id FROM lookup)").fetchall()
+        stats = pd.DataFrame(rows, columns=["user_id"] + USER_STAT_COLUMNS).set_index("user_id")
+        return stats.astype({column: float if column in _FLOAT_COLUMNS else np.int64
+                             for column in USER_STAT_COLUMNS})
+
+    def profiles(self, user_ids=None) -> pd.DataFrame:
+        """
+        Readable baselines per user: count, mean_hour, std_hour (population),
+        circular_mean_hour, circular_std_hour, first_seen, last_seen and
+        tx_per_hour (over max(1 hour, first to last seen), as rule 5 uses it).
+        """
+        stats = self.stats(user_ids)
+        n = stats["count"].to_numpy()
+        mean = stats["hour_sum"].to_numpy() / n
+        cos_sum, sin_sum = stats["hour_cos_sum"].to_numpy(), stats["hour_sin_sum"].to_numpy()
+        resultant = np.clip(np.hypot(cos_sum, sin_sum) / n, 1e-300, 1)
+        span_hours = (stats["last_ns"] - stats["first_ns"]).to_numpy() / NS_PER_SECOND / 3600
+        hours_per_radian = 24 / (2 * np.pi)
+        return pd.DataFrame({
+            "count": n,
+            "mean_hour": mean,
+            "std_hour": np.sqrt(np.maximum(stats["hour_sq_sum"].to_numpy() / n - mean * mean, 0)),
+            "circular_mean_hour": np.mod(np.arctan2(sin_sum, cos_sum) * hours_per_radian, 24),
+            "circular_std_hour": np.sqrt(-2 * np.log(resultant)) * hours_per_radian,
+            "first_seen": pd.to_datetime(stats["first_ns"].to_numpy()),
+            "last_seen": pd.to_datetime(stats["last_ns"].to_numpy()),
+            "tx_per_hour": n / np.maximum(span_hours, 1),
+        }, index=stats.index)
+
+    def score(self, source: TransactionSource, circular: bool = False, update: bool = True) -> dict:
+        """
+        Runs rules 4 and 5 on a new batch against the stored baselines.
+
+        Parameters:
+            source (str | pd.DataFrame | TransactionFrame): The new transactions.
+            circular (bool): Circular hour statistics for rule 4 (see unusual_time_mask).
+            update (bool): Merge the batch into the profiles afterwards. Every
+                            batch must be recorded exactly once.
+
+        Returns:
+            dict: "rule4" and "rule5" -> DataFrame of flagged transactions.
+
+        Logic:
+            - Baselines are the stored history merged with the batch itself, so
+              a batch scores exactly as its rows would in one run over the whole
+              history (except rule 5 windows reaching back into an earlier
+              batch, which only see the new rows).
+            - Only the batch's users are read from the store.
+        """
+        frame = as_transaction_frame(source)
+        batch = user_stats(frame)
+        baseline = merge_user_stats(self.stats(frame.user_ids), batch)
+
+        masks = np.zeros((len(frame), len(RULE_IDS)), dtype=bool)
+        masks[:, RULE_IDS.index("rule4")] = unusual_time_mask(frame, baseline, circular=circular)
+        masks[:, RULE_IDS.index("rule5")] = transaction_spike_mask(frame, baseline)
+        results = flagged_frames(frame, masks)
+        if update:
+            self.update(batch)
+        return {rule_id: results[rule_id] for rule_id in ("rule4", "rule5")}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a new batch against stored user profiles (rules 4 and 5).")
+    parser.add_argument("--store", type=str, default="profiles.db", help="Profile database (default: profiles.db)")
+    parser.add_argument("--file", type=str, default="data/input.csv", help="CSV of new transactions")
+    parser.add_argument("--circular", action="store_true", help="Circular time-of-day statistics for rule 4")
+    parser.add_argument("--no-update", action="store_true", help="Score without recording the batch")
+    args = parser.parse_args()
+    with ProfileStore(args.store) as store:
+        results = store.score(args.file, circular=args.circular, update=not args.no_update)
+        for rule_id, flagged in results.items():
+            print(f"{rule_id}: {len(flagged)} flagged")
+            print(flagged, "\n")
+        print(f"{len(store)} user profiles in {args.store}")
@@ -1,35 +1,306 @@
 # run_all_rules.py
 import argparse
+import numpy as np
+import pandas as pd
 from src.fraud_detection import (
+    RULE_IDS,
+    RULE_MASKS,
+    combined_flags,
+    flagged_frames,
+    fused_rule_masks,
+    rule_counts,
     flag_high_value_transactions,
     flag_rapid_small_transactions,
     flag_same_merchant_transactions,
     flag_unusual_time_transactions,
-    flag_transaction_spikes
+    flag_transaction_spikes,
+    as_transaction_frame,
+    TransactionSource,
 )
+from src.chunked import evaluate_rules_chunked
+from src.config import RULE_LABELS
+from src.delta import DeltaCheckpoint
+from src.incidents import incident_counts, incident_records
+from src.instrumentation import RunReport
+from src.output import OUTPUT_FORMATS, write_flagged
+from src.parallel import evaluate_rules_parallel, parallel_rule_masks
+from src.stage_graph import concurrent_rule_masks
+from src.transaction_frame import TransactionFrame
+from src.utils import load_transactions, memory_footprint, parse_timestamp_column
+from src.windows import WINDOW_BACKENDS, resolve_backend
+
+# Rule id -> (report label, rule function), in reporting order
+RULES = {
+    "rule1": (RULE_LABELS["rule1"], flag_high_value_transactions),
+    "rule2": (RULE_LABELS["rule2"], flag_rapid_small_transactions),
+    "rule3": (RULE_LABELS["rule3"], flag_same_merchant_transactions),
+    "rule4": (RULE_LABELS["rule4"], flag_unusual_time_transactions),
+    "rule5": (RULE_LABELS["rule5"], flag_transaction_spikes),
+}
+
+
+def evaluate_rules(source: TransactionSource, report: RunReport = None,
+                   workers: int = None) -> dict:
+    """
+    Runs every rule against one shared TransactionFrame.
+
+    Parameters:
+        source (str | pd.DataFrame | TransactionFrame): CSV path or already-loaded transactions.
+        report (RunReport | None): Record each rule as a stage (time, rows, flagged).
+        workers (int | None): Run the shared stages and the rules concurrently on
+                        this many threads (see concurrent_rule_masks).
+
+    Returns:
+        dict: Rule id ("rule1".."rule5") -> DataFrame of flagged transactions.
+
+    Logic:
+        - The CSV is parsed once; timestamps and the sorted views are computed
+          once and reused by every rule that needs them.
+    """
+    frame = as_transaction_frame(source)
+    report = report or RunReport(enabled=False)
+    if workers:
+        return flagged_frames(frame, concurrent_rule_masks(frame, workers, report))
+    results = {}
+    for rule_id, (_, rule) in RULES.items():
+        with report.stage(rule_id, rows=len(frame)) as stage:
+            results[rule_id] = rule(frame)
+            stage["flagged"] = len(results[rule_id])
+    return results
+
+
+def evaluate_rule_masks(source: TransactionSource, report: RunReport = None,
+                        fused: bool = True, workers: int = None) -> np.ndarray:
+    """
+    Every rule as a boolean mask over one shared TransactionFrame, without
+    materializing the flagged rows (see combined_flags).
+
+    Parameters:
+        source (str | pd.DataFrame | TransactionFrame): CSV path or already-loaded transactions.
+        report (RunReport | None): Record the evaluation: one "rules" stage when
+                        fused, else one stage per rule.
+        fused (bool): Evaluate all rules in two passes (fused_rule_masks)
+                        instead of one mask function per rule.
+        workers (int | None): Instead, run the shared stages and the rules
+                        concurrently on this many threads, one stage per task
+                        (see concurrent_rule_masks).
+
+    Returns:
+        np.ndarray: Shape (rows, 5); column k is the mask of RULE_IDS[k].
+    """
+    frame = as_transaction_frame(source)
+    report = report or RunReport(enabled=False)
+    if workers:
+        return concurrent_rule_masks(frame, workers, report)
+    if fused:
+        with report.stage("rules", rows=len(frame)) as stage:
+            masks = fused_rule_masks(frame)
+            stage["flagged"] = int(np.count_nonzero(masks.any(axis=1)))
+        return masks
+
+    masks = np.zeros((len(frame), len(RULE_IDS)), dtype=bool)
+    for k, (rule_id, mask) in enumerate(RULE_MASKS.items()):
+        with report.stage(rule_id, rows=len(frame)) as stage:
+            masks[:, k] = mask(frame)
+            stage["flagged"] = int(np.count_nonzero(masks[:, k]))
+    return masks
+
+
+# Mode -> run_all_rules options it does not use; setting one is an error, not ignored
+UNSUPPORTED_OPTIONS = {
+    "delta": ("chunksize", "processes", "workers", "cache_dir", "load_options", "memory_report",
+              "backend", "incidents"),
+    "chunked": ("processes", "workers", "cache_dir", "load_options", "memory_report", "incidents"),
+    "parallel": ("workers",),
+}
+
+
+def run_mode(chunksize: int = None, processes: int = None, workers: int = None,
+             checkpoint: str = None) -> str:
+    """The mode a run_all_rules call selects: delta, chunked, parallel, concurrent or in-memory."""
+    return ("delta" if checkpoint else "chunked" if chunksize
+            else "parallel" if processes else "concurrent" if workers else "in-memory")
 
-def run_all_rules(csv_path: str):
-    print(f"Processing file: {csv_path}\n")
 
-    flagged_rule1 = flag_high_value_transactions(csv_path)
-    print(f"Rule 1 - High-value transactions: {len(flagged_rule1)} flagged")
-    print(flagged_rule1, "\n")
+def unsupported_options(mode: str, **options) -> list:
+    """
+    The options that are set but not used by a mode (see UNSUPPORTED_OPTIONS).
 
-    flagged_rule2 = flag_rapid_small_transactions(csv_path)
-    print(f"Rule 2 - Rapid small transactions: {len(flagged_rule2)} flagged")
-    print(flagged_rule2, "\n")
+    An option is unset when it is None, False, 0, "auto" (backend) or, for
+    load_options, a dict whose values are all None.
 
-    flagged_rule3 = flag_same_merchant_transactions(csv_path)
-    print(f"Rule 3 - Same-merchant transactions: {len(flagged_rule3)} flagged")
-    print(flagged_rule3, "\n")
+    Example:
+        unsupported_options("chunked", cache_dir=".cache", backend="numba")   # ["cache_dir"]
+    """
+    unused = []
+    for name in UNSUPPORTED_OPTIONS.get(mode, ()):
+        value = options.get(name)
+        if isinstance(value, dict):
+            value = any(item is not None for item in value.values())
+        if value is not None and value is not False and value != 0 and value != "auto":
+            unused.append(name)
+    return unused
 
-    flagged_rule4 = flag_unusual_time_transactions(csv_path)
-    print(f"Rule 4 - Unusual time transactions: {len(flagged_rule4)} flagged")
-    print(flagged_rule4, "\n")
 
-    flagged_rule5 = flag_transaction_spikes(csv_path)
-    print(f"Rule 5 - High-frequency transactions: {len(flagged_rule5)} flagged")
-    print(flagged_rule5, "\n")
+def _run_delta(csv_path: str, checkpoint: str, report: RunReport) -> pd.DataFrame:
+    """Incremental: only the bytes appended since the last run are read."""
+    with report.stage("rules") as stage, DeltaCheckpoint(checkpoint) as store:
+        rows_before = store.state().get("rows", 0)
+        results = store.run(csv_path)
+        stage["rows"] = store.state().get("rows", 0) - rows_before
+        stage["flagged"] = len(results)
+    return results
+
+
+def _run_chunked(csv_path: str, chunksize: int, report: RunReport, combined: bool, backend: str):
+    """Out-of-core: stream a time-ordered file in bounded-size chunks."""
+    with report.stage("rules") as stage:
+        results = evaluate_rules_chunked(csv_path, chunksize, combined=combined, backend=backend)
+        stage["flagged"] = len(results) if combined else sum(len(flagged) for flagged in results.values())
+    return results
+
+
+def _run_in_memory(csv_path: str, report: RunReport, processes: int, workers: int,
+                   cache_dir: str, load_options: dict, memory_report: bool, backend: str,
+                   combined: bool, incidents: bool):
+    """Load the whole file, then run the rules sequentially, on threads or on processes."""
+    load_options = dict(load_options)
+    timestamp_format = load_options.pop("timestamp_format", None)
+    # Rows of the result when it is one frame
+    records = incident_records if incidents else combined_flags
+    with report.stage("load") as stage:
+        df = load_transactions(csv_path, cache_dir=cache_dir, timestamp_format=timestamp_format,
+                               parse_timestamps=False, **load_options)
+        stage["rows"] = len(df)
+    with report.stage("parse", rows=len(df)):
+        if not pd.api.types.is_datetime64_any_dtype(df["timestamp"]):
+            parse_timestamp_column(df, timestamp_format)
+        frame = TransactionFrame(df, backend=backend)
+        # Derived timestamp columns the rules share
+        frame.epoch_ns, frame.hours
+    if memory_report:
+        footprint = memory_footprint(frame.df)
+        print(f"Loaded {footprint['rows']} rows: {footprint['total_bytes'] / 1e6:.1f} MB, "
+              f"{footprint['bytes_per_row']:.1f} bytes/row\n")
+    if processes:
+        # Multi-core: users hash-partitioned across worker processes
+        with report.stage("rules", rows=len(frame)) as stage:
+            if combined:
+                masks = parallel_rule_masks(frame, processes)
+                stage["flagged"] = int(np.count_nonzero(masks.any(axis=1)))
+                return records(frame, masks)
+            results = evaluate_rules_parallel(frame, processes)
+            stage["flagged"] = sum(len(flagged) for flagged in results.values())
+            return results
+    if workers:
+        # The sorts and rules are stages of one graph, run as their inputs are ready
+        if combined:
+            results = records(frame, evaluate_rule_masks(frame, report, workers=workers))
+        else:
+            results = evaluate_rules(frame, report, workers=workers)
+    else:
+        with report.stage("sort", rows=len(frame)):
+            # The (user_id, timestamp) order and its window kernel, shared by
+            # rules 2-5; rule 3 sorts only the rows its pre-filter leaves
+            frame.user_time_index
+        if combined:
+            results = records(frame, evaluate_rule_masks(frame, report))
+        else:
+            results = evaluate_rules(frame, report)
+    # Users and rows the window rules' pre-filter left to scan
+    report.info["pruning"] = frame.pruning
+    return results
+
+
+def run_all_rules(csv_path: str, chunksize: int = None, processes: int = None,
+                  cache_dir: str = None, load_options: dict = None, memory_report: bool = False,
+                  report: RunReport = None, show_frames: bool = True,
+                  output: str = None, output_format: str = None, backend: str = "auto",
+                  checkpoint: str = None, workers: int = None, incidents: bool = False):
+    """
+    Runs every rule on a CSV and prints the flagged counts (and frames).
+
+    Parameters:
+        csv_path (str): Path to the transactions CSV.
+        chunksize (int | None): Evaluate a time-ordered file in chunks of this many rows.
+        processes (int | None): Evaluate on this many worker processes.
+        cache_dir (str | None): Columnar cache directory (see load_transactions).
+        load_options (dict | None): Extra load_transactions options.
+        memory_report (bool): Print the in-memory size of the loaded transactions.
+        report (RunReport | None): Record load, parse, sort, per-rule and output
+                        stages. Chunked and parallel runs interleave loading and
+                        the rules, so they are recorded as one "rules" stage.
+        show_frames (bool): Print the flagged DataFrames, not only their counts.
+        output (str | None): Write one combined row per flagged transaction, with
+                        a rule bitmask, to this file instead of printing the
+                        frames (see combined_flags and write_flagged).
+        output_format (str | None): "csv", "jsonl" or "parquet" (default: from
+                        the output file's extension); needs output.
+        backend (str): Window-scan backend of the rules (see WindowIndex).
+        checkpoint (str | None): Delta mode: score only the rows appended to an
+                        append-only, time-ordered file since the last run
+                        recorded in this checkpoint (see DeltaCheckpoint).
+        workers (int | None): In-memory mode: run the sorts, shared statistics
+                        and rules as a dependency graph on this many threads,
+                        each recorded as its own stage (see concurrent_rule_masks).
+        incidents (bool): Collapse each rule's overlapping window hits into one
+                        record per episode (see incident_records), printed or
+                        written to output instead of the flagged rows. Needs
+                        the whole file in memory (not chunked or delta mode).
+
+    Returns:
+        dict | pd.DataFrame: Rule id -> DataFrame of flagged transactions, or
+                        the combined frame when writing an output file or
+                        running in delta mode, or the incident records.
+
+    Raises:
+        ValueError: An option the selected mode does not use is set (see
+                        UNSUPPORTED_OPTIONS), or output_format without output.
+    """
+    mode = run_mode(chunksize, processes, workers, checkpoint)
+    unused = unsupported_options(mode, chunksize=chunksize, processes=processes, workers=workers,
+                                 cache_dir=cache_dir, load_options=load_options,
+                                 memory_report=memory_report, backend=backend, incidents=incidents)
+    if unused:
+        raise ValueError(f"{', '.join(unused)} cannot be used in {mode} mode")
+    if output_format and not output:
+        raise ValueError("output_format needs output")
+    print(f"Processing file: {csv_path}\n")
+    report = report or RunReport(enabled=False)
+
+    if mode == "delta":
+        results = _run_delta(csv_path, checkpoint, report)
+    elif mode == "chunked":
+        results = _run_chunked(csv_path, chunksize, report, bool(output), backend)
+    else:
+        results = _run_in_memory(csv_path, report, processes, workers, cache_dir, load_options or {},
+                                 memory_report, backend, bool(output or incidents), incidents)
+
+    with report.stage("output") as stage:
+        combined = isinstance(results, pd.DataFrame)
+        if incidents:
+            episodes = incident_counts(results)
+            counts = {rule_id: flagged for rule_id, (flagged, _) in episodes.items()}
+        elif combined:
+            counts = rule_counts(results)
+        if combined:
+            if output:
+                write_flagged(results, output, output_format, index_label="incident" if incidents else "row")
+            stage["rows"] = len(results)
+        else:
+            counts = {rule_id: len(flagged) for rule_id, flagged in results.items()}
+            stage["rows"] = sum(counts.values())
+        for number, (rule_id, (label, _)) in enumerate(RULES.items(), start=1):
+            episode_note = f" in {episodes[rule_id][1]} incidents" if incidents else ""
+            print(f"Rule {number} - {label}: {counts[rule_id]} flagged{episode_note}")
+            if show_frames and not combined:
+                print(results[rule_id], "\n")
+        if output:
+            written = "incidents" if incidents else "flagged transactions"
+            print(f"\n{len(results)} {written} written to {output}")
+        elif combined and show_frames:
+            print(f"\n{results}")
+    return results
 
 
 if __name__ == "__main__":
@@ -40,5 +311,115 @@ if __name__ == "__main__":
         default="data/input.csv",
         help="Path to CSV file (default: data/input.csv)"
     )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Process a timestamp-ordered CSV in chunks of this many rows (default: load it whole)"
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="Evaluate the rules on this many worker processes, partitioned by user_id"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Run the shared sorts and the rules concurrently on this many threads, as their inputs are ready"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Keep a columnar cache of parsed files here and reuse it while the CSV is unchanged"
+    )
+    parser.add_argument(
+        "--timestamp-format",
+        type=str,
+        default=None,
+        help='Timestamp format, e.g. "%%Y-%%m-%%d %%H:%%M:%%S" or ISO8601 (default: inferred)'
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Load user_id/merchant_name as categoricals and amount as float32"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["auto", "c", "pyarrow"],
+        default=None,
+        help="CSV parser; auto uses pyarrow when installed (default: pandas default)"
+    )
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="Print the in-memory size of the loaded transactions"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Write one row per flagged transaction, with a rule bitmask, to this .csv/.jsonl/.parquet file"
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default=None,
+        help="Format of --output (default: from its extension)"
+    )
+    parser.add_argument(
+        "--incidents",
+        action="store_true",
+        help="Collapse each rule's overlapping window hits into one record per episode, printed or written to --output"
+    )
+    parser.add_argument(
+        "--report",
+        type=str,
+        default=None,
+        help="Write a per-stage timing report: a JSON file, or appended as one line to a .jsonl file"
+    )
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="Print flagged counts and a per-stage timing summary instead of the flagged transactions"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=None,
+        help="Delta mode: score only rows appended since the run recorded in this checkpoint file"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=WINDOW_BACKENDS,
+        default="auto",
+        help="Sliding-window implementation; auto uses numba when installed, else numpy (default: auto)"
+    )
     args = parser.parse_args()
-    run_all_rules(args.file)
\ No newline at end of file
+    load_options = {"timestamp_format": args.timestamp_format, "engine": args.engine}
+    if args.compact:
+        load_options.update(categorical=True, amount_dtype="float32")
+    mode = run_mode(args.chunksize, args.processes, args.workers, args.checkpoint)
+    unused = unsupported_options(mode, chunksize=args.chunksize, processes=args.processes,
+                                 workers=args.workers, cache_dir=args.cache_dir,
+                                 load_options=load_options, memory_report=args.memory_report,
+                                 backend=args.backend, incidents=args.incidents)
+    if unused:
+        flags = {"load_options": "--timestamp-format/--compact/--engine"}
+        parser.error(f"{', '.join(flags.get(name, '--' + name.replace('_', '-')) for name in unused)} "
+                     f"cannot be used in {mode} mode")
+    if args.output_format and not args.output:
+        parser.error("--output-format needs --output")
+    report = RunReport(enabled=bool(args.report or args.summary), file=args.file, mode=mode,
+                       backend=resolve_backend(args.backend))
+    run_all_rules(args.file, chunksize=args.chunksize, processes=args.processes,
+                  cache_dir=args.cache_dir, load_options=load_options,
+                  memory_report=args.memory_report, report=report, show_frames=not args.summary,
+                  output=args.output, output_format=args.output_format, backend=args.backend,
+                  checkpoint=args.checkpoint, workers=args.workers, incidents=args.incidents)
+    if args.summary:
+        print("\n" + report.summary())
+    if args.report:
+        report.write(args.report)
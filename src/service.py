@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from src.streaming import StreamingMonitor
+
+# Fields every transaction request must carry
+REQUEST_FIELDS = ("user_id", "timestamp", "merchant_name", "amount")
+
+def parse_request(request: dict) -> tuple:
+    """
+    Checked (user_id, timestamp, merchant_name, amount) of a transaction request.
+
+    Raises:
+        ValueError: A field has the wrong type or does not parse, so the request
+                        is rejected before any scoring state is touched.
+    """
+    user_id, timestamp = request["user_id"], request["timestamp"]
+    merchant_name, amount = request["merchant_name"], request["amount"]
+    if isinstance(user_id, bool) or not isinstance(user_id, (str, int)):
+        raise ValueError("user_id must be a string or an integer")
+    if merchant_name is not None and not isinstance(merchant_name, str):
+        raise ValueError("merchant_name must be a string or null")
+    if not isinstance(timestamp, str):
+        raise ValueError("timestamp must be an ISO-8601 string")
+    try:
+        timestamp = datetime.fromisoformat(timestamp)
+    except ValueError:
+        raise ValueError(f"timestamp {timestamp!r} is not ISO-8601") from None
+    if isinstance(amount, bool) or not isinstance(amount, (int, float)) or not math.isfinite(amount):
+        raise ValueError("amount must be a finite number")
+    return user_id, timestamp, merchant_name, float(amount)
+
+
+# Latencies kept for the p50/p99 counters (most recent requests)
+LATENCY_SAMPLES = 10_000
+
+
+class ScoringService:
+    """
+    Local asyncio scoring service over line-delimited JSON on TCP.
+
+    Clients send one transaction per line and get one response line per
+    transaction, in request order (requests may be pipelined):
+
+        -> {"transaction_id": "t1", "user_id": "u1", "timestamp": "2025-01-01T10:00:00",
+            "merchant_name": "Starbucks", "amount": 12.5}
+        <- {"transaction_id": "t1", "hits": {"rule2": ["t0", "t1"]}}
+
+    hits maps a rule id to the transaction ids it newly flagged because of
+    this transaction (see StreamingMonitor.process). A line {"op": "stats"}
+    returns the service counters instead, including p50/p99 latency.
+
+    Parameters:
+        monitor (StreamingMonitor | None): Scoring state (default: a new monitor).
+        batch_size (int): Score at most this many queued transactions at once.
+        max_delay_ms (float): How long a batch waits to fill before it is scored.
+        queue_size (int): Bound of the request queue. When it is full, readers
+                        stop reading their sockets until the scorer catches up,
+                        so overload turns into TCP backpressure on the clients
+                        instead of unbounded memory.
+
+    Logic:
+        - Connection readers parse lines and enqueue (transaction, future).
+        - One batcher task drains the queue into micro-batches (full batch or
+          deadline, whichever comes first) and scores them in order, which
+          keeps every user's events in arrival order.
+        - Each connection's writer awaits its futures in request order.
+    """
+
+    def __init__(self, monitor: Optional[StreamingMonitor] = None, batch_size: int = 256,
+                 max_delay_ms: float = 2.0, queue_size: int = 10_000):
+        self.monitor = monitor or StreamingMonitor()
+        self.batch_size = batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.queue_size = queue_size
+        self.queue = None
+        self.processed = 0
+        self.errors = 0
+        self.batches = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._batcher = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        """Start the batcher and listen; port 0 picks a free port (see server.sockets)."""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._batcher = asyncio.create_task(self._run_batcher())
+        return await asyncio.start_server(self.handle_connection, host, port, limit=2**20)
+
+    async def stop(self):
+        """Stop the batcher (after start)."""
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+
+    async def score(self, transaction: dict) -> dict:
+        """Score one transaction through the batcher (in-process entry point)."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((transaction, future, time.perf_counter()))
+        return await future
+
+    def stats(self) -> dict:
+        """Counters: processed, errors, batches, mean batch size, queue depth, users and latency."""
+        latencies = sorted(self.latencies)
+
+        def percentile(q: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000
+
+        return {
+            "processed": self.processed,
+            "errors": self.errors,
+            "batches": self.batches,
+            "mean_batch_size": self.processed / self.batches if self.batches else 0.0,
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "users": len(self.monitor),
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+        }
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Read request lines, enqueue them and write the responses in request order."""
+        pending = asyncio.Queue(maxsize=self.queue_size)
+        responder = asyncio.create_task(self._write_responses(pending, writer))
+        loop = asyncio.get_running_loop()
+        try:
+            while line := await reader.readline():
+                received = time.perf_counter()
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = None
+                if isinstance(request, dict) and request.get("op") == "stats":
+                    # Answered when its turn to be written comes, after every earlier request
+                    await pending.put(self.stats)
+                    continue
+                future = loop.create_future()
+                if request is None:
+                    self.errors += 1
+                    future.set_result({"error": "invalid JSON"})
+                else:
+                    # Blocks while the scorer is behind: backpressure on this socket
+                    await self.queue.put((request, future, received))
+                await pending.put(future)
+        finally:
+            await pending.put(None)
+            await responder
+            writer.close()
+
+    async def _write_responses(self, pending: asyncio.Queue, writer: asyncio.StreamWriter):
+        while (item := await pending.get()) is not None:
+            response = item() if callable(item) else await item
+            writer.write(json.dumps(response).encode() + b"\n")
+            if pending.empty():
+                await writer.drain()
+        await writer.drain()
+
+    async def _run_batcher(self):
+        """Collect micro-batches by size or deadline and score them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.batch_size:
+                if self.queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self.queue.get_nowait())
+            self._score_batch(batch)
+
+    def _score_batch(self, batch: list):
+        for request, future, received in batch:
+            response = self._score_one(request)
+            self.latencies.append(time.perf_counter() - received)
+            if not future.done():
+                future.set_result(response)
+        self.batches += 1
+
+    def _score_one(self, request) -> dict:
+        if not isinstance(request, dict):
+            self.errors += 1
+            return {"error": "expected a JSON object"}
+        transaction_id = request.get("transaction_id")
+        missing = [field for field in REQUEST_FIELDS if field not in request]
+        if missing:
+            self.errors += 1
+            return {"transaction_id": transaction_id, "error": f"missing fields: {', '.join(missing)}"}
+        try:
+            hits = self.monitor.process(*parse_request(request), transaction_id)
+        except Exception as error:
+            # Any bad request gets an error line; the batcher must keep running
+            self.errors += 1
+            return {"transaction_id": transaction_id, "error": str(error)}
+        self.processed += 1
+        return {"transaction_id": transaction_id, "hits": hits}
+
+
+async def serve(host: str, port: int, **options):
+    """Run a ScoringService until cancelled."""
+    service = ScoringService(**options)
+    server = await service.start(host, port)
+    print(f"Scoring service listening on {', '.join(str(s.getsockname()) for s in server.sockets)}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the fraud rules over line-delimited JSON on TCP.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Listen address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Listen port (default: 8765)")
+    parser.add_argument("--batch-size", type=int, default=256, help="Max transactions per micro-batch")
+    parser.add_argument("--max-delay-ms", type=float, default=2.0, help="Max wait for a micro-batch to fill")
+    parser.add_argument("--queue-size", type=int, default=10_000, help="Bound of the request queue")
+    parser.add_argument("--ttl-days", type=float, default=None, help="Forget users idle for this many days (requests must then arrive in timestamp order)")
+    args = parser.parse_args()
+    monitor = StreamingMonitor(ttl_seconds=args.ttl_days * 86400 if args.ttl_days else None)
+    try:
+        asyncio.run(serve(args.host, args.port, monitor=monitor, batch_size=args.batch_size,
+                          max_delay_ms=args.max_delay_ms, queue_size=args.queue_size))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,292 @@
+import argparse
+import sqlite3
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.fraud_detection import (
+    HIGH_VALUE_THRESHOLD,
+    MIN_TX_IN_WINDOW,
+    RAPID_TX_THRESHOLD,
+    RAPID_WINDOW_MINUTES,
+    RULE_IDS,
+    SAME_MERCHANT_THRESHOLD,
+    SAME_MERCHANT_WINDOW_SEC,
+    SPIKE_MULTIPLIER,
+    SPIKE_WINDOW_HOURS,
+    STD_MULTIPLIER,
+    TransactionSource,
+    as_transaction_frame,
+)
+from src.windows import NS_PER_SECOND
+
+# Rows per executemany call while bulk loading (bounds the Python lists built per call)
+LOAD_BATCH_ROWS = 100_000
+
+RAPID_WINDOW_NS = int(RAPID_WINDOW_MINUTES * 60 * NS_PER_SECOND)
+SAME_MERCHANT_WINDOW_NS = int(SAME_MERCHANT_WINDOW_SEC * NS_PER_SECOND)
+SPIKE_WINDOW_NS = int(SPIKE_WINDOW_HOURS * 3600 * NS_PER_SECOND)
+MAX_WINDOW_NS = max(RAPID_WINDOW_NS, SAME_MERCHANT_WINDOW_NS, SPIKE_WINDOW_NS)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    row INTEGER PRIMARY KEY,
+    user_id NOT NULL,
+    ts INTEGER NOT NULL,
+    merchant_name,
+    amount NOT NULL,
+    hour INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS skipped_rows (
+    row INTEGER PRIMARY KEY
+)
+"""
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS transactions_user_time ON transactions (user_id, ts);
+CREATE INDEX IF NOT EXISTS transactions_user_merchant_time ON transactions (user_id, merchant_name, ts);
+CREATE INDEX IF NOT EXISTS transactions_time ON transactions (ts);
+"""
+
+# All five rules in one statement. Window functions run over the scoped rows
+# (see TransactionStore.evaluate); per-user statistics over each user's whole
+# history. Ties in time are ordered by row number, as the pandas rules order
+# them, so a row's trailing window is the RANGE frame minus its later peers.
+# A row is covered by a qualifying window if one ends at or after it within
+# the window length: a hit among the following RANGE frame. (A hit among the
+# row's earlier peers also makes the row itself a hit, so peers need no
+# correction there.)
+_RULES_QUERY = f"""
+WITH scoped AS (
+    SELECT row, user_id, ts, merchant_name, amount, hour FROM transactions WHERE {{scope}}
+),
+stats AS (
+    SELECT user_id, COUNT(*) AS n, SUM(hour) AS hour_sum, SUM(hour * hour) AS hour_sq_sum,
+           MIN(ts) AS first_ns, MAX(ts) AS last_ns
+    FROM transactions WHERE user_id IN (SELECT user_id FROM scoped)
+    GROUP BY user_id
+),
+counted AS (
+    SELECT scoped.*, stats.n, stats.hour_sum, stats.hour_sq_sum,
+        :spike_multiplier * stats.n
+            / MAX((stats.last_ns - stats.first_ns) / {float(NS_PER_SECOND)} / 3600, 1.0) AS spike_threshold,
+        COUNT(*) OVER (PARTITION BY scoped.user_id ORDER BY ts
+                       RANGE BETWEEN {RAPID_WINDOW_NS} PRECEDING AND CURRENT ROW)
+            - COUNT(*) OVER later_user_peers AS rapid_count,
+        COUNT(*) OVER (PARTITION BY scoped.user_id, merchant_name ORDER BY ts
+                       RANGE BETWEEN {SAME_MERCHANT_WINDOW_NS} PRECEDING AND CURRENT ROW)
+            - COUNT(*) OVER (PARTITION BY scoped.user_id, merchant_name, ts ORDER BY row
+                             ROWS BETWEEN 1 FOLLOWING AND UNBOUNDED FOLLOWING) AS merchant_count,
+        COUNT(*) OVER (PARTITION BY scoped.user_id ORDER BY ts
+                       RANGE BETWEEN {SPIKE_WINDOW_NS} PRECEDING AND CURRENT ROW)
+            - COUNT(*) OVER later_user_peers AS spike_count
+    FROM scoped JOIN stats USING (user_id)
+    WINDOW later_user_peers AS (PARTITION BY scoped.user_id, ts ORDER BY row
+                                ROWS BETWEEN 1 FOLLOWING AND UNBOUNDED FOLLOWING)
+),
+hits AS (
+    SELECT *,
+        rapid_count >= :rapid_threshold AS rapid_hit,
+        merchant_count >= :merchant_threshold AND merchant_name IS NOT NULL AS merchant_hit,
+        n >= :min_tx AND spike_count >= spike_threshold AND spike_count >= :min_tx AS spike_hit
+    FROM counted
+),
+flags AS (
+    SELECT row, user_id, ts, merchant_name, amount, hour,
+        amount > :high_value AS rule1,
+        MAX(rapid_hit) OVER (PARTITION BY user_id ORDER BY ts
+                             RANGE BETWEEN CURRENT ROW AND {RAPID_WINDOW_NS} FOLLOWING) AS rule2,
+        MAX(merchant_hit) OVER (PARTITION BY user_id, merchant_name ORDER BY ts
+                                RANGE BETWEEN CURRENT ROW AND {SAME_MERCHANT_WINDOW_NS} FOLLOWING) AS rule3,
+        n >= 2 AND (n * hour - hour_sum) * (n * hour - hour_sum)
+            > :std_squared * (n * hour_sq_sum - hour_sum * hour_sum) AS rule4,
+        MAX(spike_hit) OVER (PARTITION BY user_id ORDER BY ts
+                             RANGE BETWEEN CURRENT ROW AND {SPIKE_WINDOW_NS} FOLLOWING) AS rule5
+    FROM hits
+)
+SELECT * FROM flags
+WHERE (rule1 OR rule2 OR rule3 OR rule4 OR rule5) AND {{output_scope}}
+ORDER BY row
+"""
+
+
+def _to_ns(value) -> int:
+    """A timestamp (string, datetime or pd.Timestamp) as epoch nanoseconds."""
+    return int(pd.Timestamp(value).as_unit("ns").value)
+
+
+class TransactionStore:
+    """
+    Transactions kept in SQLite, with the rules evaluated inside the database.
+
+    The table is indexed on (user_id, ts) and (user_id, merchant_name, ts),
+    the orders the window rules walk, and on ts, so a query scoped to one user
+    or a time range reads only the matching index ranges instead of the whole
+    dataset.
+
+    Parameters:
+        path (str): SQLite database file (":memory:" for a throwaway store).
+
+    Example:
+        with TransactionStore("transactions.db") as store:
+            store.load("data/input.csv")
+            results = store.evaluate()                                  # like evaluate_rules
+            store.evaluate(user_id="u1", start="2025-01-05", end="2025-01-06")
+    """
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path)
+        if path != ":memory:":
+            # Readers (investigations) are not blocked while a load is writing
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> "TransactionStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    @property
+    def skipped(self) -> int:
+        """Rows left out of the store by load because their user_id was missing."""
+        return self.connection.execute("SELECT COUNT(*) FROM skipped_rows").fetchone()[0]
+
+    def _next_row(self) -> int:
+        """Number of the next loaded row: one past every row stored or skipped so far."""
+        last = self.connection.execute(
+            "SELECT MAX(row) FROM (SELECT row FROM transactions UNION ALL SELECT row FROM skipped_rows)"
+        ).fetchone()[0]
+        return 0 if last is None else last + 1
+
+    def load(self, source: TransactionSource) -> int:
+        """
+        Bulk-append transactions (one database transaction per load).
+
+        Rows are numbered in load order from 0, so a store loaded from one CSV
+        reports the same row labels as the pandas rules on that CSV.
+
+        Rows without a user_id are not stored: their numbers are recorded in
+        skipped_rows (see skipped) and the rows after them keep their own
+        numbers. The pandas rules 2-5 never flag such rows either; rule 1
+        would, so the store does not report their high-value flags.
+
+        Returns:
+            int: Number of rows loaded (not counting skipped rows).
+        """
+        frame = as_transaction_frame(source)
+        rows = self._next_row() + np.arange(len(frame))
+        known = frame.df["user_id"].notna().to_numpy()
+        columns = [
+            rows[known].tolist(),
+            frame.df["user_id"][known].tolist(),
+            frame.epoch_ns[known].tolist(),
+            frame.df["merchant_name"][known].tolist(),
+            frame.df["amount"][known].tolist(),
+            frame.hours.to_numpy().astype(np.int64)[known].tolist(),
+        ]
+        empty = len(self) == 0
+        with self.connection:
+            if empty:
+                # Building the indexes once after the bulk insert beats maintaining them row by row
+                for index in ("transactions_user_time", "transactions_user_merchant_time", "transactions_time"):
+                    self.connection.execute(f"DROP INDEX IF EXISTS {index}")
+            for start in range(0, len(columns[0]), LOAD_BATCH_ROWS):
+                self.connection.executemany(
+                    "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)",
+                    zip(*(column[start:start + LOAD_BATCH_ROWS] for column in columns)))
+            self.connection.executemany("INSERT INTO skipped_rows VALUES (?)",
+                                        ((row,) for row in rows[~known].tolist()))
+        self.connection.executescript(_INDEXES)
+        return len(columns[0])
+
+    def evaluate(self, user_id=None, start=None, end=None) -> dict:
+        """
+        Runs all five rules in SQL, optionally scoped to one user and/or a time range.
+
+        Parameters:
+            user_id (str | None): Only this user's transactions.
+            start, end (str | datetime | None): Only transactions in [start, end].
+
+        Returns:
+            dict: Rule id ("rule1".."rule5") -> DataFrame of flagged transactions,
+                  as evaluate_rules returns them (rule4 with its hour column).
+                  Scoped results equal the full results restricted to the scope.
+
+        Logic:
+            - The scope reaches one longest window (3 hours) beyond [start, end]
+              on each side, which holds every window that can flag a row in range.
+            - Rules 4 and 5 use each user's whole history in the store, as a
+              run over the full data would.
+        """
+        scope, output_scope, parameters = ["1"], ["1"], {}
+        if user_id is not None:
+            scope.append("user_id = :user_id")
+            parameters["user_id"] = user_id
+        if start is not None:
+            scope.append("ts >= :scope_start")
+            output_scope.append("ts >= :start")
+            parameters.update(start=_to_ns(start), scope_start=_to_ns(start) - MAX_WINDOW_NS)
+        if end is not None:
+            scope.append("ts <= :scope_end")
+            output_scope.append("ts <= :end")
+            parameters.update(end=_to_ns(end), scope_end=_to_ns(end) + MAX_WINDOW_NS)
+        parameters.update(
+            high_value=HIGH_VALUE_THRESHOLD, rapid_threshold=RAPID_TX_THRESHOLD,
+            merchant_threshold=SAME_MERCHANT_THRESHOLD, std_squared=STD_MULTIPLIER ** 2,
+            spike_multiplier=SPIKE_MULTIPLIER, min_tx=MIN_TX_IN_WINDOW,
+        )
+        query = _RULES_QUERY.format(scope=" AND ".join(scope), output_scope=" AND ".join(output_scope))
+        cursor = self.connection.execute(query, parameters)
+        flagged = pd.DataFrame(cursor.fetchall(), columns=[column[0] for column in cursor.description])
+        flagged = flagged.set_index("row")
+        flagged.index.name = None
+        flagged["timestamp"] = pd.to_datetime(flagged.pop("ts").to_numpy(np.int64))
+
+        columns = ["user_id", "timestamp", "merchant_name", "amount"]
+        results = {}
+        for rule_id in RULE_IDS:
+            results[rule_id] = flagged.loc[flagged[rule_id].astype(bool), columns]
+        results["rule4"] = results["rule4"].assign(
+            hour=flagged.loc[results["rule4"].index, "hour"].astype(float))
+        return results
+
+    def latest(self, user_id) -> Optional[pd.Timestamp]:
+        """Timestamp of the user's most recent transaction (an index lookup)."""
+        ts = self.connection.execute("SELECT MAX(ts) FROM transactions WHERE user_id = ?",
+                                     (user_id,)).fetchone()[0]
+        return None if ts is None else pd.Timestamp(ts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate the fraud rules inside a SQLite transaction store.")
+    parser.add_argument("--store", type=str, default="transactions.db", help="Database (default: transactions.db)")
+    parser.add_argument("--load", type=str, default=None, help="Append this CSV to the store first")
+    parser.add_argument("--user", type=str, default=None, help="Only this user's transactions")
+    parser.add_argument("--start", type=str, default=None, help="Only transactions at or after this time")
+    parser.add_argument("--end", type=str, default=None, help="Only transactions at or before this time")
+    parser.add_argument("--last-hours", type=float, default=None,
+                        help="With --user: the hours up to the user's latest transaction")
+    args = parser.parse_args()
+    with TransactionStore(args.store) as store:
+        if args.load:
+            skipped = store.skipped
+            loaded = store.load(args.load)
+            print(f"Loaded {loaded} rows into {args.store}, skipped {store.skipped - skipped} without a user_id")
+        start, end = args.start, args.end
+        if args.user is not None and args.last_hours is not None:
+            end = store.latest(args.user)
+            if end is not None:
+                start = end - pd.Timedelta(hours=args.last_hours)
+        results = store.evaluate(user_id=args.user, start=start, end=end)
+        for rule_id, flagged in results.items():
+            print(f"{rule_id}: {len(flagged)} flagged")
+            print(flagged, "\n")
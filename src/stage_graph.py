@@ -0,0 +1,137 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
+
+import numpy as np
+
+from src.fraud_detection import (
+    RULE_IDS,
+    high_value_mask,
+    rapid_small_mask,
+    same_merchant_mask,
+    transaction_spike_mask,
+    unusual_time_mask,
+    user_stats,
+)
+from src.instrumentation import RunReport
+from src.transaction_frame import TransactionFrame
+
+# Stage -> (stages it needs, function of the frame and the finished stages' results)
+FRAME_STAGES = {
+    "timestamps": ((), lambda frame, done: frame.timestamps),
+    "epoch_ns": (("timestamps",), lambda frame, done: frame.epoch_ns),
+    "hours": (("timestamps",), lambda frame, done: frame.hours),
+    "user_codes": ((), lambda frame, done: frame.user_codes),
+    "merchant_codes": ((), lambda frame, done: frame.merchant_codes),
+    "time_order": (("epoch_ns",), lambda frame, done: frame.time_order),
+    "user_time_order": (("epoch_ns", "user_codes"), lambda frame, done: frame.user_time_order),
+    "user_time_index": (("user_time_order", "time_order"), lambda frame, done: frame.user_time_index),
+    # The index's own lazy caches, built once before rules 2, 3 and 5 read them at the same time
+    "user_time_keys": (("user_time_index",), lambda frame, done: frame.user_time_index.prepare()),
+    "user_stats": (("user_time_keys", "hours"), lambda frame, done: user_stats(frame)),
+}
+
+# Rule id -> (stages it needs, mask function); rules 4 and 5 share one user_stats
+RULE_STAGES = {
+    "rule1": ((), lambda frame, done: high_value_mask(frame)),
+    "rule2": (("user_time_keys",), lambda frame, done: rapid_small_mask(frame)),
+    "rule3": (("user_time_keys", "merchant_codes"), lambda frame, done: same_merchant_mask(frame)),
+    "rule4": (("user_stats",), lambda frame, done: unusual_time_mask(frame, done["user_stats"])),
+    "rule5": (("user_stats",), lambda frame, done: transaction_spike_mask(frame, done["user_stats"])),
+}
+
+
+def run_graph(tasks: dict, workers: Optional[int] = None, report: RunReport = None) -> dict:
+    """
+    Runs a dependency graph of tasks on a thread pool.
+
+    Parameters:
+        tasks (dict): Name -> (names of the tasks it needs, function). The
+                        function is called with the results of every task
+                        finished so far (a dict) once all it needs is done.
+        workers (int | None): Threads (default: one per CPU).
+        report (RunReport | None): Record every task as a stage.
+
+    Returns:
+        dict: Name -> result, in the order of tasks whatever order they finished in.
+
+    Logic:
+        - A task is submitted as soon as its last dependency finishes, so
+          independent stages overlap: NumPy's sorts, searches and reductions
+          release the GIL while they run.
+        - The first task to fail cancels whatever has not started and its
+          exception is raised.
+    """
+    missing = {need for needs, _ in tasks.values() for need in needs} - set(tasks)
+    if missing:
+        raise ValueError(f"Unknown dependencies: {', '.join(sorted(missing))}")
+    report = report or RunReport(enabled=False)
+    done = {}
+    waiting = dict(tasks)
+
+    def run(name, function):
+        with report.stage(name) as stage:
+            result = function(done)
+            if isinstance(result, np.ndarray) and result.dtype == bool:
+                stage["flagged"] = int(np.count_nonzero(result))
+        return result
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        running = {}
+        while waiting or running:
+            for name, (needs, function) in list(waiting.items()):
+                if all(need in done for need in needs):
+                    running[pool.submit(run, name, function)] = name
+                    del waiting[name]
+            if not running:
+                raise ValueError(f"Dependency cycle between: {', '.join(waiting)}")
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                if future.exception() is not None:
+                    for pending in running:
+                        pending.cancel()
+                    raise future.exception()
+                done[name] = future.result()
+    return {name: done[name] for name in tasks}
+
+
+def concurrent_rule_masks(frame: TransactionFrame, workers: Optional[int] = None,
+                          report: RunReport = None) -> np.ndarray:
+    """
+    rule_masks of the frame, with the shared stages and the five rules run as
+    one dependency graph on a thread pool (see run_graph).
+
+    Parameters:
+        frame (TransactionFrame): Transactions to score.
+        workers (int | None): Threads (default: one per CPU).
+        report (RunReport | None): Record every stage and rule as it finishes.
+
+    Returns:
+        np.ndarray: Shape (rows, 5); column k is the mask of RULE_IDS[k].
+
+    Logic:
+        - Parsing the timestamps, encoding users and merchants and the hour of
+          day run side by side; the (user, time) sort waits only for the
+          timestamps and user codes, and rule 1 starts at once.
+        - Each stage is a cached TransactionFrame property computed by exactly
+          one task before any task that reads it starts, so rules never race
+          to build it. This includes the (user, time) WindowIndex's own lazy
+          group ids and search keys (user_time_keys), which rules 2, 3 and 5
+          all read. The window starts of each window length are still built
+          by the one rule that uses that length.
+        - The masks are assembled in RULE_IDS order, so the result does not
+          depend on which rule finished first.
+
+    Example:
+        masks = concurrent_rule_masks(TransactionFrame.from_csv("data/large.csv"), workers=4)
+    """
+    bound = {
+        name: (needs, lambda done, function=function: function(frame, done))
+        for name, (needs, function) in {**FRAME_STAGES, **RULE_STAGES}.items()
+    }
+    results = run_graph(bound, workers, report)
+    masks = np.empty((len(frame), len(RULE_IDS)), dtype=bool)
+    for k, rule_id in enumerate(RULE_IDS):
+        masks[:, k] = results[rule_id]
+    return masks
@@ -0,0 +1,230 @@
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from src.config import (
+    HIGH_VALUE_THRESHOLD,
+    RAPID_WINDOW_MINUTES,
+    RAPID_TX_THRESHOLD,
+    SAME_MERCHANT_THRESHOLD,
+    SAME_MERCHANT_WINDOW_SEC,
+    STD_MULTIPLIER,
+    SPIKE_WINDOW_HOURS,
+    SPIKE_MULTIPLIER,
+    MIN_TX_IN_WINDOW,
+    NS_PER_SECOND,
+)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch_ns(timestamp) -> int:
+    """
+    Convert a datetime (or ISO-8601 string) to integer nanoseconds since the epoch.
+    Naive datetimes are taken as-is, like the batch loader does.
+    """
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = timestamp - _EPOCH
+    seconds = delta.days * 86400 + delta.seconds
+    return seconds * NS_PER_SECOND + delta.microseconds * 1000 + getattr(timestamp, "nanosecond", 0)
+
+
+class _Window:
+    """Recent events of one key inside a trailing time window."""
+
+    __slots__ = ("events", "flagged_through")
+
+    def __init__(self):
+        self.events = deque()        # (epoch_ns, sequence number, transaction id)
+        self.flagged_through = -1    # highest sequence number already flagged
+
+    def push(self, ts: int, seq: int, transaction_id, window: int) -> int:
+        """Add an event, drop events older than the window and return the window count."""
+        events = self.events
+        events.append((ts, seq, transaction_id))
+        while ts - events[0][0] > window:
+            events.popleft()
+        return len(events)
+
+    def flag(self) -> list:
+        """
+        Ids of the window's events that were not flagged by an earlier hit.
+        Each event is returned at most once, so the cost is amortized O(1).
+        """
+        newly_flagged = []
+        for _, seq, transaction_id in reversed(self.events):
+            if seq <= self.flagged_through:
+                break
+            newly_flagged.append(transaction_id)
+        self.flagged_through = self.events[-1][1]
+        newly_flagged.reverse()
+        return newly_flagged
+
+
+class _UserState:
+    """Per-user windows (rules 2, 3 and 5) and running statistics (rules 4 and 5)."""
+
+    __slots__ = ("rapid", "spike", "merchants", "count", "hour_sum", "hour_sq_sum", "first_ns", "last_ns")
+
+    def __init__(self, ts: int):
+        self.rapid = _Window()
+        self.spike = _Window()
+        self.merchants = OrderedDict()   # merchant_name -> _Window, least recently seen first
+        self.count = 0
+        self.hour_sum = 0
+        self.hour_sq_sum = 0
+        self.first_ns = ts
+        self.last_ns = ts
+
+
+class StreamingMonitor:
+    """
+    Real-time fraud monitor that scores one transaction (or a micro-batch) at a time.
+
+    The monitor keeps, per user, a deque of the timestamps inside the rule 2
+    and rule 5 windows plus O(1) running statistics, and per (user, merchant)
+    a deque of the timestamps inside the rule 3 window. Each event is
+    appended and popped at most once, so decisions are amortized O(1).
+
+    Parameters:
+        ttl_seconds (float | None): Drop all state of a user that has been idle
+                        (in event time) for longer than this. None keeps user
+                        baselines forever. A user's rule 3 windows are always
+                        dropped, on the user's next event, once they fall out
+                        of the 90-second window.
+
+    Returns (process):
+        dict: Rule id -> list of transaction ids newly flagged by this event.
+              Rules that did not fire are omitted.
+
+    Logic:
+        - Rules 1-3 have fixed thresholds; a hit flags the new event and any
+          earlier window members not flagged yet. Over a stream the flagged
+          ids are exactly what the batch functions flag on the same input.
+        - Rules 4 and 5 compare against the user's statistics so far (mean and
+          std of the hour, transactions/hour since first seen). A decision
+          equals the batch rule run on the transactions seen up to that
+          event, since the future part of the file is unknown at authorization.
+        - Events of one user must arrive in timestamp order; events of
+          different users may interleave in any order, since every window
+          expires against its own user's timestamps. With ttl_seconds,
+          idleness is measured against the latest timestamp seen, so all
+          events must arrive in timestamp order (a ValueError otherwise).
+
+    Example:
+        monitor = StreamingMonitor(ttl_seconds=30 * 86400)
+        hits = monitor.process("u1", "2025-01-01 10:00:00", "Starbucks", 12.5, "tx-1")
+        if hits:
+            decline(hits)
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_ns = None if ttl_seconds is None else int(ttl_seconds * NS_PER_SECOND)
+        self.users = OrderedDict()       # user_id -> _UserState, least recently seen first
+        self._clock = None               # latest timestamp seen (the TTL's event time)
+        self._seq = 0
+        self._rapid_window = int(RAPID_WINDOW_MINUTES * 60 * NS_PER_SECOND)
+        self._merchant_window = int(SAME_MERCHANT_WINDOW_SEC * NS_PER_SECOND)
+        self._spike_window = int(SPIKE_WINDOW_HOURS * 3600 * NS_PER_SECOND)
+
+    def process(self, user_id, timestamp, merchant_name, amount, transaction_id=None) -> dict:
+        """Score one transaction and update the state. See the class docstring."""
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        ts = to_epoch_ns(timestamp)
+        hour = timestamp.hour
+        # Fails on a bad amount before any state is updated
+        amount = float(amount)
+        if self.ttl_ns is not None and self._clock is not None and ts < self._clock:
+            raise ValueError("With a TTL, transactions must arrive in timestamp order")
+        seq = self._seq
+        self._seq += 1
+        if transaction_id is None:
+            transaction_id = seq
+
+        state = self.users.pop(user_id, None)
+        if state is None:
+            state = _UserState(ts)
+        elif ts < state.last_ns:
+            self.users[user_id] = state
+            raise ValueError(f"Transaction for user {user_id!r} is older than the user's last one")
+        self.users[user_id] = state
+        state.last_ns = ts
+        state.count += 1
+        state.hour_sum += hour
+        state.hour_sq_sum += hour * hour
+
+        hits = {}
+
+        # Rule 1: absolute amount
+        if amount > HIGH_VALUE_THRESHOLD:
+            hits["rule1"] = [transaction_id]
+
+        # Rule 2: rapid transactions by the user
+        if state.rapid.push(ts, seq, transaction_id, self._rapid_window) >= RAPID_TX_THRESHOLD:
+            hits["rule2"] = state.rapid.flag()
+
+        # Rule 3: repeated transactions at the same merchant. The user's events
+        # arrive in time order, so its windows expire least recently seen first
+        merchants = state.merchants
+        while merchants and ts - next(iter(merchants.values())).events[-1][0] > self._merchant_window:
+            merchants.popitem(last=False)
+        window = merchants.pop(merchant_name, None) or _Window()
+        merchants[merchant_name] = window
+        if window.push(ts, seq, transaction_id, self._merchant_window) >= SAME_MERCHANT_THRESHOLD:
+            hits["rule3"] = window.flag()
+
+        # Rule 4: hour outside mean ± STD_MULTIPLIER * std, in exact integer arithmetic
+        n, total, squares = state.count, state.hour_sum, state.hour_sq_sum
+        if n >= 2 and (n * hour - total) ** 2 > STD_MULTIPLIER ** 2 * (n * squares - total * total):
+            hits["rule4"] = [transaction_id]
+
+        # Rule 5: window count against the user's average transactions per hour so far
+        window_count = state.spike.push(ts, seq, transaction_id, self._spike_window)
+        total_hours = max((ts - state.first_ns) / NS_PER_SECOND / 3600, 1)
+        threshold = SPIKE_MULTIPLIER * (n / total_hours)
+        if n >= MIN_TX_IN_WINDOW and window_count >= threshold and window_count >= MIN_TX_IN_WINDOW:
+            hits["rule5"] = state.spike.flag()
+
+        if self.ttl_ns is not None:
+            self._clock = ts
+            self._evict(ts)
+        return hits
+
+    def process_batch(self, transactions: Iterable[dict]) -> list:
+        """
+        Score a micro-batch of transactions in order.
+
+        Parameters:
+            transactions (Iterable[dict]): Records with keys user_id, timestamp,
+                        merchant_name, amount and optionally transaction_id.
+
+        Returns:
+            list: One hits dict per transaction (see process).
+        """
+        return [
+            self.process(
+                tx["user_id"], tx["timestamp"], tx["merchant_name"], tx["amount"],
+                tx.get("transaction_id"),
+            )
+            for tx in transactions
+        ]
+
+    def _evict(self, now: int):
+        """Drop users idle for longer than the TTL (oldest first), with their windows."""
+        users = self.users
+        while users and now - next(iter(users.values())).last_ns > self.ttl_ns:
+            users.popitem(last=False)
+
+    @property
+    def merchants(self) -> dict:
+        """(user_id, merchant_name) -> rule 3 window, over every user holding state."""
+        return {(user_id, merchant_name): window for user_id, state in self.users.items()
+                for merchant_name, window in state.merchants.items()}
+
+    def __len__(self) -> int:
+        """Number of users currently holding state."""
+        return len(self.users)
@@ -0,0 +1,179 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from src.utils import load_transactions
+from src.windows import WindowIndex, resolve_backend
+
+
+class TransactionFrame:
+    """
+    An already-loaded transactions DataFrame together with the preprocessing
+    stages shared by the fraud rules.
+
+    Every stage (parsed timestamps, hour of day, sorted views) is computed the
+    first time a rule asks for it and cached on the instance, so running all
+    five rules against one frame parses and sorts the data only once.
+
+    Parameters:
+        df (pd.DataFrame): Transactions with columns user_id, timestamp,
+                           merchant_name, amount. The timestamp column may
+                           still hold unparsed strings.
+        backend (str): Window-scan backend of the window kernels ("auto",
+                           "python", "numpy" or "numba"; see WindowIndex).
+
+    Example:
+        frame = TransactionFrame.from_csv("data/input.csv")
+        rapid = flag_rapid_small_transactions(frame)
+        spikes = flag_transaction_spikes(frame)   # reuses the same sort
+    """
+
+    def __init__(self, df: pd.DataFrame, backend: str = "auto"):
+        self.df = df
+        self.backend = resolve_backend(backend)
+        # Rule id -> users and rows left by the window rules' pre-filter (see same_merchant_mask)
+        self.pruning = {}
+
+    @classmethod
+    def from_csv(cls, csv_path: str, backend: str = "auto") -> "TransactionFrame":
+        """Load a transactions CSV once and wrap it."""
+        return cls(load_transactions(csv_path), backend=backend)
+
+    @classmethod
+    def from_columns(cls, user_codes: np.ndarray, epoch_ns: np.ndarray, merchant_codes: np.ndarray,
+                     amount: np.ndarray, hours: np.ndarray = None, backend: str = "auto") -> "TransactionFrame":
+        """
+        Frame over already-encoded column arrays (e.g. memory-mapped buffers).
+
+        Parameters:
+            user_codes (np.ndarray): Integer user code per row.
+            epoch_ns (np.ndarray): int64 nanoseconds since the epoch per row.
+            merchant_codes (np.ndarray): Integer merchant code per row.
+            amount (np.ndarray): Transaction amounts.
+            hours (np.ndarray | None): Hour of day per row; derived from epoch_ns when omitted.
+            backend (str): Window-scan backend (see WindowIndex).
+
+        The user_id and merchant_name columns hold the codes, which is all the
+        rules need (they only compare ids for equality).
+        """
+        epoch_ns = np.asarray(epoch_ns, dtype=np.int64)
+        frame = cls(pd.DataFrame({
+            "user_id": user_codes,
+            "timestamp": epoch_ns.view("datetime64[ns]"),
+            "merchant_name": merchant_codes,
+            "amount": amount,
+        }), backend=backend)
+        # Seed the cached stages that are already known
+        frame.__dict__["epoch_ns"] = epoch_ns
+        if hours is not None:
+            frame.__dict__["hours"] = pd.Series(hours, index=frame.df.index, dtype=float)
+        return frame
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @cached_property
+    def timestamps(self) -> pd.Series:
+        """Timestamp column converted to datetime64 (parsed only if needed)."""
+        timestamps = self.df["timestamp"]
+        if not pd.api.types.is_datetime64_any_dtype(timestamps):
+            timestamps = pd.to_datetime(timestamps)
+        return timestamps
+
+    @cached_property
+    def parsed(self) -> pd.DataFrame:
+        """The transactions with a datetime timestamp column."""
+        if pd.api.types.is_datetime64_any_dtype(self.df["timestamp"]):
+            return self.df
+        return self.df.assign(timestamp=self.timestamps)
+
+    @cached_property
+    def hours(self) -> pd.Series:
+        """Transaction hour of day (0-23) as float."""
+        return self.timestamps.dt.hour.astype(float)
+
+    @cached_property
+    def epoch_ns(self) -> np.ndarray:
+        """Timestamps as int64 nanoseconds since the epoch."""
+        return np.asarray(self.timestamps.values, dtype="datetime64[ns]").view(np.int64)
+
+    @cached_property
+    def _user_factors(self):
+        return pd.factorize(self.df["user_id"], sort=True)
+
+    @cached_property
+    def user_codes(self) -> np.ndarray:
+        """Integer code per row for user_id (codes follow sorted user order)."""
+        return self._user_factors[0]
+
+    @cached_property
+    def user_ids(self) -> pd.Index:
+        """Distinct user ids in code order (user_ids[code] is the user)."""
+        return pd.Index(self._user_factors[1])
+
+    @cached_property
+    def merchant_codes(self) -> np.ndarray:
+        """Integer code per row for merchant_name (codes follow sorted merchant order)."""
+        return pd.factorize(self.df["merchant_name"], sort=True)[0]
+
+    @cached_property
+    def time_order(self) -> np.ndarray:
+        """Row positions in timestamp order (stable; nearly free on time-sorted files)."""
+        return np.argsort(self.epoch_ns, kind="stable")
+
+    @cached_property
+    def user_time_order(self) -> np.ndarray:
+        """Row positions in (user_id, timestamp) order (stable)."""
+        return np.lexsort((self.epoch_ns, self.user_codes))
+
+    @cached_property
+    def user_merchant_time_order(self) -> np.ndarray:
+        """Row positions in (user_id, merchant_name, timestamp) order (stable)."""
+        # Refine the (user, time) order: a stable sort on (user, merchant) keeps time order within each pair
+        order = self.user_time_order
+        merchants = self.merchant_codes.astype(np.int64) + 1  # missing names are code -1
+        pair = self.user_codes[order].astype(np.int64) * (merchants.max(initial=0) + 1) + merchants[order]
+        return order[np.argsort(pair, kind="stable")]
+
+    def _window_index(self, order: np.ndarray, *keys: np.ndarray) -> WindowIndex:
+        """WindowIndex over the rows in order, reusing the frame's time order."""
+        if self.backend != "numpy":
+            # The scan backends walk each group directly and need no time ranks
+            return WindowIndex(self.epoch_ns[order], *keys, backend=self.backend)
+        position = np.empty(len(order), dtype=np.int64)
+        position[order] = np.arange(len(order))
+        return WindowIndex(self.epoch_ns[order], *keys, time_order=position[self.time_order],
+                           backend=self.backend)
+
+    @cached_property
+    def user_time_index(self) -> WindowIndex:
+        """Window kernel over the (user_id, timestamp) order, used by rules 2 and 5."""
+        order = self.user_time_order
+        return self._window_index(order, self.user_codes[order])
+
+    @cached_property
+    def user_merchant_time_index(self) -> WindowIndex:
+        """Window kernel over the (user_id, merchant_name, timestamp) order, used by rule 3."""
+        order = self.user_merchant_time_order
+        return self._window_index(order, self.user_codes[order], self.merchant_codes[order])
+
+    @cached_property
+    def by_user_time(self) -> pd.DataFrame:
+        """View sorted by (user_id, timestamp)."""
+        return self.parsed.iloc[self.user_time_order]
+
+    @cached_property
+    def by_user_merchant_time(self) -> pd.DataFrame:
+        """View sorted by (user_id, merchant_name, timestamp)."""
+        return self.parsed.iloc[self.user_merchant_time_order]
+
+    def select(self, mask: np.ndarray) -> pd.DataFrame:
+        """
+        Rows of the parsed transactions where mask (in original row order) is True,
+        returned in index order like the rules always have.
+        """
+        flagged = self.parsed[mask]
+        if not flagged.index.is_monotonic_increasing:
+            flagged = flagged.sort_index()
+        return flagged
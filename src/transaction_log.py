@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.config import NS_PER_SECOND
+from src.transaction_frame import TransactionFrame
+
+# One fixed-width record per transaction, 24 bytes, every field naturally aligned
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<i8"),   # ns since the epoch
+    ("user", "<i4"),        # line of users.jsonl
+    ("merchant", "<i4"),    # line of merchants.jsonl, -1 when missing
+    ("amount", "<f8"),
+])
+
+# Segment header: magic, then the record size (a different layout fails loudly)
+_MAGIC = b"TXLOG\x00\x00\x01"
+HEADER_SIZE = 16
+_HEADER = _MAGIC + np.array([RECORD_DTYPE.itemsize, 0], dtype="<u4").tobytes()
+
+NS_PER_DAY = 86_400 * NS_PER_SECOND
+_EPOCH = datetime(1970, 1, 1)
+_DICTIONARIES = {"user": "users.jsonl", "merchant": "merchants.jsonl"}
+
+
+def _day_name(day: int) -> str:
+    """Day number since the epoch -> segment name, e.g. 2025-01-07."""
+    return (_EPOCH + timedelta(days=int(day))).strftime("%Y-%m-%d")
+
+
+def _read_dictionary(path: str) -> list:
+    """Values of a dictionary file; code k is line k."""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.endswith("\n")]
+
+
+def is_transaction_log(path: str) -> bool:
+    """Whether path is a transaction log directory."""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, _DICTIONARIES["user"]))
+
+
+class TransactionLogWriter:
+    """
+    Appends transactions to a log directory of day segments.
+
+    Layout:
+        users.jsonl, merchants.jsonl: one JSON value per line; a record holds
+                        the line number (code), so ids keep their type.
+        YYYY-MM-DD.bin: HEADER_SIZE header bytes, then RECORD_DTYPE records of
+                        the transactions timestamped that (UTC) day, in the
+                        order they were appended.
+
+    Dictionary lines are written before the records that use them, and a
+    record torn by a crash is cut off before the next append (and skipped by
+    readers), so the log stays readable at any point.
+
+    Parameters:
+        directory (str): Log directory; created if needed.
+
+    Example:
+        with TransactionLogWriter("data/log") as log:
+            log.append(batch_df)   # columns user_id, timestamp, merchant_name, amount
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._codes = {}
+        for field, name in _DICTIONARIES.items():
+            path = os.path.join(directory, name)
+            values = _read_dictionary(path)
+            # A line torn by a crash is dropped before anything is appended after it
+            with open(path, "a") as f:
+                f.truncate(sum(len(json.dumps(value)) + 1 for value in values))
+            self._codes[field] = {value: code for code, value in enumerate(values)}
+
+    def __enter__(self) -> "TransactionLogWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def _encode(self, field: str, values: pd.Series) -> np.ndarray:
+        """Dictionary codes of values, appending values not seen before."""
+        codes, uniques = pd.factorize(values)
+        known = self._codes[field]
+        added = [value for value in uniques.tolist() if value not in known]
+        if added:
+            with open(os.path.join(self.directory, _DICTIONARIES[field]), "a") as f:
+                for value in added:
+                    known[value] = len(known)
+                    f.write(json.dumps(value) + "\n")
+        mapping = np.array([known[value] for value in uniques.tolist()] + [-1], dtype=np.int32)
+        return mapping[codes]
+
+    def append(self, df: pd.DataFrame) -> int:
+        """
+        Append transactions (columns user_id, timestamp, merchant_name, amount).
+
+        Returns:
+            int: Records written.
+        """
+        records = np.empty(len(df), dtype=RECORD_DTYPE)
+        timestamps = pd.to_datetime(df["timestamp"])
+        records["timestamp"] = np.asarray(timestamps.values, dtype="datetime64[ns]").view(np.int64)
+        records["user"] = self._encode("user", df["user_id"])
+        records["merchant"] = self._encode("merchant", df["merchant_name"])
+        records["amount"] = df["amount"].to_numpy(dtype=np.float64)
+
+        days = records["timestamp"] // NS_PER_DAY
+        order = np.argsort(days, kind="stable")
+        bounds = np.flatnonzero(np.diff(days[order], prepend=days[order[:1]] - 1))
+        for start, stop in zip(bounds, np.append(bounds[1:], len(order))):
+            self._append_segment(_day_name(days[order[start]]), records[order[start:stop]])
+        return len(records)
+
+    def _append_segment(self, day: str, records: np.ndarray):
+        path = os.path.join(self.directory, f"{day}.bin")
+        with open(path, "ab") as f:
+            size = f.tell()
+            if size < HEADER_SIZE:
+                f.truncate(0)
+                f.write(_HEADER)
+            else:
+                # Drop the tail of a torn record before appending whole ones
+                f.truncate(size - (size - HEADER_SIZE) % RECORD_DTYPE.itemsize)
+            f.write(records.tobytes())
+
+
+class TransactionLog:
+    """
+    Reads a log written by TransactionLogWriter without parsing it.
+
+    Every day segment is memory-mapped: records(day) is a zero-copy view of
+    the file, and the column views over it read only the pages used. Loading
+    a range of days reads only those segments.
+
+    Parameters:
+        directory (str): Log directory.
+
+    Example:
+        log = TransactionLog("data/log")
+        frame = log.frame("2025-01-01", "2025-01-07")   # rescore a week, no parsing
+        masks = rule_masks(frame)
+    """
+
+    def __init__(self, directory: str):
+        if not is_transaction_log(directory):
+            raise FileNotFoundError(f"{directory} is not a transaction log")
+        self.directory = directory
+
+    def days(self, start: Optional[str] = None, end: Optional[str] = None) -> list:
+        """Segment days (YYYY-MM-DD) in order, optionally only those from start to end (inclusive)."""
+        days = sorted(name[:-4] for name in os.listdir(self.directory) if name.endswith(".bin"))
+        return [day for day in days if (start is None or day >= start) and (end is None or day <= end)]
+
+    def records(self, day: str) -> np.ndarray:
+        """The day's records as a read-only memory-mapped RECORD_DTYPE array."""
+        path = os.path.join(self.directory, f"{day}.bin")
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if header != _HEADER:
+            raise ValueError(f"{path} is not a segment of this record layout")
+        count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        if not count:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+    def dictionary(self, field: str) -> list:
+        """Values of the "user" or "merchant" dictionary; code k is item k."""
+        return _read_dictionary(os.path.join(self.directory, _DICTIONARIES[field]))
+
+    def columns(self, start: Optional[str] = None, end: Optional[str] = None) -> dict:
+        """
+        Encoded columns of the days from start to end: user_codes, epoch_ns,
+        merchant_codes and amount. A single day's columns are views of its
+        mapped file; several days are gathered into one array per column.
+        """
+        segments = [self.records(day) for day in self.days(start, end)]
+        if len(segments) == 1:
+            records = segments[0]
+            return {"user_codes": records["user"], "epoch_ns": records["timestamp"],
+                    "merchant_codes": records["merchant"], "amount": records["amount"]}
+        fields = {"user_codes": "user", "epoch_ns": "timestamp", "merchant_codes": "merchant",
+                  "amount": "amount"}
+        return {
+            name: np.concatenate([records[field] for records in segments])
+            if segments else np.empty(0, dtype=RECORD_DTYPE[field])
+            for name, field in fields.items()
+        }
+
+    def frame(self, start: Optional[str] = None, end: Optional[str] = None,
+              backend: str = "auto") -> TransactionFrame:
+        """
+        TransactionFrame over the days from start to end, for the rules; user_id
+        and merchant_name hold the codes (see TransactionFrame.from_columns).
+        """
+        columns = self.columns(start, end)
+        return TransactionFrame.from_columns(columns["user_codes"], columns["epoch_ns"],
+                                             columns["merchant_codes"], columns["amount"],
+                                             backend=backend)
+
+    def load(self, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """
+        The days from start to end as a transactions DataFrame, shaped like
+        load_transactions(categorical=True): the ids as categoricals over the
+        dictionaries, timestamps as datetime64[ns].
+        """
+        columns = self.columns(start, end)
+        users = pd.Index(self.dictionary("user"))
+        merchants = pd.Index(self.dictionary("merchant"))
+        return pd.DataFrame({
+            "user_id": pd.Categorical.from_codes(columns["user_codes"], categories=users),
+            "timestamp": np.asarray(columns["epoch_ns"]).view("datetime64[ns]"),
+            "merchant_name": pd.Categorical.from_codes(columns["merchant_codes"], categories=merchants),
+            "amount": columns["amount"],
+        })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append CSV transactions to a binary transaction log, or list its days.")
+    parser.add_argument("--log", type=str, required=True, help="Log directory")
+    parser.add_argument("--append", type=str, default=None, help="CSV of transactions to append")
+    parser.add_argument("--chunksize", type=int, default=1_000_000, help="Rows per append (default: 1,000,000)")
+    args = parser.parse_args()
+
+    if args.append:
+        from src.utils import iter_transaction_chunks
+
+        with TransactionLogWriter(args.log) as writer:
+            written = sum(writer.append(chunk) for chunk in iter_transaction_chunks(args.append, args.chunksize))
+        print(f"{written} transactions appended to {args.log}")
+    log = TransactionLog(args.log)
+    for day in log.days():
+        print(f"{day}: {len(log.records(day))} transactions")
@@ -1,11 +1,216 @@
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 
 REQUIRED_COLUMNS = ["user_id", "timestamp", "merchant_name", "amount"]
 
-def load_transactions(csv_path: str) -> pd.DataFrame:
+# Bytes hashed at the start and end of a CSV for its cache fingerprint
+FINGERPRINT_BLOCK = 64 * 1024
+
+def load_transactions(csv_path: str, cache_dir: Optional[str] = None,
+                      timestamp_format: Optional[str] = None, categorical: bool = False,
+                      amount_dtype: Optional[str] = None, engine: Optional[str] = None,
+                      parse_timestamps: bool = True) -> pd.DataFrame:
     """
     Load transactions CSV and parse timestamps.
+
+    Parameters:
+        csv_path (str): Path to the transactions CSV, or a binary transaction log
+                        directory (see src.transaction_log), which is mapped
+                        instead of parsed; the CSV options do not apply to it.
+        cache_dir (str | None): Keep the parsed columns there as memory-mappable
+                        .npy files (see load_cached_transactions); later loads of
+                        the unchanged file map the cache instead of parsing it.
+        timestamp_format (str | None): strftime format of the timestamp column,
+                        e.g. "%Y-%m-%d %H:%M:%S" or "ISO8601". A known format
+                        takes pandas' vectorized fast path instead of inferring
+                        the format (and falling back to per-value parsing on
+                        mixed input).
+        categorical (bool): Load user_id and merchant_name as categoricals:
+                        integer codes plus one copy of each distinct string.
+        amount_dtype (str | None): dtype for amount, e.g. "float32" to halve its
+                        size (exact to the cent below ~100,000).
+        engine (str | None): CSV parser: "c", "pyarrow", or "auto" for pyarrow
+                        when it is installed. None keeps the pandas default.
+        parse_timestamps (bool): False leaves the timestamp strings unparsed, to
+                        be converted later with parse_timestamp_column (a cached load
+                        is always parsed).
+
+    Returns:
+        pd.DataFrame: Columns user_id, timestamp (datetime64), merchant_name, amount.
     """
-    df = pd.read_csv(csv_path, usecols=REQUIRED_COLUMNS)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], infer_datetime_format=True)
+    if os.path.isdir(csv_path):
+        from src.transaction_log import TransactionLog
+
+        df = TransactionLog(csv_path).load()
+        return df if amount_dtype is None else df.astype({"amount": amount_dtype})
+    if cache_dir is not None:
+        df = load_cached_transactions(csv_path, cache_dir, timestamp_format=timestamp_format,
+                                      engine=engine)
+        return df if amount_dtype is None else df.astype({"amount": amount_dtype})
+
+    options = {}
+    if amount_dtype is not None:
+        options["dtype"] = {"amount": amount_dtype}
+    if engine is not None:
+        options["engine"] = csv_engine(engine)
+
+    df = pd.read_csv(csv_path, usecols=REQUIRED_COLUMNS, **options)
+    if parse_timestamps:
+        parse_timestamp_column(df, timestamp_format)
+    if categorical:
+        # Encoding after parsing is much faster than read_csv(dtype="category"),
+        # which builds and unions categories per parser block
+        for column in ("user_id", "merchant_name"):
+            codes, uniques = pd.factorize(df[column], sort=True)
+            df[column] = pd.Categorical.from_codes(codes, categories=uniques)
     return df
+
+
+def parse_timestamp_column(df: pd.DataFrame, timestamp_format: Optional[str] = None) -> pd.DataFrame:
+    """Convert df's timestamp column to datetime64 in place (and return df)."""
+    # Format inference is the default since pandas 2.0 (infer_datetime_format was removed)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format=timestamp_format)
+    return df
+
+
+def csv_engine(engine: str = "auto") -> str:
+    """Resolve "auto" to the fastest installed CSV parser (pyarrow, else pandas' C parser)."""
+    if engine != "auto":
+        return engine
+    return "pyarrow" if importlib.util.find_spec("pyarrow") is not None else "c"
+
+
+def memory_footprint(df: pd.DataFrame) -> dict:
+    """
+    Deep in-memory size of a transactions frame.
+
+    Returns:
+        dict: rows, total_bytes, bytes_per_row and bytes per column (object
+              strings counted in full, not just their pointers).
+    """
+    per_column = df.memory_usage(index=False, deep=True)
+    total = int(per_column.sum())
+    return {
+        "rows": len(df),
+        "total_bytes": total,
+        "bytes_per_row": total / len(df) if len(df) else 0.0,
+        "columns": {column: int(size) for column, size in per_column.items()},
+    }
+
+
+def iter_transaction_chunks(csv_path: str, chunksize: int):
+    """
+    Stream a transactions CSV in DataFrames of at most chunksize rows, with
+    parsed timestamps. Row labels continue across chunks (0, 1, 2, ...), as
+    they would in a single load_transactions frame.
+    """
+    with pd.read_csv(csv_path, usecols=REQUIRED_COLUMNS, chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk["timestamp"] = pd.to_datetime(chunk["timestamp"])
+            yield chunk
+
+
+def file_fingerprint(path: str) -> dict:
+    """
+    Identify a file's current contents cheaply: size, mtime and a SHA-1 of its
+    first and last FINGERPRINT_BLOCK bytes.
+    """
+    stat = os.stat(path)
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_BLOCK))
+        if stat.st_size > FINGERPRINT_BLOCK:
+            f.seek(max(stat.st_size - FINGERPRINT_BLOCK, FINGERPRINT_BLOCK))
+            digest.update(f.read())
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": digest.hexdigest()}
+
+
+def _cache_entry(csv_path: str, cache_dir: str) -> str:
+    """Cache directory of one CSV, unique per absolute path."""
+    path = os.path.abspath(csv_path)
+    key = hashlib.sha1(path.encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{os.path.basename(path)}-{key}")
+
+
+def _dictionary_array(values: pd.Index) -> np.ndarray:
+    """Distinct ids as a plain (non-object) array that np.save can store without pickling."""
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return values.to_numpy()
+    return np.asarray(values.astype(str), dtype=str)
+
+
+def _write_cache(csv_path: str, entry: str, fingerprint: dict, **parse_options):
+    """Parse the CSV once and write its encoded columns to the cache entry."""
+    # The categoricals already hold the sorted codes and dictionaries
+    df = load_transactions(csv_path, categorical=True, **parse_options)
+    users, merchants = df["user_id"].cat, df["merchant_name"].cat
+    columns = {
+        "user_codes": users.codes.to_numpy(np.int32),
+        "users": _dictionary_array(users.categories),
+        "merchant_codes": merchants.codes.to_numpy(np.int32),
+        "merchants": _dictionary_array(merchants.categories),
+        "timestamp": np.asarray(df["timestamp"].values, dtype="datetime64[ns]").view(np.int64),
+        "amount": df["amount"].to_numpy(),
+    }
+
+    # Build the entry next to its final location and swap it in atomically
+    parent = os.path.dirname(entry)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=parent, prefix=".staging-")
+    for name, values in columns.items():
+        np.save(os.path.join(staging, f"{name}.npy"), values)
+    with open(os.path.join(staging, "meta.json"), "w") as f:
+        json.dump({"fingerprint": fingerprint, "rows": len(df)}, f)
+    shutil.rmtree(entry, ignore_errors=True)
+    os.replace(staging, entry)
+
+
+def load_cached_transactions(csv_path: str, cache_dir: str, **parse_options) -> pd.DataFrame:
+    """
+    Load transactions through a columnar on-disk cache.
+
+    Parameters:
+        csv_path (str): Path to the transactions CSV.
+        cache_dir (str): Directory holding the cache entries.
+        **parse_options: timestamp_format / engine used when the CSV has to be parsed.
+
+    Returns:
+        pd.DataFrame: user_id and merchant_name as categoricals, timestamp as
+                      datetime64[ns], amount as in the CSV.
+
+    Logic:
+        - The first load parses the CSV and writes one .npy file per column:
+          int32 user/merchant codes with their dictionaries, int64 timestamps
+          and amounts.
+        - Later loads compare the CSV's fingerprint (size, mtime, head/tail
+          hash) with the stored one; if unchanged, the columns are
+          memory-mapped instead of parsed, so only the pages used are read.
+    """
+    entry = _cache_entry(csv_path, cache_dir)
+    fingerprint = file_fingerprint(csv_path)
+    try:
+        with open(os.path.join(entry, "meta.json")) as f:
+            fresh = json.load(f)["fingerprint"] == fingerprint
+    except (OSError, ValueError, KeyError):
+        fresh = False
+    if not fresh:
+        _write_cache(csv_path, entry, fingerprint, **parse_options)
+
+    def column(name: str, mmap_mode: Optional[str] = "r") -> np.ndarray:
+        return np.load(os.path.join(entry, f"{name}.npy"), mmap_mode=mmap_mode)
+
+    return pd.DataFrame({
+        "user_id": pd.Categorical.from_codes(column("user_codes"), categories=column("users", None)),
+        "timestamp": column("timestamp").view("datetime64[ns]"),
+        "merchant_name": pd.Categorical.from_codes(column("merchant_codes"),
+                                                   categories=column("merchants", None)),
+        "amount": column("amount"),
+    }, copy=False)
@@ -0,0 +1,235 @@
+import importlib.util
+from functools import cached_property
+
+import numpy as np
+
+from src.config import NS_PER_SECOND
+
+# Window-scan implementations ("auto" picks numba when installed, else numpy)
+WINDOW_BACKENDS = ("auto", "python", "numpy", "numba")
+
+
+def resolve_backend(backend: str = "auto") -> str:
+    """Resolve "auto" to the fastest installed window-scan backend (numba, else numpy)."""
+    if backend not in WINDOW_BACKENDS:
+        raise ValueError(f"Unknown window backend {backend!r}; expected one of {', '.join(WINDOW_BACKENDS)}")
+    if backend == "auto":
+        return "numba" if importlib.util.find_spec("numba") is not None else "numpy"
+    if backend == "numba" and importlib.util.find_spec("numba") is None:
+        raise ImportError("The numba window backend needs numba installed")
+    return backend
+
+
+def _scan_starts(times, group_ids, window, starts):
+    """
+    Two-pointer window scan: starts[i] = first row of i's group with
+    times >= times[i] - window. Rows are sorted by (group, time), so the left
+    pointer only ever moves forward and the scan is O(n).
+    Plain loops over indexable sequences: run as is by the python backend and
+    compiled unchanged by the numba backend.
+    """
+    left = 0
+    for i in range(len(times)):
+        if i and group_ids[i] != group_ids[i - 1]:
+            left = i
+        lower = times[i] - window
+        while times[left] < lower:
+            left += 1
+        starts[i] = left
+    return starts
+
+
+_compiled_scan = None
+
+
+def _numba_scan_starts(times: np.ndarray, group_ids: np.ndarray, window: int) -> np.ndarray:
+    """_scan_starts compiled with numba (compiled on first use)."""
+    global _compiled_scan
+    if _compiled_scan is None:
+        import numba
+
+        _compiled_scan = numba.njit(nogil=True)(_scan_starts)
+    starts = np.empty(len(times), dtype=np.int64)
+    return _compiled_scan(times, group_ids.astype(np.int64), np.int64(window), starts)
+
+
+def _python_scan_starts(times: np.ndarray, group_ids: np.ndarray, window: int) -> np.ndarray:
+    """_scan_starts in pure Python (the reference implementation)."""
+    starts = [0] * len(times)
+    _scan_starts(times.tolist(), group_ids.tolist(), int(window), starts)
+    return np.array(starts, dtype=np.int64)
+
+
+class WindowIndex:
+    """
+    Sliding time-window kernel over transactions sorted by (group keys, time).
+
+    All groups (users, or user/merchant pairs) live in one globally sorted
+    int64 epoch array. Each row's window start is found with a single
+    np.searchsorted over the whole array, so there is no per-group Python loop.
+
+    Parameters:
+        times (np.ndarray): int64 epoch timestamps (ns), sorted within each group.
+        *keys (np.ndarray): One or more integer group-key arrays, sorted so that
+                            equal key tuples are contiguous.
+        time_order (np.ndarray | None): Positions of times in time order, when
+                            already known (e.g. derived from a shared row order);
+                            computed with a stable argsort otherwise.
+        backend (str): Window-scan implementation (see WINDOW_BACKENDS):
+                            "numpy" (searchsorted, below), "numba" (a compiled
+                            two-pointer scan), "python" (the same scan
+                            interpreted; slow, a reference) or "auto". All
+                            return identical starts.
+
+    Logic (numpy backend):
+        - Timestamps are replaced by their rank (the number of smaller
+          timestamps), so the combined key group_id * stride + rank is ordered
+          across groups and cannot overflow int64 whatever the timestamp
+          resolution. Ranks come from one stable sort of the times shared by
+          every window length.
+        - The window start of row i is the first row of the same group with
+          time >= times[i] - window, i.e. with rank >= the number of times
+          below times[i] - window; searching for group_id * stride + that count
+          never crosses into the previous group.
+
+    Example:
+        index = WindowIndex(epoch_ns, user_codes)
+        counts = index.counts(120 * NS_PER_SECOND)   # transactions in the last 2 minutes
+    """
+
+    def __init__(self, times: np.ndarray, *keys: np.ndarray, time_order: np.ndarray = None,
+                 backend: str = "auto"):
+        self.times = np.asarray(times, dtype=np.int64)
+        self.keys = [np.asarray(key) for key in keys]
+        self.backend = resolve_backend(backend)
+        self._starts = {}
+        if time_order is not None:
+            self.__dict__["_time_order"] = (time_order, self.times[time_order])
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def prepare(self) -> "WindowIndex":
+        """
+        Build the lazily cached group ids and offsets and, for the numpy
+        backend, the search keys now, so threads that then read the index
+        concurrently share them instead of each building them.
+        """
+        self.group_offsets
+        if self.backend == "numpy":
+            self._keys
+        return self
+
+    @cached_property
+    def group_ids(self) -> np.ndarray:
+        """Dense group number (0, 1, 2, ...) of every row."""
+        n = len(self.times)
+        new_group = np.zeros(n, dtype=bool)
+        if n:
+            new_group[0] = True
+        for key in self.keys:
+            new_group[1:] |= key[1:] != key[:-1]
+        return np.cumsum(new_group) - 1
+
+    @cached_property
+    def group_offsets(self) -> np.ndarray:
+        """Start row of every group, followed by the total row count."""
+        n = len(self.times)
+        starts = np.flatnonzero(np.diff(self.group_ids, prepend=-1))
+        return np.append(starts, n)
+
+    @cached_property
+    def _time_order(self):
+        """Stable time order of all rows and the times in that order."""
+        order = np.argsort(self.times, kind="stable")
+        return order, self.times[order]
+
+    def _rank_below(self, values_in_time_order: np.ndarray) -> np.ndarray:
+        """
+        For values given in time order (row order[k] -> values[k]), the number of
+        rows with times < value, returned in row order.
+        """
+        order, sorted_times = self._time_order
+        ranks = np.empty(len(order), dtype=np.int64)
+        # Queries arrive sorted, so the binary searches walk memory in order
+        ranks[order] = np.searchsorted(sorted_times, values_in_time_order, side="left")
+        return ranks
+
+    @cached_property
+    def _keys(self):
+        stride = len(self.times) + 1
+        base = self.group_ids.astype(np.int64) * stride
+        return base, base + self._rank_below(self._time_order[1])
+
+    def starts(self, window: int) -> np.ndarray:
+        """
+        First row of each row's trailing window [time - window, time].
+
+        Parameters:
+            window (int): Window length in the same unit as times (ns).
+
+        Returns:
+            np.ndarray: For every row i, the smallest row j of the same group
+                        with times[j] >= times[i] - window.
+        """
+        if window in self._starts:
+            return self._starts[window]
+        if self.backend == "numba":
+            self._starts[window] = _numba_scan_starts(self.times, self.group_ids, window)
+        elif self.backend == "python":
+            self._starts[window] = _python_scan_starts(self.times, self.group_ids, window)
+        else:
+            base, combined = self._keys
+            lower = self._rank_below(self._time_order[1] - window)
+            self._starts[window] = np.searchsorted(combined, base + lower, side="left")
+        return self._starts[window]
+
+    def starts_at(self, window: int, rows: np.ndarray) -> np.ndarray:
+        """starts(window)[rows], searching only for the given rows when starts are not cached."""
+        if window in self._starts or self.backend != "numpy":
+            return self.starts(window)[rows]
+        base, combined = self._keys
+        lower = np.searchsorted(self._time_order[1], self.times[rows] - window, side="left")
+        return np.searchsorted(combined, base[rows] + lower, side="left")
+
+    def counts(self, window: int) -> np.ndarray:
+        """Number of transactions in each row's trailing window (inclusive)."""
+        return np.arange(len(self.times)) - self.starts(window) + 1
+
+    def at_least(self, window: int, threshold: int) -> np.ndarray:
+        """
+        counts(window) >= threshold, without finding any window start.
+
+        Rows are sorted by (group, time), so a window ending at row i holds
+        threshold rows exactly when row i - (threshold - 1) belongs to the
+        same group and lies inside the window: one shifted comparison, O(n).
+        """
+        k = max(int(threshold) - 1, 0)
+        reached = np.zeros(len(self.times), dtype=bool)
+        if k == 0:
+            reached[:] = True
+        elif len(self.times) > k:
+            reached[k:] = ((self.group_ids[k:] == self.group_ids[:-k])
+                           & (self.times[k:] - self.times[:-k] <= window))
+        return reached
+
+
+def mark_windows(starts: np.ndarray, ends: np.ndarray, n: int) -> np.ndarray:
+    """
+    Boolean mask of the rows covered by any of the windows [starts[k], ends[k]].
+
+    Parameters:
+        starts (np.ndarray): First row of each qualifying window.
+        ends (np.ndarray): Last row of each qualifying window (inclusive).
+        n (int): Total number of rows.
+
+    Returns:
+        np.ndarray: Boolean mask of length n.
+
+    Logic:
+        - Difference array: +1 at every window start, -1 just past every end.
+        - A running sum is positive exactly on covered rows, so the cost is
+          O(n + windows) however much the windows overlap.
+    """
+    delta = np.bincount(starts, minlength=n + 1) - np.bincount(ends + 1, minlength=n + 1)
+    return np.cumsum(delta[:n]) > 0
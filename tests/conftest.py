@@ -0,0 +1,39 @@
+"""
+Shared test data for the suites in this directory.
+
+The suites are unittest classes (python -m unittest discover -s tests puts this
+directory on sys.path), so they import these helpers as a plain module; pytest
+loads the same module as its conftest.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from generate_data import PATTERNS, generate_transactions
+
+# Share of rows losing their user_id, and (other rows) their merchant_name, with missing_keys=True
+MISSING_KEY_RATE = 0.02
+
+
+@lru_cache(maxsize=None)
+def _generated(missing_keys: bool) -> pd.DataFrame:
+    df = generate_transactions(5_000, n_users=200, n_merchants=20, seed=3,
+                               rates={label: 0.01 for label in PATTERNS})
+    if missing_keys:
+        draw = np.random.default_rng(3).random(len(df))
+        df.loc[draw < MISSING_KEY_RATE, "user_id"] = None
+        df.loc[draw > 1 - MISSING_KEY_RATE, "merchant_name"] = None
+    return df
+
+
+def synthetic_transactions(missing_keys: bool = False) -> pd.DataFrame:
+    """
+    5,000 generated transactions of 200 users at 20 merchants, with 1% of every
+    fraud pattern injected so that each rule flags some rows. Each call returns
+    a fresh copy of the same data.
+
+    Parameters:
+        missing_keys (bool): Blank the user_id of MISSING_KEY_RATE of the rows
+                        and the merchant_name of as many others.
+    """
+    return _generated(missing_keys).copy()
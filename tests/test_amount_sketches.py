@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.amount_sketches import MAX_SKETCH_BUCKETS, SKETCH_RELATIVE_ACCURACY, AmountSketches, SketchStore
+from src.fraud_detection import HIGH_VALUE_THRESHOLD
+
+class TestAmountSketches(unittest.TestCase):
+    """
+    Unit tests for per-key amount sketches and the adaptive Rule 1 thresholds.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        # An airline with large tickets, a cafe with small ones, and a rarely seen shop
+        self.df = pd.DataFrame({
+            "user_id": rng.integers(0, 50, 2_401).astype(str),
+            "timestamp": pd.Timestamp("2025-01-01") + pd.to_timedelta(np.arange(2_401), unit="min"),
+            "merchant_name": ["Airline"] * 1_000 + ["Cafe"] * 1_000 + ["Shop"] * 400 + ["Rare"],
+            "amount": np.concatenate([rng.uniform(2_000, 9_000, 1_000), rng.uniform(3, 12, 1_000),
+                                      rng.lognormal(3, 1, 400), [8_000]]).round(2),
+        })
+        self.df.loc[1_500, "amount"] = 450.0  # far above anything else the cafe sees
+        self.store = SketchStore(":memory:")
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Every key's sketched quantile is within the relative accuracy of the exact one"""
+        sketches = AmountSketches.from_amounts(self.df["merchant_name"], self.df["amount"])
+        for q in (0.0, 0.5, 0.9, 0.995, 1.0):
+            estimated = sketches.quantiles(q)["value"]
+            exact = self.df.groupby("merchant_name")["amount"].quantile(q, interpolation="lower")
+            error = (estimated / exact.reindex(estimated.index) - 1).abs()
+            self.assertLessEqual(error.max(), SKETCH_RELATIVE_ACCURACY + 1e-9, q)
+        self.assertEqual(sketches.quantiles(0.5)["count"].to_dict(),
+                         {"Airline": 1_000, "Cafe": 1_000, "Rare": 1, "Shop": 400})
+
+    def test_bucket_count_bounded(self):
+        """Amounts beyond the clamped range never grow a sketch past MAX_SKETCH_BUCKETS"""
+        amounts = np.geomspace(1e-6, 1e15, 200_000)
+        sketches = AmountSketches.from_amounts(np.zeros(len(amounts), dtype=int), amounts)
+        self.assertEqual(len(sketches.counts), MAX_SKETCH_BUCKETS)
+        self.assertEqual(MAX_SKETCH_BUCKETS, 1_268)
+
+    def test_batches_merge_into_the_same_sketch(self):
+        """Sketches built batch by batch, in memory or in the store, equal one over all rows"""
+        whole = AmountSketches.from_amounts(self.df["merchant_name"], self.df["amount"])
+        first, second = self.df.iloc[::2], self.df.iloc[1::2]
+        merged = AmountSketches.from_amounts(first["merchant_name"], first["amount"]).merge(
+            AmountSketches.from_amounts(second["merchant_name"], second["amount"]))
+        self.assertTrue(merged.counts.equals(whole.counts))
+
+        self.store.score(first, min_count=10)
+        self.store.score(second, min_count=10)
+        self.assertTrue(self.store.sketches().counts.equals(whole.counts))
+        self.assertEqual(len(self.store.sketches(keys=["Cafe", "Unknown"])), 1)
+
+    def test_adaptive_thresholds_per_merchant(self):
+        """Outliers are judged against their merchant; sparse merchants keep the global threshold"""
+        flagged = self.store.score(self.df, percentile=99.5, min_count=100)
+        by_merchant = flagged["merchant_name"].value_counts()
+        # The cafe's 450 is flagged though far below HIGH_VALUE_THRESHOLD
+        self.assertIn(1_500, flagged.index)
+        # Only the airline's top tickets, not every one above HIGH_VALUE_THRESHOLD
+        above_global = int((self.df.loc[self.df["merchant_name"] == "Airline", "amount"] > HIGH_VALUE_THRESHOLD).sum())
+        self.assertGreater(above_global, 100)
+        self.assertLessEqual(by_merchant.get("Airline", 0), 10)
+        # A merchant with one transaction falls back to the global threshold
+        self.assertIn(2_400, flagged.index)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from unittest import mock
+import numpy as np
+from conftest import synthetic_transactions
+from src import config as rule_config
+from src import fraud_detection
+from src.backtest import DEFAULT_CONFIG, RuleBacktest, config_grid
+from src.fraud_detection import fused_rule_masks, rule_masks
+from src.transaction_frame import TransactionFrame
+
+class TestBacktest(unittest.TestCase):
+    """
+    Unit tests for threshold sweeps over shared window statistics.
+    """
+
+    def setUp(self):
+        self.df = synthetic_transactions()
+
+    def test_default_config_matches_rules(self):
+        """The production thresholds reproduce the rule masks exactly"""
+        backtest = RuleBacktest(self.df)
+        expected = fused_rule_masks(TransactionFrame(self.df))
+        self.assertTrue(np.array_equal(backtest.masks(DEFAULT_CONFIG), expected))
+
+    def test_sweep_matches_patched_thresholds(self):
+        """Each configuration flags what the rules flag at those thresholds"""
+        backtest = RuleBacktest(self.df)
+        # Non-default thresholds and window lengths for every rule
+        for changes in ({"rapid_window_minutes": 5, "rapid_tx_threshold": 3, "spike_window_hours": 1},
+                        {"same_merchant_window_sec": 300, "same_merchant_threshold": 2, "std_multiplier": 1.5},
+                        {"high_value_threshold": 5000, "spike_window_hours": 6, "spike_multiplier": 3,
+                         "min_tx_in_window": 4, "same_merchant_window_sec": 30}):
+            config = {**DEFAULT_CONFIG, **changes}
+            # The rules read the constants fraud_detection imported from src.config
+            constants = {name.upper(): value for name, value in config.items()}
+            with mock.patch.multiple(rule_config, **constants), mock.patch.multiple(fraud_detection, **constants):
+                expected = rule_masks(TransactionFrame(self.df))
+            self.assertTrue(np.array_equal(backtest.masks(config), expected), changes)
+
+        configs = config_grid(high_value_threshold=[5000, 9000], rapid_tx_threshold=[3, 5, 7])
+        results = backtest.run(configs)
+        self.assertEqual(len(results), 6)
+        for config, row in zip(configs, results.itertuples()):
+            self.assertEqual(row.rule1_flagged, int((self.df["amount"] > config["high_value_threshold"]).sum()))
+        # Fewer transactions need to fall in the window, so more rows qualify
+        rapid = results.groupby("rapid_tx_threshold")["rule2_flagged"].first()
+        self.assertTrue(rapid.is_monotonic_decreasing)
+        self.assertGreater(rapid[3], rapid[7])
+        with self.assertRaises(ValueError):
+            config_grid(unknown_threshold=[1])
+
+    def test_precision_recall_from_labels(self):
+        """Labels give precision and recall for every rule and for any rule"""
+        results = RuleBacktest(self.df, labels="fraud_pattern").run([DEFAULT_CONFIG])
+        row = results.iloc[0]
+        self.assertEqual(row["rule1_precision"], 1.0)
+        for column in ("precision", "recall", "rule2_recall", "rule5_precision"):
+            self.assertTrue(0 < row[column] <= 1, column)
+
+if __name__ == "__main__":
+    unittest.main()
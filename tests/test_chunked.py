@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from datetime import datetime, timedelta
+from src.chunked import evaluate_rules_chunked
+from src.run_all_rules import evaluate_rules, run_all_rules
+
+class TestChunkedEvaluation(unittest.TestCase):
+    """
+    Unit tests for out-of-core chunked rule evaluation.
+    """
+
+    def setUp(self):
+        base_time = datetime(2025, 9, 8, 9, 0)
+        rows = []
+        # u1: rapid burst at one merchant that straddles chunk boundaries
+        rows += [("u1", base_time + timedelta(seconds=i*20), "MerchantA", 10) for i in range(6)]
+        # u2: daytime habit with one 3 AM transaction, plus a high-value purchase
+        rows += [("u2", base_time + timedelta(days=d, hours=h), "MerchantB", 20)
+                 for d, h in ((0, 1), (1, 2), (2, 1), (3, 0), (4, 2))]
+        rows += [("u2", datetime(2025, 9, 14, 3, 0), "MerchantC", 8000)]
+        # u3: three transactions in 40 minutes after days of quiet
+        rows += [("u3", base_time + timedelta(days=d), "MerchantD", 30) for d in range(4)]
+        rows += [("u3", base_time + timedelta(days=5, minutes=m), "MerchantD", 30) for m in (0, 20, 40)]
+        df = pd.DataFrame(rows, columns=["user_id", "timestamp", "merchant_name", "amount"])
+        df = df.sort_values("timestamp", kind="stable")
+
+        handle, self.csv_path = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+        df.to_csv(self.csv_path, index=False)
+
+    def tearDown(self):
+        os.remove(self.csv_path)
+
+    def test_matches_in_memory_results(self):
+        """Every chunk size gives exactly the in-memory results"""
+        expected = evaluate_rules(self.csv_path)
+        self.assertTrue(all(len(expected[rule_id]) for rule_id in expected))
+        for chunksize in (1, 2, 5, 1000):
+            results = evaluate_rules_chunked(self.csv_path, chunksize)
+            for rule_id, flagged in expected.items():
+                pd.testing.assert_frame_equal(results[rule_id], flagged, obj=f"{rule_id}/{chunksize}")
+
+    def test_unsorted_file_rejected(self):
+        """A CSV that is not in timestamp order raises ValueError"""
+        df = pd.read_csv(self.csv_path).iloc[::-1]
+        df.to_csv(self.csv_path, index=False)
+        with self.assertRaises(ValueError):
+            evaluate_rules_chunked(self.csv_path, 4)
+
+    def test_unused_options_rejected(self):
+        """run_all_rules refuses options the selected mode would ignore"""
+        for options in ({"chunksize": 4, "cache_dir": "cache"},
+                        {"chunksize": 4, "memory_report": True},
+                        {"chunksize": 4, "load_options": {"categorical": True}},
+                        {"checkpoint": "feed.checkpoint", "backend": "numpy"},
+                        {"checkpoint": "feed.checkpoint", "chunksize": 4},
+                        {"processes": 2, "workers": 2},
+                        {"output_format": "csv"}):
+            with self.assertRaises(ValueError, msg=str(options)):
+                run_all_rules(self.csv_path, **options)
+
+if __name__ == "__main__":
+    unittest.main()
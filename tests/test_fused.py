@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+from generate_data import PATTERNS, generate_transactions
+from src.fraud_detection import (
+    RULE_IDS,
+    RULE_MASKS,
+    fused_rule_masks,
+    rapid_small_mask,
+    same_merchant_mask,
+    transaction_spike_mask,
+    unusual_time_mask,
+    high_value_mask,
+    rule_masks,
+    user_stats,
+)
+from src.transaction_frame import TransactionFrame
+
+class TestFusedRuleMasks(unittest.TestCase):
+    """
+    Unit tests for the fused evaluator.
+    """
+
+    def setUp(self):
+        self.df = generate_transactions(20_000, n_users=150, n_merchants=20, days=3,
+                                        rates={label: 0.01 for label in PATTERNS}, seed=11)
+
+    def test_matches_separate_rules(self):
+        """The fused matrix equals the five mask functions, every rule firing"""
+        fused = fused_rule_masks(TransactionFrame(self.df))
+        frame = TransactionFrame(self.df)
+        for k, (rule_id, mask) in enumerate(RULE_MASKS.items()):
+            expected = mask(frame)
+            self.assertTrue(expected.any(), rule_id)
+            np.testing.assert_array_equal(fused[:, k], expected, err_msg=rule_id)
+
+    def test_matches_with_stats_and_ending_at(self):
+        """External statistics and an ending_at filter give the same result as the separate rules"""
+        frame = TransactionFrame(self.df.iloc[5000:])
+        stats = user_stats(TransactionFrame(self.df))
+        ending_at = np.random.default_rng(0).random(len(frame)) < 0.3
+        fused = fused_rule_masks(frame, stats, ending_at)
+        expected = np.column_stack([
+            high_value_mask(frame),
+            rapid_small_mask(frame, ending_at=ending_at),
+            same_merchant_mask(frame, ending_at=ending_at),
+            unusual_time_mask(frame, stats),
+            transaction_spike_mask(frame, stats, ending_at=ending_at),
+        ])
+        np.testing.assert_array_equal(fused, expected)
+
+    def test_circular_option(self):
+        """circular=True reaches rule 4 in both the fused and the rule_masks path, other rules unchanged"""
+        frame = TransactionFrame(self.df)
+        linear = fused_rule_masks(frame)
+        rule4 = RULE_IDS.index("rule4")
+        expected = unusual_time_mask(frame, circular=True)
+        self.assertFalse(np.array_equal(expected, linear[:, rule4]))
+        for masks in (fused_rule_masks(frame, circular=True), rule_masks(frame, circular=True)):
+            np.testing.assert_array_equal(masks[:, rule4], expected)
+            np.testing.assert_array_equal(np.delete(masks, rule4, axis=1), np.delete(linear, rule4, axis=1))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+import pandas as pd
+from generate_data import generate_transactions
+from src.run_all_rules import evaluate_rules
+
+class TestGenerateTransactions(unittest.TestCase):
+    """
+    Unit tests for the synthetic transaction generator.
+    """
+
+    def setUp(self):
+        self.rates = {"high_value": 0.01, "rapid": 0.02, "same_merchant": 0.02}
+        self.df = generate_transactions(5000, n_users=200, n_merchants=50, days=10,
+                                        rates=self.rates, seed=7)
+
+    def test_shape_and_order(self):
+        """Requested row count, cardinalities within bounds, sorted by timestamp"""
+        self.assertEqual(len(self.df), 5000)
+        self.assertLessEqual(self.df["user_id"].nunique(), 200)
+        self.assertLessEqual(self.df["merchant_name"].nunique(), 50)
+        self.assertTrue(self.df["timestamp"].is_monotonic_increasing)
+
+    def test_seeded(self):
+        """The same seed reproduces the data; another seed does not"""
+        again = generate_transactions(5000, n_users=200, n_merchants=50, days=10, rates=self.rates, seed=7)
+        other = generate_transactions(5000, n_users=200, n_merchants=50, days=10, rates=self.rates, seed=8)
+        pd.testing.assert_frame_equal(self.df, again)
+        self.assertFalse(self.df.equals(other))
+
+    def test_injected_patterns_are_flagged(self):
+        """Every injected high-value, rapid and same-merchant row is caught by its rule"""
+        results = evaluate_rules(self.df)
+        for rule_id, pattern in (("rule1", "high_value"), ("rule2", "rapid"), ("rule3", "same_merchant")):
+            injected = self.df.index[self.df["fraud_pattern"] == pattern]
+            self.assertGreater(len(injected), 0)
+            self.assertTrue(injected.isin(results[rule_id].index).all(), pattern)
+
+if __name__ == "__main__":
+    unittest.main()
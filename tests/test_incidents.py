@@ -0,0 +1,84 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from generate_data import PATTERNS, generate_transactions
+from src.fraud_detection import RULE_IDS, combined_flags, rule_counts, rule_masks
+from src.incidents import incident_counts, incident_records
+from src.run_all_rules import run_all_rules
+from src.transaction_frame import TransactionFrame
+
+class TestIncidents(unittest.TestCase):
+    """
+    Unit tests for collapsing window hits into incident records.
+    """
+
+    def setUp(self):
+        self.df = generate_transactions(5_000, n_users=100, n_merchants=15, seed=8,
+                                        rates={label: 0.02 for label in PATTERNS})
+        self.frame = TransactionFrame(self.df)
+        self.masks = rule_masks(self.frame)
+
+    def test_members_cover_the_flags(self):
+        """Each rule's incidents hold every row it flagged exactly once, each of one user, in fewer records"""
+        incidents = incident_records(self.frame, self.masks)
+        for k, rule_id in enumerate(RULE_IDS):
+            rows = [row for members in incidents.loc[incidents["rule"] == rule_id, "rows"] for row in members]
+            self.assertEqual(sorted(rows), list(self.df.index[self.masks[:, k]]), rule_id)
+        counts = incident_counts(incidents)
+        self.assertEqual({rule_id: flagged for rule_id, (flagged, _) in counts.items()},
+                         rule_counts(combined_flags(self.frame, self.masks)))
+        self.assertLess(counts["rule5"][1], counts["rule5"][0])
+
+        # Transactions with a missing user_id are a group of their own
+        df = self.df.copy()
+        df.loc[df["user_id"] == df["user_id"].iloc[0], "user_id"] = None
+        last_user = df["user_id"].dropna().max()
+        masks = np.zeros_like(self.masks)
+        masks[:, RULE_IDS.index("rule5")] = df["user_id"].isna() | (df["user_id"] == last_user)
+        missing = incident_records(TransactionFrame(df), masks)
+        self.assertEqual(missing["transactions"].sum(), masks.sum())
+        for members in missing["rows"]:
+            self.assertEqual(df.loc[members, "user_id"].nunique(dropna=False), 1)
+
+    def test_bursts_split_by_merchant_and_gap(self):
+        """Interleaved merchants and bursts further apart than the window are separate incidents"""
+        start = pd.Timestamp("2025-01-01 12:00:00")
+        seconds = [0, 5, 10, 15, 20, 25, 3_600, 3_610, 3_620]
+        df = pd.DataFrame({
+            "user_id": "u1",
+            "timestamp": [start + pd.Timedelta(seconds=s) for s in seconds],
+            "merchant_name": ["A", "B", "A", "B", "A", "B", "A", "A", "A"],
+            "amount": [10.0, 20.0, 10.0, 20.0, 10.0, 20.0, 1.0, 2.0, 3.0],
+        }, index=range(100, 109))
+        frame = TransactionFrame(df)
+        incidents = incident_records(frame, rule_masks(frame))
+        rule3 = incidents[incidents["rule"] == "rule3"]
+        self.assertEqual(rule3["merchant_name"].tolist(), ["A", "A", "B"])
+        self.assertEqual(rule3["rows"].tolist(), [[100, 102, 104], [106, 107, 108], [101, 103, 105]])
+        self.assertEqual(rule3["total_amount"].tolist(), [30.0, 6.0, 60.0])
+        self.assertEqual(rule3["end"].iloc[1] - rule3["start"].iloc[1], pd.Timedelta(seconds=20))
+        rule2 = incidents[incidents["rule"] == "rule2"]
+        self.assertEqual(rule2["transactions"].tolist(), [6])
+
+    def test_runner_writes_incidents(self):
+        """run_all_rules writes one line per incident and refuses chunked mode"""
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, "transactions.csv")
+            self.df.to_csv(csv_path, index=False)
+            output = os.path.join(directory, "incidents.jsonl")
+            with contextlib.redirect_stdout(io.StringIO()):
+                written = run_all_rules(csv_path, output=output, incidents=True, show_frames=False)
+            lines = pd.read_json(output, lines=True)
+            self.assertEqual(len(lines), len(written))
+            self.assertEqual(lines["incident"].tolist(), list(range(len(written))))
+            self.assertTrue(np.array_equal(lines["transactions"].to_numpy(),
+                                           lines["rows"].map(len).to_numpy()))
+            with self.assertRaises(ValueError):
+                run_all_rules(csv_path, chunksize=100, incidents=True)
+
+if __name__ == "__main__":
+    unittest.main()
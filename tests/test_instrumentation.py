@@ -0,0 +1,56 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from src.instrumentation import RunReport
+from src.run_all_rules import run_all_rules
+
+class TestRunReport(unittest.TestCase):
+    """
+    Unit tests for per-stage run instrumentation.
+    """
+
+    def run_quietly(self, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return run_all_rules("data/input.csv", **kwargs)
+
+    def test_stages_recorded(self):
+        """Load, parse, sort, every rule and output are timed, with rule flagged counts"""
+        report = RunReport(file="data/input.csv")
+        results = self.run_quietly(report=report, show_frames=False)
+        stages = {record["stage"]: record for record in report.stages}
+        self.assertEqual(list(stages), ["load", "parse", "sort", "rule1", "rule2", "rule3",
+                                        "rule4", "rule5", "output"])
+        self.assertEqual(stages["load"]["rows"], 29)
+        for rule_id, flagged in results.items():
+            self.assertEqual(stages[rule_id]["flagged"], len(flagged))
+        for record in report.stages:
+            self.assertGreaterEqual(record["seconds"], 0)
+            self.assertGreater(record["peak_rss_mb"], 0)
+
+    def test_disabled_report_records_nothing(self):
+        """A disabled report stays empty"""
+        report = RunReport(enabled=False)
+        self.run_quietly(report=report)
+        self.assertEqual(report.stages, [])
+
+    def test_jsonl_report_appends(self):
+        """Each run appends one JSON line to a .jsonl report"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "runs.jsonl")
+        for _ in range(2):
+            report = RunReport(file="data/input.csv")
+            self.run_quietly(report=report, show_frames=False)
+            report.write(path)
+        with open(path) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0]["file"], "data/input.csv")
+        self.assertEqual(len(lines[0]["stages"]), 9)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+from generate_data import PATTERNS, generate_transactions
+from src.fraud_detection import rule_masks
+from src.lite import Transaction, read_transactions, score, score_batch, score_file
+from src.transaction_frame import TransactionFrame
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestLite(unittest.TestCase):
+    """
+    Unit tests for the standard-library scorer.
+    """
+
+    def setUp(self):
+        self.df = generate_transactions(3_000, n_users=60, n_merchants=10, seed=4,
+                                        rates={label: 0.02 for label in PATTERNS})
+        self.directory = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.directory.name, "transactions.csv")
+        self.df.to_csv(self.csv_path, index=False)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_matches_batch_rules(self):
+        """Every rule flags the same rows as rule_masks, read from a CSV or built in memory"""
+        masks = rule_masks(TransactionFrame(self.df))
+        self.assertTrue(masks.any(axis=0).all())
+        expected = (masks.astype(int) @ (1 << np.arange(masks.shape[1]))).tolist()
+        self.assertEqual(score(read_transactions(self.csv_path)), expected)
+        records = [Transaction(row, *values) for row, values in enumerate(
+            self.df[["user_id", "timestamp", "merchant_name", "amount"]].itertuples(index=False))]
+        self.assertEqual(score(records), expected)
+
+        # Blank user ids and merchants are missing keys, skipped like the batch rules skip them
+        df = self.df.copy()
+        df.loc[df["user_id"].isin(df["user_id"].unique()[:5]), "user_id"] = None
+        df.loc[df.index % 7 == 0, "merchant_name"] = None
+        df.to_csv(self.csv_path, index=False)
+        self.assertEqual(score(read_transactions(self.csv_path)), score_batch(self.csv_path))
+
+    def test_large_inputs_use_the_batch_path(self):
+        """Past max_rows the file is scored by the pandas path, with the same result"""
+        self.assertEqual(score_file(self.csv_path, max_rows=100), score_file(self.csv_path))
+        self.assertEqual(len(read_transactions(self.csv_path, limit=100)), 101)
+        self.assertEqual(score([]), [])
+
+    def test_does_not_import_pandas(self):
+        """Scoring a file with src.lite loads neither pandas nor NumPy"""
+        code = ("import sys; from src.lite import score_file; score_file(sys.argv[1]); "
+                "print(sorted({'pandas', 'numpy'} & set(sys.modules)))")
+        output = subprocess.run([sys.executable, "-c", code, self.csv_path], cwd=ROOT,
+                                check=True, capture_output=True, text=True).stdout
+        self.assertEqual(output.strip(), "[]")
+
+if __name__ == "__main__":
+    unittest.main()
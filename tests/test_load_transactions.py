@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from src.run_all_rules import evaluate_rules
+from src.utils import csv_engine, load_transactions, memory_footprint
+
+class TestLoadTransactions(unittest.TestCase):
+    """
+    Unit tests for the compact ingestion options of load_transactions.
+    """
+
+    def setUp(self):
+        handle, self.csv_path = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+        rows = [(f"user{i % 4}", f"2025-01-01 10:{i // 60:02d}:{i % 60:02d}", f"Merchant{i % 3}", 100.25 * i)
+                for i in range(120)]
+        pd.DataFrame(rows, columns=["user_id", "timestamp", "merchant_name", "amount"]) \
+            .to_csv(self.csv_path, index=False)
+
+    def tearDown(self):
+        os.remove(self.csv_path)
+
+    def test_compact_dtypes(self):
+        """Ids load as categoricals, amount in the requested dtype, timestamps with a given format"""
+        df = load_transactions(self.csv_path, timestamp_format="%Y-%m-%d %H:%M:%S",
+                               categorical=True, amount_dtype="float32")
+        self.assertIsInstance(df["user_id"].dtype, pd.CategoricalDtype)
+        self.assertIsInstance(df["merchant_name"].dtype, pd.CategoricalDtype)
+        self.assertEqual(df["amount"].dtype, "float32")
+        self.assertEqual(df["timestamp"].iloc[61], pd.Timestamp("2025-01-01 10:01:01"))
+
+    def test_compact_frame_is_smaller_with_same_results(self):
+        """The compact frame uses less memory and flags the same transactions"""
+        plain = load_transactions(self.csv_path)
+        compact = load_transactions(self.csv_path, categorical=True, amount_dtype="float32")
+        self.assertLess(memory_footprint(compact)["bytes_per_row"], memory_footprint(plain)["bytes_per_row"])
+        expected, results = evaluate_rules(plain), evaluate_rules(compact)
+        for rule_id in expected:
+            self.assertEqual(list(results[rule_id].index), list(expected[rule_id].index), rule_id)
+
+    def test_engine_auto(self):
+        """auto picks an installed parser and loads the same data"""
+        self.assertIn(csv_engine("auto"), ("c", "pyarrow"))
+        df = load_transactions(self.csv_path, engine="auto")
+        self.assertEqual(len(df), 120)
+
+if __name__ == "__main__":
+    unittest.main()
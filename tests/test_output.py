@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from src.chunked import evaluate_rules_chunked
+from src.fraud_detection import RULE_IDS, combined_flags, rule_counts, rule_masks
+from src.output import write_flagged
+from src.run_all_rules import evaluate_rules
+from src.transaction_frame import TransactionFrame
+
+class TestCombinedOutput(unittest.TestCase):
+    """
+    Unit tests for the combined per-transaction output and its writers.
+    """
+
+    def setUp(self):
+        self.frame = TransactionFrame.from_csv("data/input.csv")
+        self.combined = combined_flags(self.frame, rule_masks(self.frame))
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_bitmask_matches_rule_results(self):
+        """One row per flagged transaction; bit k is set exactly for the rows rule k+1 flags"""
+        results = evaluate_rules(self.frame)
+        flagged = sorted(set().union(*(result.index for result in results.values())))
+        self.assertEqual(list(self.combined.index), flagged)
+        for k, rule_id in enumerate(RULE_IDS):
+            hit = self.combined.index[(self.combined["rules"] & (1 << k)) != 0]
+            self.assertEqual(list(hit), list(results[rule_id].index), rule_id)
+        self.assertEqual(rule_counts(self.combined), {rule_id: len(r) for rule_id, r in results.items()})
+
+    def test_chunked_combined_matches(self):
+        """Chunked evaluation produces the same combined frame"""
+        chunked = evaluate_rules_chunked("data/input.csv", 7, combined=True)
+        pd.testing.assert_frame_equal(chunked, self.combined)
+
+    def test_writers_round_trip(self):
+        """CSV and JSONL files hold the row number, the columns and the bitmask"""
+        for name in ("flagged.csv", "flagged.jsonl"):
+            path = os.path.join(self.directory, name)
+            write_flagged(self.combined, path)
+            if name.endswith(".csv"):
+                written = pd.read_csv(path, index_col="row")
+            else:
+                written = pd.read_json(path, lines=True).set_index("row")
+            self.assertEqual(list(written.index), list(self.combined.index), name)
+            self.assertEqual(list(written["rules"]), list(self.combined["rules"]), name)
+            self.assertEqual(list(written["user_id"]), list(self.combined["user_id"]), name)
+        with self.assertRaises(ValueError):
+            write_flagged(self.combined, os.path.join(self.directory, "flagged.txt"))
+
+if __name__ == "__main__":
+    unittest.main()
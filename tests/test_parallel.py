@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from src.parallel import evaluate_rules_parallel, partition_users
+from src.run_all_rules import evaluate_rules
+from src.transaction_frame import TransactionFrame
+
+class TestParallelEvaluation(unittest.TestCase):
+    """
+    Unit tests for the user-partitioned multi-process runner.
+    """
+
+    def setUp(self):
+        base_time = datetime(2025, 9, 8, 9, 0)
+        rows = []
+        for u in range(6):
+            # every user: a rapid burst at one merchant, a high-value purchase, an odd hour
+            rows += [(f"u{u}", base_time + timedelta(seconds=i*15), "MerchantA", 10 + u) for i in range(5)]
+            rows += [(f"u{u}", base_time + timedelta(days=1, hours=h), "MerchantB", 7000 + 500*h)
+                     for h in (0, 1, 1, 2, 0)]
+            rows += [(f"u{u}", base_time + timedelta(days=2, hours=14), "MerchantC", 40)]
+        self.df = pd.DataFrame(rows, columns=["user_id", "timestamp", "merchant_name", "amount"])
+
+    def test_partitions_keep_users_together(self):
+        """Every transaction of a user lands in the same partition"""
+        frame = TransactionFrame(self.df)
+        partition = partition_users(frame, 4)
+        per_user = pd.Series(partition).groupby(self.df["user_id"]).nunique()
+        self.assertTrue((per_user == 1).all())
+        self.assertTrue(np.array_equal(partition, partition_users(TransactionFrame(self.df), 4)))
+
+    def test_matches_single_process_results(self):
+        """Parallel results equal evaluate_rules, in the same order"""
+        expected = evaluate_rules(self.df)
+        results = evaluate_rules_parallel(self.df, processes=2, partitions=3)
+        for rule_id, flagged in expected.items():
+            pd.testing.assert_frame_equal(results[rule_id], flagged, obj=rule_id)
+        self.assertEqual(len(results["rule2"]), 30)
+
+if __name__ == "__main__":
+    unittest.main()
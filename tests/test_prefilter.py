@@ -0,0 +1,75 @@
+import unittest
+import numpy as np
+from conftest import synthetic_transactions
+from src.backtest import DEFAULT_CONFIG, RuleBacktest
+from src.fraud_detection import RULE_IDS, _to_ns, _window_mask, rapid_small_mask, rule_masks, same_merchant_mask
+from src.transaction_frame import TransactionFrame
+
+class TestPrefilter(unittest.TestCase):
+    """
+    Unit tests for the exact pre-filter in front of the window rules.
+    """
+
+    def setUp(self):
+        self.df = synthetic_transactions()
+        self.ending_at = np.random.default_rng(0).random(len(self.df)) < 0.5
+
+    def test_at_least_matches_counts(self):
+        """The shifted comparison agrees with the window counts for every threshold"""
+        index = TransactionFrame(self.df).user_time_index
+        for window in (0, _to_ns(90), _to_ns(3 * 3600)):
+            counts = index.counts(window)
+            for threshold in (0, 1, 2, 3, 5, 50):
+                self.assertTrue(np.array_equal(index.at_least(window, threshold), counts >= threshold),
+                                (window, threshold))
+
+    def test_pruned_rules_match_full_scan(self):
+        """Rules 2 and 3 flag the same rows as a scan over every user"""
+        frame = TransactionFrame(self.df)
+        for ending_at in (None, self.ending_at):
+            index = frame.user_merchant_time_index
+            window = _to_ns(90)
+            expected = _window_mask(frame, frame.user_merchant_time_order, index.starts(window),
+                                    index.counts(window) >= 3, ending_at)
+            self.assertTrue(expected.any())
+            self.assertTrue(np.array_equal(same_merchant_mask(TransactionFrame(self.df), ending_at), expected))
+
+            index = frame.user_time_index
+            window = _to_ns(120)
+            expected = _window_mask(frame, frame.user_time_order, index.starts(window),
+                                    index.counts(window) >= 5, ending_at)
+            self.assertTrue(expected.any())
+            self.assertTrue(np.array_equal(rapid_small_mask(TransactionFrame(self.df), ending_at), expected))
+
+    def test_pruning_is_recorded(self):
+        """The frame records how many users and rows the pre-filter kept"""
+        frame = TransactionFrame(self.df)
+        same_merchant_mask(frame)
+        pruned = frame.pruning["rule3"]
+        self.assertEqual(pruned["users"], self.df["user_id"].nunique())
+        self.assertEqual(pruned["rows"], len(self.df))
+        self.assertLess(pruned["candidate_users"], pruned["users"])
+        self.assertLess(pruned["scanned_rows"], pruned["rows"])
+
+    def test_missing_keys_never_flagged(self):
+        """Rows without a user_id (or merchant, for rule 3) are skipped, as the baseline's groupby did"""
+        df = self.df.copy()
+        flagged = rule_masks(TransactionFrame(df))
+        # Hide the users of some rule 2 bursts, and the merchants of some rule 3 bursts
+        rapid_users = df.loc[flagged[:, RULE_IDS.index("rule2")], "user_id"].unique()[:3]
+        merchant_users = df.loc[flagged[:, RULE_IDS.index("rule3")], "user_id"].unique()[-3:]
+        df.loc[df["user_id"].isin(merchant_users), "merchant_name"] = None
+        df.loc[df["user_id"].isin(rapid_users), "user_id"] = None
+        masks = rule_masks(TransactionFrame(df))
+        self.assertTrue(np.array_equal(RuleBacktest(df).masks(DEFAULT_CONFIG), masks))
+        for rule_id, keys in (("rule2", ["user_id"]), ("rule3", ["user_id", "merchant_name"]),
+                              ("rule4", ["user_id"]), ("rule5", ["user_id"])):
+            # The rules over only the rows with keys, the baseline's groups
+            known = df[keys].notna().all(axis=1).to_numpy()
+            expected = np.zeros(len(df), dtype=bool)
+            expected[known] = rule_masks(TransactionFrame(df[known]))[:, RULE_IDS.index(rule_id)]
+            self.assertTrue(expected.any(), rule_id)
+            self.assertTrue(np.array_equal(masks[:, RULE_IDS.index(rule_id)], expected), rule_id)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import pandas as pd
+from datetime import datetime, timedelta
+from src.fraud_detection import (
+    flag_transaction_spikes,
+    flag_unusual_time_transactions,
+    unusual_time_mask,
+    user_stats,
+)
+from src.profiles import ProfileStore
+from src.transaction_frame import TransactionFrame
+
+class TestProfileStore(unittest.TestCase):
+    """
+    Unit tests for the persistent per-user profile store.
+    """
+
+    def setUp(self):
+        rows = []
+        # u1: daytime habit for three days, then a 2 AM purchase on day four
+        for day in range(3):
+            rows += [("u1", datetime(2025, 3, 1 + day, h), "Shop", 20) for h in (9, 11, 13)]
+        rows += [("u1", datetime(2025, 3, 4, 2), "Shop", 20)]
+        # u2: quiet for three days, then a burst of transactions on day four
+        rows += [("u2", datetime(2025, 3, 1 + day, 12), "Cafe", 5) for day in range(3)]
+        rows += [("u2", datetime(2025, 3, 4, 15) + timedelta(minutes=10 * i), "Cafe", 5) for i in range(4)]
+        self.df = pd.DataFrame(rows, columns=["user_id", "timestamp", "merchant_name", "amount"])
+        self.store = ProfileStore(":memory:")
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_new_day_scored_against_history(self):
+        """Only the new day is loaded, yet it is flagged as in a run over the whole history"""
+        history = self.df[self.df["timestamp"] < datetime(2025, 3, 4)]
+        new_day = self.df[self.df["timestamp"] >= datetime(2025, 3, 4)]
+        self.store.update(user_stats(TransactionFrame(history)))
+
+        results = self.store.score(new_day)
+        full4 = flag_unusual_time_transactions(self.df)
+        full5 = flag_transaction_spikes(self.df)
+        self.assertEqual(list(results["rule4"].index), list(full4.index[full4.index.isin(new_day.index)]))
+        self.assertEqual(list(results["rule5"].index), list(full5.index[full5.index.isin(new_day.index)]))
+        self.assertEqual(len(results["rule4"]), 1)
+        self.assertGreater(len(results["rule5"]), 0)
+
+    def test_incremental_updates_merge(self):
+        """Recording day by day gives the statistics of the whole file"""
+        for _, day in self.df.groupby(self.df["timestamp"].dt.date):
+            self.store.score(day)
+        expected = user_stats(TransactionFrame(self.df))
+        pd.testing.assert_frame_equal(self.store.stats().sort_index(), expected, check_index_type=False)
+        profiles = self.store.profiles()
+        self.assertEqual(profiles.loc["u2", "count"], 7)
+        self.assertEqual(profiles.loc["u1", "first_seen"], datetime(2025, 3, 1, 9))
+
+    def test_circular_hours(self):
+        """A night owl's 00:00 is close to their 23:00 on the 24-hour clock"""
+        hours = [(22, 1), (23, 2), (23, 3), (0, 4), (1, 5), (0, 6), (23, 7), (0, 8), (12, 9)]
+        df = pd.DataFrame({
+            "user_id": "u1",
+            "timestamp": [datetime(2025, 3, day, hour) for hour, day in hours],
+            "merchant_name": "Shop",
+            "amount": 10,
+        })
+        frame = TransactionFrame(df)
+        circular = unusual_time_mask(frame, circular=True)
+        self.assertEqual(list(df.index[circular]), [8])
+        self.assertFalse(unusual_time_mask(frame)[8])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,9 @@ import unittest
 import pandas as pd
 from datetime import datetime, timedelta
 from unittest.mock import patch
-from src.fraud_detection import flag_unusual_time_transactions
+from src.backtest import DEFAULT_CONFIG, RuleBacktest
+from src.fraud_detection import RULE_IDS, flag_unusual_time_transactions, rule_masks, user_stats
+from src.transaction_frame import TransactionFrame
 
 class TestRule4UnusualTimeTransactions(unittest.TestCase):
     """
@@ -62,5 +64,22 @@ class TestRule4UnusualTimeTransactions(unittest.TestCase):
         flagged = flag_unusual_time_transactions("dummy.csv")
         self.assertEqual(len(flagged), 0)
 
+    @patch("src.fraud_detection.load_transactions")
+    def test_missing_user_ids_skipped(self, mock_load):
+        """Rows without a user_id are never flagged and leave the other users' statistics alone"""
+        missing = self.happy_df.assign(user_id=None, timestamp=self.happy_df["timestamp"] + timedelta(hours=7))
+        df = pd.concat([missing.iloc[:2], self.happy_df, self.sad_df, missing.iloc[2:]], ignore_index=True)
+        mock_load.return_value = df
+        flagged = flag_unusual_time_transactions("dummy.csv")
+        self.assertEqual(list(flagged.index), [7])
+
+        frame = TransactionFrame(df)
+        stats = user_stats(frame)
+        self.assertEqual(list(stats.index), ["u1", "u2"])
+        self.assertEqual(stats["count"].tolist(), [6, 5])
+        for masks in (rule_masks(frame), RuleBacktest(df).masks(DEFAULT_CONFIG)):
+            self.assertEqual(list(df.index[masks[:, RULE_IDS.index("rule4")]]), [7])
+            self.assertFalse(masks[df["user_id"].isna().to_numpy(), RULE_IDS.index("rule5")].any())
+
 if __name__ == "__main__":
     unittest.main()
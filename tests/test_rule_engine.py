@@ -0,0 +1,60 @@
+import unittest
+import pandas as pd
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from src.fraud_detection import (
+    flag_rapid_small_transactions,
+    flag_same_merchant_transactions,
+    flag_unusual_time_transactions,
+)
+from src.run_all_rules import evaluate_rules
+from src.transaction_frame import TransactionFrame
+
+class TestRuleEngine(unittest.TestCase):
+    """
+    Unit tests for the shared TransactionFrame rule engine.
+    """
+
+    def setUp(self):
+        base_time = datetime(2025, 9, 8, 10, 0)
+
+        # u1: 5 rapid transactions at the same merchant; u2: spread out over the day
+        self.df = pd.DataFrame({
+            "user_id": ["u1"] * 5 + ["u2"] * 4,
+            "timestamp": [
+                (base_time + timedelta(seconds=i*20)).strftime("%Y-%m-%d %H:%M:%S") for i in range(5)
+            ] + [
+                (base_time + timedelta(hours=i*4)).strftime("%Y-%m-%d %H:%M:%S") for i in range(4)
+            ],
+            "merchant_name": ["MerchantA"] * 5 + ["MerchantB"] * 4,
+            "amount": [10, 20, 30, 40, 50, 8000, 60, 70, 80]
+        })
+
+    @patch("src.fraud_detection.load_transactions")
+    def test_csv_loaded_once_for_all_rules(self, mock_load):
+        """evaluate_rules parses the CSV a single time and feeds every rule from it"""
+        mock_load.return_value = self.df
+        results = evaluate_rules("dummy.csv")
+        mock_load.assert_called_once_with("dummy.csv")
+        self.assertEqual(list(results), ["rule1", "rule2", "rule3", "rule4", "rule5"])
+        self.assertEqual(list(results["rule1"].index), [5])
+        self.assertEqual(list(results["rule2"].index), [0, 1, 2, 3, 4])
+
+    def test_frame_results_match_dataframe_input(self):
+        """Rules give the same result for a raw DataFrame and a shared frame"""
+        frame = TransactionFrame(self.df)
+        for rule in (flag_rapid_small_transactions, flag_same_merchant_transactions,
+                     flag_unusual_time_transactions):
+            pd.testing.assert_frame_equal(rule(frame), rule(self.df))
+
+    def test_stages_are_cached(self):
+        """Parsed timestamps and sorted views are computed once per frame"""
+        frame = TransactionFrame(self.df)
+        self.assertIs(frame.by_user_time, frame.by_user_time)
+        self.assertIs(frame.timestamps, frame.timestamps)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(frame.by_user_time["timestamp"]))
+        # The caller's DataFrame is left untouched
+        self.assertFalse(pd.api.types.is_datetime64_any_dtype(self.df["timestamp"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import unittest
+from datetime import datetime, timedelta
+from src.service import ScoringService
+
+class TestScoringService(unittest.IsolatedAsyncioTestCase):
+    """
+    Unit tests for the asyncio line-delimited JSON scoring service.
+    """
+
+    async def asyncSetUp(self):
+        self.service = ScoringService(batch_size=4, max_delay_ms=1, queue_size=2)
+        self.server = await self.service.start("127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        self.server.close()
+        await self.server.wait_closed()
+        await self.service.stop()
+
+    async def request(self, lines: list) -> list:
+        """Pipeline all lines, then read one response per line."""
+        for line in lines:
+            self.writer.write(line.encode() + b"\n")
+        await self.writer.drain()
+        return [json.loads(await self.reader.readline()) for _ in lines]
+
+    async def test_pipelined_burst_flagged_in_order(self):
+        """Responses come back in request order; the fifth rapid transaction flags the burst"""
+        base_time = datetime(2025, 1, 1, 10, 0)
+        lines = [json.dumps({"transaction_id": f"t{i}", "user_id": "u1",
+                             "timestamp": (base_time + timedelta(seconds=10 * i)).isoformat(),
+                             "merchant_name": f"Shop{i}", "amount": 10}) for i in range(5)]
+        responses = await self.request(lines)
+        self.assertEqual([response["transaction_id"] for response in responses], [f"t{i}" for i in range(5)])
+        self.assertEqual([response["hits"] for response in responses[:4]], [{}] * 4)
+        self.assertEqual(responses[4]["hits"], {"rule2": ["t0", "t1", "t2", "t3", "t4"]})
+
+    async def test_errors_and_stats(self):
+        """Bad requests get an error line without stopping the connection; stats count them"""
+        good = json.dumps({"transaction_id": "t9", "user_id": "u2", "timestamp": "2025-01-01T09:00:00",
+                           "merchant_name": "Shop", "amount": 8000})
+        responses = await self.request(["not json", '{"user_id": "u2"}', good, '{"op": "stats"}'])
+        self.assertIn("error", responses[0])
+        self.assertIn("missing fields", responses[1]["error"])
+        self.assertEqual(responses[2]["hits"], {"rule1": ["t9"]})
+        stats = responses[3]
+        self.assertEqual(stats["processed"], 1)
+        self.assertEqual(stats["errors"], 2)
+        self.assertIsNotNone(stats["p99_ms"])
+
+    async def test_bad_fields_leave_state_untouched(self):
+        """A null timestamp or string amount is rejected before scoring, and the service keeps serving"""
+        def line(transaction_id, **fields):
+            request = {"transaction_id": transaction_id, "user_id": "u3", "timestamp": "2025-01-01T09:00:00",
+                       "merchant_name": "Shop", "amount": 10}
+            return json.dumps({**request, **fields})
+
+        responses = await self.request([line("t1"), line("t2", timestamp=None), line("t3", amount="lots"),
+                                        line("t4", timestamp=12), line("t5", timestamp="2025-01-01T09:01:00")])
+        self.assertEqual([response["transaction_id"] for response in responses], ["t1", "t2", "t3", "t4", "t5"])
+        self.assertEqual(["error" in response for response in responses], [False, True, True, True, False])
+        self.assertEqual(self.service.monitor.users["u3"].count, 2)
+        self.assertEqual(self.service.errors, 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import pandas as pd
+from conftest import synthetic_transactions
+from src.run_all_rules import evaluate_rules
+from src.sql_store import TransactionStore
+
+class TestTransactionStore(unittest.TestCase):
+    """
+    Unit tests for the SQLite store and its SQL rule evaluation.
+    """
+
+    def setUp(self):
+        self.df = synthetic_transactions().drop(columns="fraud_pattern")
+        self.store = TransactionStore(":memory:")
+        self.store.load(self.df)
+
+    def tearDown(self):
+        self.store.close()
+
+    def assertSameFlags(self, results: dict, expected: dict):
+        for rule_id, flagged in expected.items():
+            self.assertEqual(results[rule_id].index.tolist(), flagged.index.tolist(), rule_id)
+            self.assertEqual(results[rule_id]["amount"].tolist(), flagged["amount"].tolist(), rule_id)
+
+    def test_sql_rules_match_pandas_rules(self):
+        """Window queries flag exactly what the pandas rules flag, on the fixture and synthetic data"""
+        expected = evaluate_rules(self.df)
+        self.assertTrue(all(len(flagged) for flagged in expected.values()))
+        self.assertSameFlags(self.store.evaluate(), expected)
+
+        with TransactionStore(":memory:") as store:
+            store.load("data/input.csv")
+            results = store.evaluate()
+            self.assertSameFlags(results, evaluate_rules("data/input.csv"))
+            self.assertEqual(len(results["rule5"]), 16)
+
+    def test_scoped_queries(self):
+        """A user's last 24 hours, or a time range, give the full results restricted to that scope"""
+        expected = evaluate_rules(self.df)
+        user_id = expected["rule2"]["user_id"].iloc[0]
+        end = self.store.latest(user_id)
+        start = end - pd.Timedelta(hours=24)
+        self.assertSameFlags(self.store.evaluate(user_id=user_id, start=start, end=end), {
+            rule_id: flagged[(flagged["user_id"] == user_id) & flagged["timestamp"].between(start, end)]
+            for rule_id, flagged in expected.items()
+        })
+
+        start, end = self.df["timestamp"].quantile(0.4), self.df["timestamp"].quantile(0.45)
+        self.assertSameFlags(self.store.evaluate(start=start, end=end), {
+            rule_id: flagged[flagged["timestamp"].between(start, end)] for rule_id, flagged in expected.items()
+        })
+
+    def test_missing_user_ids_skipped(self):
+        """Rows without a user_id are counted and left out; the rest keep their row numbers and flags"""
+        df = self.df.copy()
+        expected = evaluate_rules(df)
+        df.loc[df["user_id"].isin(expected["rule2"]["user_id"].unique()[:2]), "user_id"] = None
+        df.loc[df["merchant_name"].isin(expected["rule3"]["merchant_name"].unique()[:2]), "merchant_name"] = None
+        missing = df["user_id"].isna()
+        expected = evaluate_rules(df)
+        with TransactionStore(":memory:") as store:
+            self.assertEqual(store.load(df.iloc[:3_000]), (~missing.iloc[:3_000]).sum())
+            store.load(df.iloc[3_000:])
+            self.assertEqual((len(store), store.skipped), ((~missing).sum(), missing.sum()))
+            self.assertSameFlags(store.evaluate(), {
+                rule_id: flagged[flagged["user_id"].notna()] for rule_id, flagged in expected.items()
+            })
+
+    def test_user_scope_uses_index(self):
+        """User-scoped reads go through the (user_id, ts) index rather than a table scan"""
+        plan = " ".join(str(step) for step in self.store.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM transactions WHERE user_id = 'u1' AND ts >= 0"))
+        self.assertIn("transactions_user_time", plan)
+        self.assertEqual(len(self.store), 5_000)
+
+if __name__ == "__main__":
+    unittest.main()
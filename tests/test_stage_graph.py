@@ -0,0 +1,82 @@
+import threading
+import unittest
+import numpy as np
+from conftest import synthetic_transactions
+from src.fraud_detection import fused_rule_masks
+from src.run_all_rules import evaluate_rules
+from src.stage_graph import FRAME_STAGES, RULE_STAGES, concurrent_rule_masks, run_graph
+from src.transaction_frame import TransactionFrame
+
+class TestStageGraph(unittest.TestCase):
+    """
+    Unit tests for running the shared stages and rules as a dependency graph.
+    """
+
+    def setUp(self):
+        self.df = synthetic_transactions()
+
+    def test_tasks_run_after_their_dependencies(self):
+        """Every task sees its dependencies' results; results keep the declared order"""
+        finished = []
+        lock = threading.Lock()
+
+        def task(name, value):
+            def run(done):
+                with lock:
+                    finished.append(name)
+                return value + sum(done[need] for need in tasks[name][0])
+            return run
+
+        tasks = {
+            "total": (("left", "right"), task("total", 0)),
+            "left": (("base",), task("left", 1)),
+            "right": (("base",), task("right", 2)),
+            "base": ((), task("base", 10)),
+        }
+        results = run_graph(tasks, workers=3)
+        self.assertEqual(list(results), ["total", "left", "right", "base"])
+        self.assertEqual(results, {"total": 23, "left": 11, "right": 12, "base": 10})
+        self.assertEqual(finished[0], "base")
+        self.assertEqual(finished[-1], "total")
+
+    def test_failures_and_cycles_raise(self):
+        """A failing task's exception propagates; cycles and unknown dependencies are rejected"""
+        def fail(done):
+            raise KeyError("boom")
+        with self.assertRaises(KeyError):
+            run_graph({"a": ((), fail), "b": (("a",), lambda done: 1)}, workers=2)
+        with self.assertRaises(ValueError):
+            run_graph({"a": (("b",), lambda done: 1), "b": (("a",), lambda done: 2)})
+        with self.assertRaises(ValueError):
+            run_graph({"a": (("missing",), lambda done: 1)})
+
+    def test_concurrent_rules_match_sequential(self):
+        """Any number of workers flags exactly what the sequential evaluators flag"""
+        for df in (self.df, synthetic_transactions(missing_keys=True)):
+            expected = fused_rule_masks(TransactionFrame(df))
+            self.assertTrue(expected.any(axis=0).all())
+            for workers in (1, 2, 8):
+                masks = concurrent_rule_masks(TransactionFrame(df), workers)
+                self.assertTrue(np.array_equal(masks, expected), workers)
+        sequential = evaluate_rules(TransactionFrame(self.df))
+        concurrent = evaluate_rules(TransactionFrame(self.df), workers=4)
+        self.assertEqual(list(concurrent), list(sequential))
+        for rule_id in sequential:
+            self.assertTrue(concurrent[rule_id].equals(sequential[rule_id]), rule_id)
+
+    def test_window_index_built_before_rules(self):
+        """The index's shared caches are a stage of their own that every window rule waits for"""
+        frame = TransactionFrame(self.df, backend="numpy")
+        stages = {name: (needs, lambda done, function=function: function(frame, done))
+                  for name, (needs, function) in FRAME_STAGES.items() if name != "user_stats"}
+        run_graph(stages, workers=2)
+        self.assertTrue({"group_ids", "group_offsets", "_keys"} <= set(vars(frame.user_time_index)))
+
+        def needs(name):
+            direct = {**FRAME_STAGES, **RULE_STAGES}[name][0]
+            return set(direct).union(*(needs(need) for need in direct))
+        for rule_id in ("rule2", "rule3", "rule4", "rule5"):
+            self.assertIn("user_time_keys", needs(rule_id), rule_id)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import pandas as pd
+from datetime import datetime, timedelta
+from src.fraud_detection import (
+    flag_high_value_transactions,
+    flag_rapid_small_transactions,
+    flag_same_merchant_transactions,
+    flag_unusual_time_transactions,
+    flag_transaction_spikes,
+)
+from src.streaming import StreamingMonitor
+
+class TestStreamingMonitor(unittest.TestCase):
+    """
+    Unit tests for the real-time StreamingMonitor.
+    """
+
+    def setUp(self):
+        base_time = datetime(2025, 9, 8, 9, 0)
+        rows = []
+        # u1: rapid burst of 6 at one merchant, then a high-value purchase
+        rows += [("u1", base_time + timedelta(seconds=i*20), "MerchantA", 10) for i in range(6)]
+        rows += [("u1", base_time + timedelta(hours=2), "Rolex Boutique", 9000)]
+        # u2: regular daytime activity, then a 3 AM transaction
+        rows += [("u2", base_time + timedelta(hours=h), "MerchantB", 20) for h in (0, 1, 2, 1, 0, 1)]
+        rows += [("u2", datetime(2025, 9, 9, 3, 0), "MerchantC", 30)]
+        # u3: spread out over a day
+        rows += [("u3", base_time + timedelta(hours=4*i), "MerchantD", 40) for i in range(4)]
+        df = pd.DataFrame(rows, columns=["user_id", "timestamp", "merchant_name", "amount"])
+        self.df = df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+    def _stream(self, monitor):
+        results = []
+        for tx in self.df.itertuples():
+            results.append(monitor.process(tx.user_id, tx.timestamp, tx.merchant_name, tx.amount, tx.Index))
+        return results
+
+    def test_fixed_threshold_rules_match_batch(self):
+        """Rules 1-3 flag exactly the same transactions as the batch functions"""
+        results = self._stream(StreamingMonitor())
+        for rule_id, rule in (("rule1", flag_high_value_transactions),
+                              ("rule2", flag_rapid_small_transactions),
+                              ("rule3", flag_same_merchant_transactions)):
+            flagged = sorted(i for hits in results for i in hits.get(rule_id, []))
+            self.assertEqual(flagged, list(rule(self.df).index), rule_id)
+        # Earlier burst members are reported once, on the event that completes the window
+        burst = self.df.index[self.df["user_id"] == "u1"][:5].tolist()
+        self.assertEqual(results[burst[-1]]["rule2"], burst)
+
+    def test_baseline_rules_match_batch_on_prefix(self):
+        """Rules 4 and 5 decide each event like the batch rule on the data seen so far"""
+        results = self._stream(StreamingMonitor())
+        for rule_id, rule in (("rule4", flag_unusual_time_transactions),
+                              ("rule5", flag_transaction_spikes)):
+            for i in range(len(self.df)):
+                expected = i in rule(self.df.iloc[:i+1]).index
+                self.assertEqual(i in results[i].get(rule_id, []), expected, (rule_id, i))
+
+    def test_idle_users_evicted_by_ttl(self):
+        """User state idle for longer than the TTL is dropped"""
+        monitor = StreamingMonitor(ttl_seconds=3600)
+        monitor.process("u1", "2025-09-08 09:00:00", "MerchantA", 10)
+        monitor.process("u2", "2025-09-08 09:30:00", "MerchantA", 10)
+        monitor.process("u2", "2025-09-08 10:45:00", "MerchantA", 10)
+        self.assertEqual(list(monitor.users), ["u2"])
+        self.assertEqual(len(monitor.merchants), 1)
+
+    def test_interleaved_users_match_batch(self):
+        """Events ordered only per user score like the batch rules, and a TTL refuses them"""
+        base_time = datetime(2025, 9, 8, 10, 0)
+        rows = [("B", base_time, "MerchantB", 10), ("B", base_time + timedelta(seconds=10), "MerchantB", 10),
+                ("A", base_time + timedelta(hours=2), "MerchantA", 10),
+                ("B", base_time + timedelta(seconds=20), "MerchantB", 10)]
+        df = pd.DataFrame(rows, columns=["user_id", "timestamp", "merchant_name", "amount"])
+        monitor = StreamingMonitor()
+        results = [monitor.process(tx.user_id, tx.timestamp, tx.merchant_name, tx.amount, tx.Index)
+                   for tx in df.itertuples()]
+        self.assertEqual(results[3]["rule3"], list(flag_same_merchant_transactions(df).index))
+        self.assertEqual(results[3]["rule3"], [0, 1, 3])
+
+        monitor = StreamingMonitor(ttl_seconds=3600)
+        for tx in df.iloc[:3].itertuples():
+            monitor.process(tx.user_id, tx.timestamp, tx.merchant_name, tx.amount)
+        with self.assertRaises(ValueError):
+            monitor.process(*rows[3])
+
+    def test_out_of_order_event_rejected(self):
+        """A transaction older than the user's last one raises ValueError"""
+        monitor = StreamingMonitor()
+        monitor.process("u1", "2025-09-08 09:00:00", "MerchantA", 10)
+        with self.assertRaises(ValueError):
+            monitor.process("u1", "2025-09-08 08:00:00", "MerchantA", 10)
+
+if __name__ == "__main__":
+    unittest.main()
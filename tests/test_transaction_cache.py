@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from unittest.mock import patch
+from src.utils import load_transactions
+
+class TestTransactionCache(unittest.TestCase):
+    """
+    Unit tests for the columnar on-disk cache in load_transactions.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.directory, "input.csv")
+        self.cache_dir = os.path.join(self.directory, "cache")
+        pd.DataFrame({
+            "user_id": ["u2", "u1", "u2"],
+            "timestamp": ["2025-01-01 10:00:00", "2025-01-01 10:00:30", "2025-01-02 09:15:00"],
+            "merchant_name": ["Walmart", "Target", "Walmart"],
+            "amount": [25.5, 8000.0, 12.25],
+        }).to_csv(self.csv_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_cached_load_matches_csv(self):
+        """The cached frame holds the same values as a plain load"""
+        expected = load_transactions(self.csv_path)
+        cached = load_transactions(self.csv_path, cache_dir=self.cache_dir)
+        self.assertIsInstance(cached["user_id"].dtype, pd.CategoricalDtype)
+        self.assertEqual(cached["user_id"].astype(str).tolist(), expected["user_id"].tolist())
+        self.assertEqual(cached["merchant_name"].astype(str).tolist(), expected["merchant_name"].tolist())
+        self.assertTrue((cached["timestamp"] == expected["timestamp"]).all())
+        self.assertEqual(cached["amount"].tolist(), expected["amount"].tolist())
+
+    def test_unchanged_file_is_not_parsed_again(self):
+        """A second load of the same file maps the cache without reading the CSV"""
+        load_transactions(self.csv_path, cache_dir=self.cache_dir)
+        with patch("src.utils.pd.read_csv", side_effect=AssertionError("CSV parsed again")):
+            cached = load_transactions(self.csv_path, cache_dir=self.cache_dir)
+        self.assertEqual(len(cached), 3)
+
+    def test_changed_file_invalidates_cache(self):
+        """Appending to the CSV changes its fingerprint and rebuilds the cache"""
+        load_transactions(self.csv_path, cache_dir=self.cache_dir)
+        with open(self.csv_path, "a") as f:
+            f.write("u3,2025-01-03 12:00:00,Amazon,99.0\n")
+        cached = load_transactions(self.csv_path, cache_dir=self.cache_dir)
+        self.assertEqual(cached["user_id"].astype(str).tolist(), ["u2", "u1", "u2", "u3"])
+
+if __name__ == "__main__":
+    unittest.main()
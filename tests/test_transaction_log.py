@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from generate_data import PATTERNS, generate_transactions
+from src.fraud_detection import rule_masks
+from src.transaction_frame import TransactionFrame
+from src.transaction_log import HEADER_SIZE, RECORD_DTYPE, TransactionLog, TransactionLogWriter
+from src.utils import load_transactions
+
+class TestTransactionLog(unittest.TestCase):
+    """
+    Unit tests for the memory-mapped binary transaction log.
+    """
+
+    def setUp(self):
+        self.df = generate_transactions(4_000, n_users=80, n_merchants=15, seed=6, days=3,
+                                        rates={label: 0.02 for label in PATTERNS})
+        self.df = self.df[["user_id", "timestamp", "merchant_name", "amount"]]
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "log")
+        with TransactionLogWriter(self.path) as writer:
+            writer.append(self.df.iloc[:1_500])
+        with TransactionLogWriter(self.path) as writer:
+            writer.append(self.df.iloc[1_500:])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip_by_day(self):
+        """Appended batches read back unchanged, one segment per day"""
+        log = TransactionLog(self.path)
+        self.assertEqual(log.days(), sorted(self.df["timestamp"].dt.strftime("%Y-%m-%d").unique()))
+        loaded = log.load()
+        for column in ("user_id", "merchant_name"):
+            self.assertEqual(loaded[column].astype(object).tolist(), self.df[column].tolist())
+        self.assertTrue((loaded["timestamp"].to_numpy() == self.df["timestamp"].to_numpy()).all())
+        self.assertTrue((loaded["amount"].to_numpy() == self.df["amount"].to_numpy()).all())
+        first = log.days()[0]
+        self.assertIsInstance(log.records(first), np.memmap)
+        self.assertEqual(len(log.load(first, first)), int((self.df["timestamp"].dt.strftime("%Y-%m-%d") == first).sum()))
+
+    def test_rules_on_the_log_match_the_csv(self):
+        """Rules over the mapped columns, or a log passed to load_transactions, match the CSV"""
+        expected = rule_masks(TransactionFrame(self.df))
+        self.assertTrue(expected.any(axis=0).all())
+        self.assertTrue(np.array_equal(rule_masks(TransactionLog(self.path).frame()), expected))
+        self.assertTrue(np.array_equal(rule_masks(TransactionFrame(load_transactions(self.path))), expected))
+
+    def test_torn_writes_are_skipped(self):
+        """A partial trailing record is ignored and cut off by the next append"""
+        log = TransactionLog(self.path)
+        day = log.days()[-1]
+        segment = os.path.join(self.path, f"{day}.bin")
+        rows = len(log.records(day))
+        with open(segment, "ab") as f:
+            f.write(b"\x01" * (RECORD_DTYPE.itemsize - 5))
+        self.assertEqual(len(log.records(day)), rows)
+
+        with TransactionLogWriter(self.path) as writer:
+            writer.append(self.df.iloc[-1:].assign(merchant_name="NewMerchant"))
+        self.assertEqual(os.path.getsize(segment), HEADER_SIZE + (rows + 1) * RECORD_DTYPE.itemsize)
+        self.assertEqual(log.load(day, day)["merchant_name"].iloc[-1], "NewMerchant")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import importlib.util
+import unittest
+import numpy as np
+from conftest import synthetic_transactions
+from src.fraud_detection import fused_rule_masks
+from src.transaction_frame import TransactionFrame
+from src.windows import WindowIndex, resolve_backend
+
+HAS_NUMBA = importlib.util.find_spec("numba") is not None
+BACKENDS = ["python", "numpy"] + (["numba"] if HAS_NUMBA else [])
+
+class TestWindowBackends(unittest.TestCase):
+    """
+    Every window-scan backend must return identical window starts and rule masks.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        n = 3_000
+        self.users = np.sort(rng.integers(0, 40, n))
+        merchants = rng.integers(0, 3, n)
+        # Bursty times with duplicates, sorted within each (user, merchant) group
+        times = rng.integers(0, 4 * 3600, n) * 1_000_000_000
+        order = np.lexsort((times, merchants, self.users))
+        self.users, self.merchants, self.times = self.users[order], merchants[order], times[order]
+        # Injected episodes of every fraud pattern, so each rule flags some rows
+        self.df = synthetic_transactions()
+
+    def test_starts_match_across_backends(self):
+        """Each backend finds the same window start for every row and window length"""
+        for window in (0, 90 * 1_000_000_000, 3 * 3600 * 1_000_000_000):
+            expected = WindowIndex(self.times, self.users, self.merchants, backend="numpy").starts(window)
+            for backend in BACKENDS:
+                index = WindowIndex(self.times, self.users, self.merchants, backend=backend)
+                self.assertEqual(index.starts(window).tolist(), expected.tolist(), (backend, window))
+
+    def test_rule_masks_match_across_backends(self):
+        """All five rules flag the same rows whichever backend scans the windows, with or without missing keys"""
+        for df in (self.df, synthetic_transactions(missing_keys=True)):
+            expected = fused_rule_masks(TransactionFrame(df, backend="numpy"))
+            self.assertTrue(expected.any(axis=0).all())
+            for backend in BACKENDS:
+                masks = fused_rule_masks(TransactionFrame(df, backend=backend))
+                self.assertTrue(np.array_equal(masks, expected), backend)
+
+    def test_backend_selection(self):
+        """auto falls back to numpy without numba; unknown or missing backends raise"""
+        self.assertEqual(resolve_backend("auto"), "numba" if HAS_NUMBA else "numpy")
+        with self.assertRaises(ValueError):
+            resolve_backend("cuda")
+        if not HAS_NUMBA:
+            with self.assertRaises(ImportError):
+                resolve_backend("numba")
+
+if __name__ == "__main__":
+    unittest.main()
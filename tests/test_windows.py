@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+from src.windows import WindowIndex, mark_windows
+
+class TestWindowIndex(unittest.TestCase):
+    """
+    Unit tests for the vectorized sliding-window kernel.
+    """
+
+    def setUp(self):
+        # Two users sorted by (user, time); times in seconds for readability
+        self.users = np.array([0, 0, 0, 0, 1, 1, 1])
+        self.times = np.array([0, 30, 60, 200, 50, 55, 400])
+
+    def test_counts_per_group(self):
+        """Each row counts the transactions of its own group in [t - window, t]"""
+        index = WindowIndex(self.times, self.users)
+        self.assertEqual(index.counts(60).tolist(), [1, 2, 3, 1, 1, 2, 1])
+        self.assertEqual(index.starts(60).tolist(), [0, 0, 0, 3, 4, 4, 6])
+
+    def test_windows_never_cross_groups(self):
+        """A window start never reaches into the previous user's rows"""
+        index = WindowIndex(self.times, self.users)
+        self.assertEqual(index.starts(10_000).tolist(), [0, 0, 0, 0, 4, 4, 4])
+        self.assertEqual(index.group_offsets.tolist(), [0, 4, 7])
+
+    def test_multiple_keys(self):
+        """Groups can be defined by several key columns (user, merchant)"""
+        merchants = np.array([0, 0, 1, 1, 0, 0, 0])
+        index = WindowIndex(self.times, self.users, merchants)
+        self.assertEqual(index.group_offsets.tolist(), [0, 2, 4, 7])
+        self.assertEqual(index.counts(200).tolist(), [1, 2, 1, 2, 1, 2, 1])
+
+    def test_mark_windows(self):
+        """Overlapping window intervals merge into one boolean mask"""
+        mask = mark_windows(np.array([0, 1, 4]), np.array([2, 2, 5]), 7)
+        self.assertEqual(mask.tolist(), [True, True, True, False, True, True, False])
+
+    def test_dense_burst(self):
+        """A 10k-transaction burst flags every row without expanding each window"""
+        n = 10_000
+        index = WindowIndex(np.arange(n), np.zeros(n, dtype=int))
+        ends = np.flatnonzero(index.counts(n) >= 5)
+        mask = mark_windows(index.starts(n)[ends], ends, n)
+        self.assertTrue(mask.all())
+
+if __name__ == "__main__":
+    unittest.main()